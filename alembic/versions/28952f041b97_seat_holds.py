@@ -0,0 +1,65 @@
+"""seat holds
+
+Revision ID: 28952f041b97
+Revises: ac8d7106c984
+Create Date: 2026-10-18 12:20:51.904417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "28952f041b97"
+down_revision: Union[str, None] = "ac8d7106c984"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "seat_holds",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("showtime_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["showtime_id"], ["showtimes.id"], ondelete="RESTRICT"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="RESTRICT"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id", "showtime_id", name="uq_seat_holds_id_showtime_id"),
+    )
+    op.create_index("ix_seat_holds_expires_at", "seat_holds", ["expires_at"])
+    op.create_index("ix_seat_holds_user_id", "seat_holds", ["user_id"])
+    op.create_table(
+        "seat_hold_seat",
+        sa.Column("hold_id", sa.Integer(), nullable=False),
+        sa.Column("seat_id", sa.Integer(), nullable=False),
+        sa.Column("showtime_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["hold_id", "showtime_id"],
+            ["seat_holds.id", "seat_holds.showtime_id"],
+            name="fk_seat_hold_seat_hold",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["seat_id"],
+            ["seats.id"],
+        ),
+        sa.PrimaryKeyConstraint("hold_id", "seat_id"),
+        sa.UniqueConstraint(
+            "showtime_id", "seat_id", name="uq_seat_hold_seat_showtime_id_seat_id"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("seat_hold_seat")
+    op.drop_index("ix_seat_holds_user_id", table_name="seat_holds")
+    op.drop_index("ix_seat_holds_expires_at", table_name="seat_holds")
+    op.drop_table("seat_holds")
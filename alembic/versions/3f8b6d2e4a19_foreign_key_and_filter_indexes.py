@@ -0,0 +1,59 @@
+"""foreign key and filter indexes
+
+Revision ID: 3f8b6d2e4a19
+Revises: e2a7f9b3c015
+Create Date: 2026-10-18 14:48:23.540917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8b6d2e4a19"
+down_revision: Union[str, None] = "e2a7f9b3c015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# seats.cinema_hall_id is already covered by the leading column of
+# uq_seats_cinema_hall_id_row_number_seat_number
+INDEXES = (
+    ("ix_reservations_user_id_created_at", "reservations", ["user_id", "created_at"]),
+    ("ix_reservations_showtime_id", "reservations", ["showtime_id"]),
+    ("ix_reservation_seat_seat_id", "reservation_seat", ["seat_id"]),
+    ("ix_seat_holds_showtime_id", "seat_holds", ["showtime_id"]),
+    ("ix_seat_hold_seat_seat_id", "seat_hold_seat", ["seat_id"]),
+    ("ix_showtimes_start_time", "showtimes", ["start_time"]),
+    ("ix_showtimes_movie_id_start_time", "showtimes", ["movie_id", "start_time"]),
+    (
+        "ix_showtimes_cinema_hall_id_start_time",
+        "showtimes",
+        ["cinema_hall_id", "start_time"],
+    ),
+    ("ix_movie_genre_genre_id_movie_id", "movie_genre", ["genre_id", "movie_id"]),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    # IF NOT EXISTS lets a rerun skip indexes built before an interruption
+    # (an interrupted build leaves an INVALID index that must be dropped).
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
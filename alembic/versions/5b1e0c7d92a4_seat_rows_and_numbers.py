@@ -0,0 +1,112 @@
+"""seat rows and numbers
+
+Revision ID: 5b1e0c7d92a4
+Revises: 28952f041b97
+Create Date: 2026-10-18 13:04:37.218650
+
+"""
+
+import re
+from collections import defaultdict
+from typing import Sequence, Union, Optional
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e0c7d92a4"
+down_revision: Union[str, None] = "28952f041b97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# "A12", "a-12", "Hall1-AB3": trailing row letters followed by the seat number
+LETTER_ROW_CODE = re.compile(r"([A-Za-z]+)\s*-?\s*(\d+)\s*$")
+# "3-12", "R3S12": row and seat numbers separated by anything else
+NUMBER_ROW_CODE = re.compile(r"(\d+)\D+(\d+)\s*$")
+
+
+def parse_seat_code(seat_code: str) -> Optional[tuple[int, int]]:
+    match = LETTER_ROW_CODE.search(seat_code)
+    if match:
+        row = 0
+        for letter in match.group(1).upper():
+            row = row * 26 + ord(letter) - ord("A") + 1
+        return row, int(match.group(2))
+    match = NUMBER_ROW_CODE.search(seat_code)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return None
+
+
+def upgrade() -> None:
+    op.add_column("seats", sa.Column("row_number", sa.Integer(), nullable=True))
+    op.add_column("seats", sa.Column("seat_number", sa.Integer(), nullable=True))
+    op.add_column(
+        "cinema_halls",
+        sa.Column("row_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "cinema_halls",
+        sa.Column("seats_per_row", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    conn = op.get_bind()
+    halls = defaultdict(list)
+    for seat_id, seat_code, hall_id in conn.execute(
+        sa.text("SELECT id, seat_code, cinema_hall_id FROM seats ORDER BY id")
+    ):
+        halls[hall_id].append((seat_id, parse_seat_code(seat_code or "")))
+
+    updates = []
+    for hall_id, seats in halls.items():
+        placed = {}
+        taken = set()
+        unparsed = []
+        for seat_id, position in seats:
+            if position is None or position in taken:
+                unparsed.append(seat_id)
+            else:
+                placed[seat_id] = position
+                taken.add(position)
+        # Codes that can't be parsed (or clash) go to a row behind the others
+        last_row = max((row for row, _ in placed.values()), default=0) + 1
+        for number, seat_id in enumerate(unparsed, start=1):
+            placed[seat_id] = (last_row, number)
+        updates.extend(
+            {"id": seat_id, "row_number": row, "seat_number": number}
+            for seat_id, (row, number) in placed.items()
+        )
+    if updates:
+        conn.execute(
+            sa.text(
+                "UPDATE seats SET row_number = :row_number, seat_number = :seat_number "
+                "WHERE id = :id"
+            ),
+            updates,
+        )
+    op.execute(
+        "UPDATE cinema_halls SET row_count = grid.row_count, "
+        "seats_per_row = grid.seats_per_row "
+        "FROM (SELECT cinema_hall_id, max(row_number) AS row_count, "
+        "max(seat_number) AS seats_per_row FROM seats GROUP BY cinema_hall_id) grid "
+        "WHERE grid.cinema_hall_id = cinema_halls.id"
+    )
+
+    op.alter_column("seats", "row_number", nullable=False)
+    op.alter_column("seats", "seat_number", nullable=False)
+    op.create_unique_constraint(
+        "uq_seats_cinema_hall_id_row_number_seat_number",
+        "seats",
+        ["cinema_hall_id", "row_number", "seat_number"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_seats_cinema_hall_id_row_number_seat_number", "seats", type_="unique"
+    )
+    op.drop_column("cinema_halls", "seats_per_row")
+    op.drop_column("cinema_halls", "row_count")
+    op.drop_column("seats", "seat_number")
+    op.drop_column("seats", "row_number")
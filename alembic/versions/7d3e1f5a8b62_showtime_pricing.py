@@ -0,0 +1,55 @@
+"""showtime pricing
+
+Revision ID: 7d3e1f5a8b62
+Revises: b71c5e9a0d48
+Create Date: 2026-10-18 15:52:31.906114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3e1f5a8b62"
+down_revision: Union[str, None] = "b71c5e9a0d48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "showtimes",
+        sa.Column(
+            "price_multiplier",
+            sa.Numeric(precision=4, scale=2),
+            server_default="1.00",
+            nullable=False,
+        ),
+    )
+    op.create_table(
+        "showtime_price_tiers",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("first_row", sa.Integer(), nullable=False),
+        sa.Column("last_row", sa.Integer(), nullable=False),
+        sa.Column("surcharge", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("showtime_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["showtime_id"], ["showtimes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_showtime_price_tiers_showtime_id",
+        "showtime_price_tiers",
+        ["showtime_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_showtime_price_tiers_showtime_id", table_name="showtime_price_tiers"
+    )
+    op.drop_table("showtime_price_tiers")
+    op.drop_column("showtimes", "price_multiplier")
@@ -0,0 +1,47 @@
+"""showtime cleaning buffer and hall overlap exclusion
+
+Revision ID: 9c4d2a61e7f3
+Revises: 5b1e0c7d92a4
+Create Date: 2026-10-18 13:41:09.662301
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4d2a61e7f3"
+down_revision: Union[str, None] = "5b1e0c7d92a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Cleaning buffer given to showtimes created before it existed
+DEFAULT_CLEANING_MINUTES = 20
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "showtimes", sa.Column("cleaning_ends_at", sa.DateTime(), nullable=True)
+    )
+    op.execute(
+        "UPDATE showtimes SET cleaning_ends_at = "
+        f"end_time + interval '{DEFAULT_CLEANING_MINUTES} minutes'"
+    )
+    op.alter_column("showtimes", "cleaning_ends_at", nullable=False)
+    # Fails if the hall already has overlapping showtimes; fix those first
+    op.execute(
+        "ALTER TABLE showtimes ADD CONSTRAINT ex_showtimes_cinema_hall_id_period "
+        "EXCLUDE USING gist "
+        "(cinema_hall_id WITH =, tsrange(start_time, cleaning_ends_at) WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE showtimes DROP CONSTRAINT ex_showtimes_cinema_hall_id_period"
+    )
+    op.drop_column("showtimes", "cleaning_ends_at")
@@ -0,0 +1,67 @@
+"""unique seat per showtime
+
+Revision ID: ac8d7106c984
+Revises: f83c86aae656
+Create Date: 2026-10-18 11:02:17.533190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ac8d7106c984"
+down_revision: Union[str, None] = "f83c86aae656"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "reservation_seat", sa.Column("showtime_id", sa.Integer(), nullable=True)
+    )
+    op.execute(
+        "UPDATE reservation_seat SET showtime_id = reservations.showtime_id "
+        "FROM reservations WHERE reservations.id = reservation_seat.reservation_id"
+    )
+    op.alter_column("reservation_seat", "showtime_id", nullable=False)
+    op.create_unique_constraint(
+        "uq_reservations_id_showtime_id", "reservations", ["id", "showtime_id"]
+    )
+    op.drop_constraint(
+        "reservation_seat_reservation_id_fkey", "reservation_seat", type_="foreignkey"
+    )
+    op.create_foreign_key(
+        "fk_reservation_seat_reservation",
+        "reservation_seat",
+        "reservations",
+        ["reservation_id", "showtime_id"],
+        ["id", "showtime_id"],
+        ondelete="CASCADE",
+    )
+    op.create_unique_constraint(
+        "uq_reservation_seat_showtime_id_seat_id",
+        "reservation_seat",
+        ["showtime_id", "seat_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_reservation_seat_showtime_id_seat_id", "reservation_seat", type_="unique"
+    )
+    op.drop_constraint(
+        "fk_reservation_seat_reservation", "reservation_seat", type_="foreignkey"
+    )
+    op.create_foreign_key(
+        "reservation_seat_reservation_id_fkey",
+        "reservation_seat",
+        "reservations",
+        ["reservation_id"],
+        ["id"],
+    )
+    op.drop_constraint("uq_reservations_id_showtime_id", "reservations", type_="unique")
+    op.drop_column("reservation_seat", "showtime_id")
@@ -0,0 +1,68 @@
+"""reservation archive tables
+
+Revision ID: b71c5e9a0d48
+Revises: 3f8b6d2e4a19
+Create Date: 2026-10-18 15:20:06.381452
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b71c5e9a0d48"
+down_revision: Union[str, None] = "3f8b6d2e4a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reservations_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("total_amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("showtime_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_reservations_archive_user_id_created_at",
+        "reservations_archive",
+        ["user_id", "created_at"],
+    )
+    op.create_table(
+        "reservation_seat_archive",
+        sa.Column("reservation_id", sa.Integer(), nullable=False),
+        sa.Column("seat_id", sa.Integer(), nullable=False),
+        sa.Column("showtime_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("reservation_id", "seat_id"),
+    )
+    op.create_index(
+        "ix_reservation_seat_archive_showtime_id",
+        "reservation_seat_archive",
+        ["showtime_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_reservation_seat_archive_showtime_id",
+        table_name="reservation_seat_archive",
+    )
+    op.drop_table("reservation_seat_archive")
+    op.drop_index(
+        "ix_reservations_archive_user_id_created_at",
+        table_name="reservations_archive",
+    )
+    op.drop_table("reservations_archive")
@@ -0,0 +1,66 @@
+"""movie search indexes
+
+Revision ID: c4f0a2d8e6b1
+Revises: 7d3e1f5a8b62
+Create Date: 2026-10-18 16:40:55.274310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f0a2d8e6b1"
+down_revision: Union[str, None] = "7d3e1f5a8b62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MOVIE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "movies",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(MOVIE_SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_movies_search_vector",
+            "movies",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_movies_title_trgm",
+            "movies",
+            ["title"],
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_movies_title_trgm", table_name="movies", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_movies_search_vector", table_name="movies", postgresql_concurrently=True
+        )
+    op.drop_column("movies", "search_vector")
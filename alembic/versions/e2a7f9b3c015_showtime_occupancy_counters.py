@@ -0,0 +1,42 @@
+"""showtime occupancy counters
+
+Revision ID: e2a7f9b3c015
+Revises: 9c4d2a61e7f3
+Create Date: 2026-10-18 14:15:42.108733
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a7f9b3c015"
+down_revision: Union[str, None] = "9c4d2a61e7f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for name in ("capacity", "sold", "held"):
+        op.add_column(
+            "showtimes",
+            sa.Column(name, sa.Integer(), server_default="0", nullable=False),
+        )
+    op.execute(
+        "UPDATE showtimes SET "
+        "capacity = (SELECT count(*) FROM seats "
+        "WHERE seats.cinema_hall_id = showtimes.cinema_hall_id), "
+        "sold = (SELECT count(*) FROM reservation_seat "
+        "WHERE reservation_seat.showtime_id = showtimes.id), "
+        "held = (SELECT count(*) FROM seat_hold_seat "
+        "WHERE seat_hold_seat.showtime_id = showtimes.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("showtimes", "held")
+    op.drop_column("showtimes", "sold")
+    op.drop_column("showtimes", "capacity")
@@ -0,0 +1,78 @@
+"""keyset pagination indexes for users
+
+Revision ID: f83c86aae656
+Revises: f9dfc146b1c1
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f83c86aae656"
+down_revision: Union[str, None] = "f9dfc146b1c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_created_at_id",
+            "users",
+            ["created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_role_id_created_at_id",
+            "users",
+            ["role_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_is_active_created_at_id",
+            "users",
+            ["is_active", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_username_prefix",
+            "users",
+            ["username"],
+            postgresql_ops={"username": "text_pattern_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_email_prefix",
+            "users",
+            ["email"],
+            postgresql_ops={"email": "text_pattern_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_email_prefix", table_name="users", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_users_username_prefix", table_name="users", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_users_is_active_created_at_id",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_users_role_id_created_at_id",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_users_created_at_id", table_name="users", postgresql_concurrently=True
+        )
@@ -0,0 +1,168 @@
+import hashlib
+import heapq
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from src.auth.schemas import AccessTokenData
+from src.config import settings
+
+
+class RevocationBackend(ABC):
+    """Revoked token digests, each remembered until its token expires"""
+
+    @abstractmethod
+    async def add(self, key: str, expires_at: float) -> None: ...
+
+    @abstractmethod
+    async def contains(self, key: str) -> bool: ...
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryRevocationBackend(RevocationBackend):
+    """
+    Per-process revocations. Expired entries are popped off a min-heap of
+    expiry times whenever a token is revoked, so the set never outgrows the
+    tokens that are still valid.
+    """
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+        self._expiry: list[tuple[float, str]] = []
+
+    async def add(self, key: str, expires_at: float) -> None:
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, expired = heapq.heappop(self._expiry)
+            if self._revoked.get(expired, now) <= now:
+                self._revoked.pop(expired, None)
+        if expires_at <= now:
+            return
+        self._revoked[key] = max(expires_at, self._revoked.get(key, 0.0))
+        heapq.heappush(self._expiry, (expires_at, key))
+
+    async def contains(self, key: str) -> bool:
+        revoked_until = self._revoked.get(key)
+        return revoked_until is not None and revoked_until > time.time()
+
+
+class RedisRevocationBackend(RevocationBackend):
+    """
+    Revocations shared by all workers, one key per token that expires with it.
+
+    Requires the optional `redis` package unless a ready client is passed in.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[Any] = None,
+        prefix: str = "revoked-tokens:",
+    ):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise ImportError(
+                    "The 'redis' package is required for shared token revocation"
+                ) from e
+            client = Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+
+    async def add(self, key: str, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms > 0:
+            await self._client.set(self._prefix + key, b"1", px=ttl_ms)
+
+    async def contains(self, key: str) -> bool:
+        return bool(await self._client.exists(self._prefix + key))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class AccessTokenCache:
+    """
+    Bounded LRU of verified access tokens keyed by the token's SHA-256 digest.
+
+    Every entry expires together with its token. Revocations go to
+    `revocations`, which is shared by all workers when it is backed by
+    Redis; callers check `is_revoked` before trusting a cached result. The
+    LRU itself is per process.
+    """
+
+    def __init__(self, revocations: RevocationBackend, max_size: int = 10_000):
+        self.revocations = revocations
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, AccessTokenData]] = OrderedDict()
+
+    @staticmethod
+    def digest(token: Union[str, bytes]) -> bytes:
+        if isinstance(token, str):
+            token = token.encode()
+        return hashlib.sha256(token).digest()
+
+    def get(self, token: Union[str, bytes]) -> Optional[AccessTokenData]:
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, token_data = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_data
+
+    def set(
+        self, token: Union[str, bytes], token_data: AccessTokenData, expires_at: float
+    ) -> None:
+        if self.max_size <= 0:
+            return
+        key = self.digest(token)
+        self._entries[key] = (expires_at, token_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def revoke(self, token: Union[str, bytes], expires_at: float) -> None:
+        key = self.digest(token)
+        self._entries.pop(key, None)
+        await self.revocations.add(key.hex(), expires_at)
+
+    async def is_revoked(self, token: Union[str, bytes]) -> bool:
+        return await self.revocations.contains(self.digest(token).hex())
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def create_revocation_backend() -> RevocationBackend:
+    """Revocations live next to the user cache, shared when that is Redis"""
+    if settings.user_cache_backend == "redis":
+        return RedisRevocationBackend(url=settings.user_cache_url)
+    if settings.user_cache_backend == "memory":
+        return InMemoryRevocationBackend()
+    raise ValueError(f"Unknown user cache backend {settings.user_cache_backend!r}")
+
+
+token_revocations = create_revocation_backend()
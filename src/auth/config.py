@@ -1,26 +1,53 @@
 from pathlib import Path
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
 
 class JWTSettings(BaseSettings):
+    """
+    Signing setup, read from JWT_* environment variables.
+
+    `algorithm` is one of RS256, ES256 or EdDSA and must match the key pair.
+    Tokens carry `key_id` in their header; after a rotation, list the old
+    public keys in `retired_keys` as {"<kid>": "<algorithm>:<path>"} so tokens
+    already issued keep verifying. Tokens without a kid header are matched
+    against the "default" key id.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="jwt_")
+
+    algorithm: str = "RS256"
+    key_id: str = "default"
+    public_key_path: Path = BASE_DIR / "jwt-public.pem"
+    private_key_path: Path = BASE_DIR / "jwt-private.pem"
+    retired_keys: dict[str, str] = {}
+
     _access_token_expire_minutes = 60
     _refresh_token_expire_minutes = 30 * 24 * 60
-    _public_key: Path = BASE_DIR / "jwt-public.pem"
-    _private_key: Path = BASE_DIR / "jwt-private.pem"
-    _algorithm: str = "RS256"
+    _access_token_cache_size = 10_000
 
     def get_public_key(self) -> str:
-        return self._public_key.read_text()
+        return self.public_key_path.read_text()
 
     def get_private_key(self) -> str:
-        return self._private_key.read_text()
+        return self.private_key_path.read_text()
 
     def get_algorithm(self) -> str:
-        return self._algorithm
+        return self.algorithm
+
+    def get_key_id(self) -> str:
+        return self.key_id
+
+    def get_retired_keys(self) -> dict[str, tuple[str, str]]:
+        """Map of kid -> (algorithm, public key PEM) for rotated-out keys"""
+        retired = {}
+        for key_id, spec in self.retired_keys.items():
+            algorithm, _, path = spec.partition(":")
+            retired[key_id] = (algorithm, Path(path).read_text())
+        return retired
 
     def get_access_token_expires_in_minutes(self) -> int:
         return self._access_token_expire_minutes
@@ -28,5 +55,8 @@ class JWTSettings(BaseSettings):
     def get_refresh_token_expires_in_minutes(self) -> int:
         return self._refresh_token_expire_minutes
 
+    def get_access_token_cache_size(self) -> int:
+        return self._access_token_cache_size
+
 
 jwt_settings = JWTSettings()
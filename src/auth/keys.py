@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+
+from src.auth.config import JWTSettings
+
+
+DEFAULT_KEY_ID = "default"
+
+KEY_TYPES = {
+    "RS256": (rsa.RSAPublicKey,),
+    "ES256": (ec.EllipticCurvePublicKey,),
+    "EdDSA": (ed25519.Ed25519PublicKey, ed448.Ed448PublicKey),
+}
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    key_id: str
+    algorithm: str
+    public_key: Any
+
+
+def load_public_key(algorithm: str, pem: str) -> Any:
+    if algorithm not in KEY_TYPES:
+        raise ValueError(f"Unsupported JWT algorithm {algorithm!r}")
+    public_key = load_pem_public_key(pem.encode())
+    if not isinstance(public_key, KEY_TYPES[algorithm]):
+        raise ValueError(f"Key type does not match JWT algorithm {algorithm!r}")
+    return public_key
+
+
+class KeyRing:
+    """
+    Key objects parsed once at startup.
+
+    Holds the active signing key and every public key still accepted for
+    verification, indexed by key id, so PyJWT never re-parses PEM text.
+    """
+
+    def __init__(
+        self,
+        key_id: str,
+        algorithm: str,
+        private_key: Any,
+        verification_keys: dict[str, VerificationKey],
+    ):
+        self.key_id = key_id
+        self.algorithm = algorithm
+        self.private_key = private_key
+        self._verification_keys = verification_keys
+
+    @classmethod
+    def from_settings(cls, settings: JWTSettings) -> "KeyRing":
+        key_id = settings.get_key_id()
+        algorithm = settings.get_algorithm()
+        verification_keys = {
+            retired_id: VerificationKey(
+                retired_id, retired_algorithm, load_public_key(retired_algorithm, pem)
+            )
+            for retired_id, (retired_algorithm, pem) in (
+                settings.get_retired_keys().items()
+            )
+        }
+        verification_keys[key_id] = VerificationKey(
+            key_id, algorithm, load_public_key(algorithm, settings.get_public_key())
+        )
+        private_key = load_pem_private_key(
+            settings.get_private_key().encode(), password=None
+        )
+        return cls(key_id, algorithm, private_key, verification_keys)
+
+    def get_verification_key(self, key_id: Optional[str]) -> VerificationKey:
+        key = self._verification_keys.get(key_id or DEFAULT_KEY_ID)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {key_id!r}")
+        return key
@@ -1,17 +1,16 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.security import (
     OAuth2PasswordRequestForm,
     HTTPBearer,
+    HTTPAuthorizationCredentials,
 )
-from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.responses import Response
 
-from src.database import get_async_db_session
 from src.auth.schemas import AccessToken, SignUpScheme
-from src.dependencies import auth_service
+from src.dependencies import auth_service, DBSession
 from src.users.repository import UsersRepository
 from src.users.schemas import UserResponse, UserCreateRequest
 
@@ -25,7 +24,7 @@ router = APIRouter(tags=["auth"])
     response_model=SignUpScheme,
 )
 async def signup(
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
+    db: DBSession,
     new_user: UserCreateRequest,
     response: Response,
 ) -> SignUpScheme:
@@ -47,7 +46,7 @@ async def signup(
 
 @router.post("/token/", status_code=status.HTTP_200_OK, response_model=AccessToken)
 async def login_for_access_token(
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
+    db: DBSession,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     response: Response,
 ) -> AccessToken:
@@ -66,14 +65,21 @@ async def login_for_access_token(
 
 
 @router.post("/logout/", status_code=status.HTTP_204_NO_CONTENT)
-async def logout(response: Response) -> None:
+async def logout(
+    response: Response,
+    credentials: Annotated[
+        Optional[HTTPAuthorizationCredentials], Depends(http_bearer)
+    ],
+) -> None:
+    if credentials:
+        await auth_service.revoke_access_token(credentials.credentials)
     response.delete_cookie("refresh_token")
     return None
 
 
 @router.post("/refresh/", status_code=status.HTTP_200_OK)
 async def refresh_access_token(
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
+    db: DBSession,
     request: Request,
 ) -> AccessToken:
     refresh_token = auth_service.get_refresh_token_from_request(request)
@@ -1,11 +1,13 @@
 import jwt
 from datetime import timedelta, datetime, timezone
-from typing import Union
+from typing import Union, Optional
 
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 
+from src.auth.cache import AccessTokenCache, token_revocations
+from src.auth.keys import KeyRing
 from src.auth.constants import TOKEN_TYPE_FIELD, ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE
 from src.auth.exceptions import (
     WrongCredentialError,
@@ -15,17 +17,18 @@ from src.auth.exceptions import (
     InvalidTokenDataError,
 )
 from src.auth.schemas import AccessTokenData, RefreshTokenData
+from src.users.cache import user_cache
 from src.users.repository import UsersRepository
-from src.users.schemas import UserResponse, RawUserResponse
+from src.users.schemas import UserResponse, RawUserResponse, UserSnapshot
 from src.auth.config import jwt_settings
-from src.utils.passwords import verify_pwd
+from src.database import sessionmanager
+from src.utils.passwords import password_hasher
 
 
 class AuthenticationService:
     def __init__(self):
-        self.private_key = jwt_settings.get_private_key()
-        self.public_key = jwt_settings.get_public_key()
-        self.algorithm = jwt_settings.get_algorithm()
+        self.keys = KeyRing.from_settings(jwt_settings)
+        self.algorithm = self.keys.algorithm
         self.access_token_expire_minutes = (
             jwt_settings.get_access_token_expires_in_minutes()
         )
@@ -33,13 +36,23 @@ class AuthenticationService:
             jwt_settings.get_refresh_token_expires_in_minutes()
         )
         self.cookie_expire_seconds = self.refresh_token_expire_minutes * 60
+        self.token_cache = AccessTokenCache(
+            token_revocations, max_size=jwt_settings.get_access_token_cache_size()
+        )
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
     def encode_jwt(self, payload: dict) -> str:
-        return jwt.encode(payload, self.private_key, algorithm=self.algorithm)
+        return jwt.encode(
+            payload,
+            self.keys.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.keys.key_id},
+        )
 
     def decode_jwt(self, token: Union[str, bytes]) -> dict:
-        return jwt.decode(token, self.public_key, algorithms=[self.algorithm])
+        header = jwt.get_unverified_header(token)
+        key = self.keys.get_verification_key(header.get("kid"))
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
 
     def create_token(
         self,
@@ -117,15 +130,40 @@ class AuthenticationService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-    def verify_access_token(self, token: Union[str, bytes]) -> AccessTokenData:
+    async def verify_access_token(self, token: Union[str, bytes]) -> AccessTokenData:
+        """
+        Verify an access token, skipping the signature check for tokens that
+        were already verified and are still cached.
+        """
+        if await self.token_cache.is_revoked(token):
+            raise WrongCredentialError(
+                detail="Wrong credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_data = self.token_cache.get(token)
+        if token_data is not None:
+            return token_data
+
         payload = self.verify_token(token=token, token_type=ACCESS_TOKEN_TYPE)
-        return AccessTokenData(
+        token_data = AccessTokenData(
             id=payload.get("sub_id"),
             username=payload.get("sub"),
             role=payload.get("role"),
             issued_at=payload.get("iat"),
             expires_in=payload.get("exp"),
         )
+        self.token_cache.set(token, token_data, payload["exp"])
+        return token_data
+
+    async def revoke_access_token(self, token: Union[str, bytes]) -> None:
+        """Reject the token from now on, even if it is still cached"""
+        try:
+            payload = self.decode_jwt(token)
+        except jwt.InvalidTokenError:
+            return
+        expire_at = payload.get("exp")
+        if expire_at is not None:
+            await self.token_cache.revoke(token, expire_at)
 
     def verify_refresh_token(self, token: Union[str, bytes]) -> RefreshTokenData:
         payload = self.verify_token(token=token, token_type=REFRESH_TOKEN_TYPE)
@@ -139,7 +177,7 @@ class AuthenticationService:
         self, db: AsyncSession, refresh_token: Union[str, bytes]
     ) -> str:
         token_data = self.verify_refresh_token(refresh_token)
-        user = await self.get_user(db, token_data.username)
+        user = await self.get_cached_user(db, token_data.username)
         self.is_user_active(user)
         if not user:
             raise WrongCredentialError(detail="Wrong credentials")
@@ -151,8 +189,38 @@ class AuthenticationService:
         user = await user_repository.get_user_by_name(username=username)
         return RawUserResponse.model_validate(user)
 
+    @classmethod
+    async def get_cached_user(
+        cls, db: AsyncSession, username: str, user_id: Optional[int] = None
+    ) -> UserSnapshot:
+        """
+        The user without the password hash, from the user cache and looked up
+        by id when it is known. Password checks use `get_user` instead.
+        """
+        if user_id is not None:
+            user = await user_cache.get_by_id(user_id)
+        else:
+            user = await user_cache.get_by_name(username)
+        if user is None:
+            user = await cls.load_user_snapshot(db, username)
+            await user_cache.set(user)
+        return user
+
+    @staticmethod
+    async def load_user_snapshot(db: AsyncSession, username: str) -> UserSnapshot:
+        """
+        Cache fills read the primary: a lagging replica could put back a user
+        who was just deactivated or demoted, for the whole cache TTL.
+        """
+        if db.info.get("replica") is None:
+            user = await UsersRepository(db).get_user_by_name(username=username)
+            return UserSnapshot.model_validate(user)
+        async with sessionmanager.session() as primary:
+            user = await UsersRepository(primary).get_user_by_name(username=username)
+            return UserSnapshot.model_validate(user)
+
     @staticmethod
-    def is_user_active(user: RawUserResponse) -> bool:
+    def is_user_active(user: UserResponse) -> bool:
         if not user.is_active:
             raise UserInactiveError(detail="User is inactive")
         return True
@@ -161,21 +229,33 @@ class AuthenticationService:
         self, db: AsyncSession, username: str, password: str
     ) -> UserResponse:
         user = await self.get_user(db, username)
-        is_valid_pwd = verify_pwd(password, user.password)
+        is_valid_pwd, new_hash = await password_hasher.verify_and_update(
+            password, user.password
+        )
         if not (user and is_valid_pwd and self.is_user_active(user)):
             raise WrongCredentialError(detail="Wrong credentials")
+        if new_hash:
+            await UsersRepository(db).update_password(user.id, new_hash)
         return UserResponse.model_validate(user)
 
     async def get_user_from_access_token(
         self, db: AsyncSession, token: Union[str, bytes]
-    ) -> RawUserResponse:
-        token_data = self.verify_access_token(token)
-        user = await self.get_user(db, username=token_data.username)
+    ) -> UserSnapshot:
+        token_data = await self.verify_access_token(token)
+        return await self.get_user_from_token_data(db, token_data)
+
+    async def get_user_from_token_data(
+        self, db: AsyncSession, token_data: AccessTokenData
+    ) -> UserSnapshot:
+        user = await self.get_cached_user(
+            db, username=token_data.username, user_id=token_data.id
+        )
         if not user:
             raise WrongCredentialError(
                 detail="Wrong credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        self.is_user_active(user)
         return user
 
     @staticmethod
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings
 
@@ -12,12 +14,77 @@ class Settings(BaseSettings):
     db_port: int
     db_name: str
 
-    def get_database_url(self) -> str:
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+
+    # Read replicas as "host" or "host:port", sharing the primary's credentials
+    db_replica_hosts: list[str] = []
+    db_replica_strategy: str = "round_robin"
+    db_replica_retry_seconds: float = 30.0
+    db_read_your_writes_seconds: float = 5.0
+
+    # "thread" or "process" pool used for bcrypt hashing and verification
+    pwd_hash_executor: str = "thread"
+    pwd_hash_workers: int = 4
+
+    # "memory" or "redis" (needs user_cache_url); access token revocations
+    # (logout) are kept in the same place. The memory backend is per worker:
+    # with several workers, deactivating a user or logging out only takes
+    # effect in the others after user_cache_ttl_seconds or the token's expiry,
+    # so multi-worker deployments should use redis.
+    user_cache_backend: str = "memory"
+    user_cache_url: Optional[str] = None
+    user_cache_ttl_seconds: float = 60.0
+    user_cache_max_size: int = 10_000
+
+    # Idempotency-Key store: "memory" (per worker) or "redis" (shared, needs
+    # idempotency_url). Keys are remembered for idempotency_ttl_seconds.
+    idempotency_backend: str = "memory"
+    idempotency_url: Optional[str] = None
+    idempotency_ttl_seconds: float = 24 * 60 * 60
+    idempotency_max_keys: int = 100_000
+
+    # Live seat map updates between workers: "local" (single worker) or
+    # "redis" (pub/sub, needs seat_feed_url)
+    seat_feed_backend: str = "local"
+    seat_feed_url: Optional[str] = None
+
+    def _build_database_url(self, host: str, port: int) -> str:
         return (
             f"{self.db_driver}://{self.db_user}:{self.db_pwd.get_secret_value()}@"
-            f"{self.db_host}:{self.db_port}/{self.db_name}"
+            f"{host}:{port}/{self.db_name}"
         )
 
+    def get_database_url(self) -> str:
+        return self._build_database_url(self.db_host, self.db_port)
+
+    def get_replica_urls(self) -> list[str]:
+        urls = []
+        for replica in self.db_replica_hosts:
+            host, _, port = replica.partition(":")
+            urls.append(self._build_database_url(host, int(port or self.db_port)))
+        return urls
+
+    def get_replica_options(self) -> dict:
+        return {
+            "replica_urls": self.get_replica_urls(),
+            "replica_strategy": self.db_replica_strategy,
+            "replica_retry_seconds": self.db_replica_retry_seconds,
+            "read_your_writes_seconds": self.db_read_your_writes_seconds,
+        }
+
+    def get_engine_options(self) -> dict:
+        return {
+            "echo": self.db_echo,
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_pre_ping": self.db_pool_pre_ping,
+            "pool_recycle": self.db_pool_recycle,
+        }
+
     def get_secret_key(self) -> str:
         return self.secret_key.get_secret_value()
 
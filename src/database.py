@@ -1,8 +1,9 @@
-from typing import Optional, AsyncIterator
+import time
+from typing import Optional, AsyncIterator, Hashable, Sequence, Callable, Awaitable
 from contextlib import asynccontextmanager
 
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, DBAPIError, OperationalError, InterfaceError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -11,26 +12,177 @@ from sqlalchemy.ext.asyncio import (
     AsyncConnection,
 )
 
-from src.config import settings
+
+ROUND_ROBIN = "round_robin"
+LEAST_BUSY = "least_busy"
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    Run `callback` once the unit of work owning `session` has committed.
+
+    Callbacks are dropped on rollback, so in-process state (caches, indexes)
+    only ever reflects committed data.
+    """
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+async def run_commit_callbacks(session: AsyncSession) -> None:
+    for callback in session.info.pop("on_commit", []):
+        await callback()
+
+
 class DBAsyncSessionManager:
-    def __init__(self, url: str):
-        self._engine: Optional[AsyncEngine] = create_async_engine(url, echo=True)
-        self._sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    """
+    Owns the process-wide engines (and so the connection pools) and the
+    sessionmaker used to open sessions on them.
+
+    The manager is created empty at import time and initialised once by the
+    application lifespan, so every request reuses pooled connections instead
+    of opening a new one.
+
+    Besides the primary it can hold any number of read replicas. Read-only
+    sessions are routed to a healthy replica, except for callers that wrote
+    to the primary within the read-your-writes window. A replica that fails
+    to connect is skipped for `replica_retry_seconds`; with no healthy replica
+    reads go to the primary. Both the write window and replica health are
+    tracked per process.
+    """
+
+    def __init__(self, url: Optional[str] = None, **options):
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+        self._replicas: list[AsyncEngine] = []
+        self._replica_down_until: list[float] = []
+        self._next_replica = 0
+        self._replica_strategy = ROUND_ROBIN
+        self._read_your_writes_seconds = 0.0
+        self._replica_retry_seconds = 0.0
+        self._recent_writes: dict[Hashable, float] = {}
+        if url is not None:
+            self.init(url, **options)
+
+    def init(
+        self,
+        url: str,
+        replica_urls: Sequence[str] = (),
+        replica_strategy: str = ROUND_ROBIN,
+        read_your_writes_seconds: float = 0.0,
+        replica_retry_seconds: float = 30.0,
+        **engine_options,
+    ) -> None:
+        if replica_strategy not in (ROUND_ROBIN, LEAST_BUSY):
+            raise ValueError(f"Unknown replica strategy {replica_strategy!r}")
+
+        self._engine = create_async_engine(url, **engine_options)
+        self._sessionmaker = async_sessionmaker(
             autocommit=False, bind=self._engine, expire_on_commit=False
         )
+        self._replicas = [
+            create_async_engine(replica_url, **engine_options)
+            for replica_url in replica_urls
+        ]
+        self._replica_down_until = [0.0] * len(self._replicas)
+        self._next_replica = 0
+        self._replica_strategy = replica_strategy
+        self._read_your_writes_seconds = read_your_writes_seconds
+        self._replica_retry_seconds = replica_retry_seconds
+        self._recent_writes = {}
 
     async def close(self) -> None:
         if not self._engine:
             raise SQLAlchemyError
+        for replica in self._replicas:
+            await replica.dispose()
         await self._engine.dispose()
         self._engine = None
         self._sessionmaker = None
+        self._replicas = []
+        self._replica_down_until = []
+
+    def mark_written(self, key: Hashable) -> None:
+        """Route `key`'s reads to the primary for the read-your-writes window"""
+        if self._read_your_writes_seconds <= 0:
+            return
+        now = time.monotonic()
+        # Re-inserting keeps the dict ordered by deadline, so expired entries
+        # of keys that never read again are dropped from the front here
+        self._recent_writes.pop(key, None)
+        self._recent_writes[key] = now + self._read_your_writes_seconds
+        for stale_key, deadline in list(self._recent_writes.items()):
+            if deadline > now:
+                break
+            del self._recent_writes[stale_key]
+
+    def _has_recent_write(self, key: Optional[Hashable], now: float) -> bool:
+        if key is None:
+            return False
+        deadline = self._recent_writes.get(key)
+        if deadline is None:
+            return False
+        if deadline <= now:
+            del self._recent_writes[key]
+            return False
+        return True
+
+    def _pick_replica(self, sticky_key: Optional[Hashable]) -> Optional[int]:
+        now = time.monotonic()
+        if not self._replicas or self._has_recent_write(sticky_key, now):
+            return None
+
+        healthy = [
+            index
+            for index, down_until in enumerate(self._replica_down_until)
+            if down_until <= now
+        ]
+        if not healthy:
+            return None
+
+        if self._replica_strategy == LEAST_BUSY:
+            return min(healthy, key=self._replica_load)
+
+        count = len(self._replicas)
+        for offset in range(count):
+            index = (self._next_replica + offset) % count
+            if index in healthy:
+                self._next_replica = (index + 1) % count
+                return index
+        return None
+
+    def _replica_load(self, index: int) -> int:
+        checkedout = getattr(self._replicas[index].pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+    def _mark_replica_down(self, index: int) -> None:
+        self._replica_down_until[index] = time.monotonic() + self._replica_retry_seconds
+
+    @staticmethod
+    def is_connection_error(error: Exception) -> bool:
+        return isinstance(error, (OperationalError, InterfaceError)) or (
+            isinstance(error, DBAPIError) and error.connection_invalidated
+        )
+
+    async def fail_over(self, session: AsyncSession, error: Exception) -> bool:
+        """
+        Move a replica session that hit `error` to the primary.
+
+        On a connection error the replica is marked down and the session is
+        rolled back and rebound to the primary, so the caller can retry its
+        read within the same request. Returns False when there is nothing to
+        fail over, and the error should be handled as usual.
+        """
+        replica = session.info.get("replica")
+        if replica is None or not self.is_connection_error(error):
+            return False
+        self._mark_replica_down(replica)
+        await session.rollback()
+        del session.info["replica"]
+        session.sync_session.bind = self._engine.sync_engine
+        return True
 
     @asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
@@ -45,21 +197,74 @@ class DBAsyncSessionManager:
                 raise e
 
     @asynccontextmanager
-    async def session(self) -> AsyncIterator[AsyncSession]:
+    async def session(
+        self, read_only: bool = False, sticky_key: Optional[Hashable] = None
+    ) -> AsyncIterator[AsyncSession]:
         if not self._sessionmaker:
             raise SQLAlchemyError
 
-        async with self._sessionmaker() as session:
+        replica = self._pick_replica(sticky_key) if read_only else None
+        bind = self._engine if replica is None else self._replicas[replica]
+
+        async with self._sessionmaker(bind=bind) as session:
+            if replica is not None:
+                session.info["replica"] = replica
             try:
                 yield session
             except SQLAlchemyError as e:
+                replica = session.info.get("replica")
+                if replica is not None and self.is_connection_error(e):
+                    self._mark_replica_down(replica)
                 await session.rollback()
                 raise e
             finally:
                 await session.close()
 
+    @asynccontextmanager
+    async def unit_of_work(
+        self, read_only: bool = False, sticky_key: Optional[Hashable] = None
+    ) -> AsyncIterator[AsyncSession]:
+        """
+        Transaction boundary for a single request.
+
+        The session does not hold a pooled connection until its first
+        statement runs (autobegin), so dependencies that never touch the
+        database never check one out. Work is committed once when the block
+        exits cleanly and rolled back on any error.
+
+        `sticky_key` identifies the caller: a committed write opens its
+        read-your-writes window, and read-only work inside that window stays
+        on the primary.
+        """
+        async with self.session(read_only, sticky_key) as session:
+            try:
+                yield session
+            except Exception:
+                session.info.pop("on_commit", None)
+                await session.rollback()
+                raise
+            if session.in_transaction():
+                await session.commit()
+                if not read_only and sticky_key is not None:
+                    self.mark_written(sticky_key)
+            await run_commit_callbacks(session)
+
+
+sessionmanager = DBAsyncSessionManager()
+
 
 async def get_async_db_session() -> AsyncSession:
-    sessionmanager = DBAsyncSessionManager(settings.get_database_url())
-    async with sessionmanager.session() as session:
+    """
+    Request-scoped unit of work.
+
+    FastAPI caches dependency results per request, so every dependency that
+    asks for this one receives the same session and shares one transaction.
+    """
+    async with sessionmanager.unit_of_work() as session:
+        yield session
+
+
+async def get_async_read_db_session() -> AsyncSession:
+    """Request-scoped unit of work routed to a read replica when one is healthy"""
+    async with sessionmanager.unit_of_work(read_only=True) as session:
         yield session
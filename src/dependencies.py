@@ -1,20 +1,29 @@
-from typing import Annotated, Union, Any
+from typing import Annotated, Optional, Union, Any
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException
+from fastapi.security.utils import get_authorization_scheme_param
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
 
 from src.auth.schemas import AccessTokenData
 from src.auth.services import AuthenticationService
 from src.auth.exceptions import UnauthorizedError
 from src.users.models import RoleName
-from src.users.schemas import RawUserResponse
-from src.database import get_async_db_session
+from src.users.schemas import UserSnapshot
+from src.database import (
+    get_async_db_session,
+    get_async_read_db_session,
+    sessionmanager,
+)
 
 
 auth_service = AuthenticationService()
 
+DBSession = Annotated[AsyncSession, Depends(get_async_db_session)]
+ReadDBSession = Annotated[AsyncSession, Depends(get_async_read_db_session)]
 
-def get_current_user_from_jwt(
+
+async def get_current_user_from_jwt(
     token: Annotated[Union[str, bytes], Depends(auth_service.oauth2_scheme)],
 ) -> AccessTokenData:
     """
@@ -23,18 +32,66 @@ def get_current_user_from_jwt(
     This dependency extracts the JWT token from the request using the OAuth2
     authentication scheme and verifies its validity.
     """
-    return auth_service.verify_access_token(token)
+    return await auth_service.verify_access_token(token)
+
+
+async def get_caller_id(headers: Headers) -> Optional[str]:
+    """
+    Id of the user whose valid bearer token the request carries, None for
+    anonymous callers and invalid tokens.
+
+    Used outside dependency injection, by middleware that scopes state per user.
+    """
+    scheme, token = get_authorization_scheme_param(headers.get("authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        token_data = await auth_service.verify_access_token(token)
+    except HTTPException:
+        return None
+    return str(token_data.id)
+
+
+async def get_user_db_session(
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+) -> AsyncSession:
+    """
+    Unit of work on the primary for writes made by the current user.
+
+    Committing it opens the user's read-your-writes window, so their next
+    reads are served by the primary instead of a possibly lagging replica.
+    """
+    async with sessionmanager.unit_of_work(sticky_key=current_user.id) as session:
+        yield session
+
+
+async def get_user_read_db_session(
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+) -> AsyncSession:
+    """
+    Read-only unit of work for the current user.
+
+    Routed to a replica unless the user wrote within the read-your-writes window.
+    """
+    async with sessionmanager.unit_of_work(
+        read_only=True, sticky_key=current_user.id
+    ) as session:
+        yield session
+
+
+UserDBSession = Annotated[AsyncSession, Depends(get_user_db_session)]
+UserReadDBSession = Annotated[AsyncSession, Depends(get_user_read_db_session)]
 
 
 async def get_current_user_from_db(
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
-    token: Annotated[Union[str, bytes], Depends(auth_service.oauth2_scheme)],
-) -> RawUserResponse:
+    db: UserReadDBSession,
+    token_data: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+) -> UserSnapshot:
     """
     Extends get_current_user dependency.
     Fetch the user's details from the database using the token's information.
     """
-    return await auth_service.get_user_from_access_token(db, token)
+    return await auth_service.get_user_from_token_data(db, token_data)
 
 
 def requires_roles(*roles: RoleName) -> Any:
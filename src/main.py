@@ -1,24 +1,67 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI
 
+from src.config import settings
+from src.auth.cache import token_revocations
+from src.database import sessionmanager
+from src.dependencies import get_caller_id
+from src.reservations.holds import hold_expiry
+from src.reservations.live import seat_feed
+from src.users.bulk_import import import_pool
+from src.users.cache import user_cache
+from src.utils.idempotency import IdempotencyMiddleware, idempotency_backend
+from src.utils.passwords import password_hasher
 from src.auth.routes import router as auth_router
+from src.movies.routes.movie_routes import router as movies_router
+from src.movies.routes.schedule_routes import router as schedule_router
+from src.movies.routes.showtime_routes import router as showtimes_router
+from src.reservations.routes.hold_routes import router as holds_router
+from src.reservations.routes.pricing_routes import router as pricing_router
+from src.reservations.routes.reservation_routes import router as reservations_router
+from src.reservations.routes.seat_routes import router as seats_router
 from src.users.routes.admin_routes import router as admin_router
 from src.users.routes.user_routes import router as users_router
 
 
-# @asynccontextmanager
-# async def lifespan(_: FastAPI):
-#     """Startup and shutdown events handler"""
-#     db_session_manager = DBAsyncSessionManager(settings.get_database_url())
-#     async with db_session_manager.session() as session:
-#         *ON STARTUP ACTIONS*
-#         yield
-#         *ON SHUTDOWN ACTIONS*
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Startup and shutdown events handler"""
+    sessionmanager.init(
+        settings.get_database_url(),
+        **settings.get_replica_options(),
+        **settings.get_engine_options(),
+    )
+    import_pool.start()
+    await hold_expiry.start()
+    await seat_feed.start()
+    yield
+    await seat_feed.stop()
+    await hold_expiry.stop()
+    await sessionmanager.close()
+    await user_cache.close()
+    await token_revocations.close()
+    await idempotency_backend.close()
+    await password_hasher.shutdown()
+    await import_pool.stop()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    IdempotencyMiddleware,
+    backend=idempotency_backend,
+    ttl=settings.idempotency_ttl_seconds,
+    identify=get_caller_id,
+)
 
 
 app.include_router(auth_router)
 app.include_router(admin_router)
 app.include_router(users_router)
+app.include_router(movies_router)
+app.include_router(showtimes_router)
+app.include_router(schedule_router)
+app.include_router(seats_router)
+app.include_router(pricing_router)
+app.include_router(reservations_router)
+app.include_router(holds_router)
@@ -0,0 +1,30 @@
+# Default gap after a show's end before the hall can be used again
+SHOWTIME_CLEANING_MINUTES = 20
+SHOWTIME_MAX_CLEANING_MINUTES = 120
+# At most this many start times per day in a weekly schedule request
+SHOWTIME_MAX_DAILY_STARTS = 12
+
+MOVIES_PAGE_SIZE = 20
+MOVIES_MAX_PAGE_SIZE = 50
+# Showtimes listed with each movie, counted from now
+MOVIE_UPCOMING_SHOWTIMES_DAYS = 7
+
+MOVIE_SEARCH_MAX_RESULTS = 50
+# Minimum trigram similarity for the in-process search fallback, the same
+# default as pg_trgm.similarity_threshold
+MOVIE_SEARCH_MIN_SIMILARITY = 0.3
+MOVIE_SEARCH_INDEX_TTL_SECONDS = 5 * 60
+
+HALL_SCHEDULE_CACHE_SIZE = 200
+HALL_SCHEDULE_TTL_SECONDS = 60.0
+
+# Snapshots of the daily schedule: how many dates are kept, and how long
+# a snapshot is served before it is rebuilt to pick up other workers' edits
+SCHEDULE_SNAPSHOT_MAX_DAYS = 31
+SCHEDULE_SNAPSHOT_TTL_SECONDS = 60.0
+
+# Genre facet counts scoped to showtimes may cover at most this many days
+GENRE_FACETS_MAX_RANGE_DAYS = 31
+GENRE_FACETS_TTL_SECONDS = 5 * 60
+# Reloads redone at most this many times when edits land while they run
+GENRE_FACETS_RELOAD_ATTEMPTS = 3
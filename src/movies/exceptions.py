@@ -0,0 +1,73 @@
+from typing import Optional, Any
+
+from starlette import status
+from fastapi import HTTPException
+
+
+class MovieNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class CinemaHallNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class ShowtimeNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class ShowtimeOverlapError(HTTPException):
+    def __init__(self, detail: Any, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT, detail=detail, headers=headers
+        )
+
+
+class ShowtimeInUseError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT, detail=detail, headers=headers
+        )
+
+
+class ShowtimeInPastError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail,
+            headers=headers,
+        )
+
+
+class InvalidCursorError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail,
+            headers=headers,
+        )
+
+
+class GenreNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class InvalidDateRangeError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail,
+            headers=headers,
+        )
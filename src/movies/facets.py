@@ -0,0 +1,195 @@
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import on_commit
+from src.movies.constants import (
+    GENRE_FACETS_MAX_RANGE_DAYS,
+    GENRE_FACETS_RELOAD_ATTEMPTS,
+    GENRE_FACETS_TTL_SECONDS,
+)
+from src.movies.models import Genre, MovieGenre, Showtime
+from src.movies.schemas import GenreFacet
+
+
+class GenreFacets:
+    """
+    Movie counts per genre for catalog filters, kept in memory.
+
+    Holds the genre titles, every movie's genres and the catalog-wide
+    count per genre, plus, for each upcoming date asked about, how many
+    showtimes each movie has that day. Counts scoped to a date range are
+    derived from those day counters without touching the database.
+
+    Links, unlinks and showtime edits made through this worker are applied
+    incrementally after commit; everything is reloaded after `ttl` seconds
+    to pick up edits made through other workers. Each edit bumps a
+    generation counter, and a reload that an edit raced is redone, since
+    its queries may predate the edit and would overwrite it.
+    """
+
+    def __init__(self, ttl: float = GENRE_FACETS_TTL_SECONDS):
+        self.ttl = ttl
+        self._loaded_at: Optional[float] = None
+        self._titles: dict[int, str] = {}
+        self._movie_genres: dict[int, set[int]] = defaultdict(set)
+        self._counts: Counter[int] = Counter()
+        self._days: dict[date, Counter[int]] = {}
+        self._generation = 0
+
+    async def _ensure_loaded(self, db: AsyncSession) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at <= self.ttl:
+            return
+        for _ in range(GENRE_FACETS_RELOAD_ATTEMPTS):
+            generation = self._generation
+            genres = await db.execute(select(Genre.id, Genre.title))
+            links = await db.execute(select(MovieGenre.movie_id, MovieGenre.genre_id))
+            if self._generation == generation:
+                break
+        self._titles = dict(genres.all())
+        self._movie_genres = defaultdict(set)
+        self._counts = Counter()
+        for movie_id, genre_id in links.all():
+            self._movie_genres[movie_id].add(genre_id)
+            self._counts[genre_id] += 1
+        self._days = {}
+        # Still raced after every attempt: serve it, but reload next time
+        self._loaded_at = time.monotonic() if self._generation == generation else None
+
+    async def _load_days(self, db: AsyncSession, days: list[date]) -> None:
+        missing = [day for day in days if day not in self._days]
+        if not missing:
+            return
+        start = datetime.combine(min(missing), datetime.min.time())
+        end = datetime.combine(max(missing) + timedelta(days=1), datetime.min.time())
+        for _ in range(GENRE_FACETS_RELOAD_ATTEMPTS):
+            generation = self._generation
+            db_response = await db.execute(
+                select(Showtime.start_time, Showtime.movie_id).where(
+                    Showtime.start_time >= start, Showtime.start_time < end
+                )
+            )
+            rows = db_response.all()
+            if self._generation == generation:
+                break
+        else:
+            # Still raced after every attempt: serve it, but reload next time
+            self._loaded_at = None
+        loaded = {day: Counter() for day in missing}
+        for start_time, movie_id in rows:
+            counter = loaded.get(start_time.date())
+            if counter is not None:
+                counter[movie_id] += 1
+        self._days.update(loaded)
+        today = date.today()
+        for day in [day for day in self._days if day < today]:
+            del self._days[day]
+
+    async def get(
+        self,
+        db: AsyncSession,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> list[GenreFacet]:
+        """
+        Per genre, the number of movies in the catalog or, with a date
+        range, the number of movies with a showtime in it. Most common first.
+        """
+        await self._ensure_loaded(db)
+        if date_from is None and date_to is None:
+            counts = self._counts
+        else:
+            # Past days are not kept, so a range starting before today
+            # counts from today
+            date_from = max(date_from or date.today(), date.today())
+            date_to = date_to or date_from + timedelta(
+                days=GENRE_FACETS_MAX_RANGE_DAYS - 1
+            )
+            days = [
+                date_from + timedelta(days=offset)
+                for offset in range((date_to - date_from).days + 1)
+            ]
+            await self._load_days(db, days)
+            movie_ids = set()
+            for day in days:
+                movie_ids.update(self._days.get(day, ()))
+            counts = Counter()
+            for movie_id in movie_ids:
+                counts.update(self._movie_genres.get(movie_id, ()))
+
+        return sorted(
+            (
+                GenreFacet(id=genre_id, title=title, count=counts.get(genre_id, 0))
+                for genre_id, title in self._titles.items()
+            ),
+            key=lambda facet: (-facet.count, facet.title),
+        )
+
+    def link(self, movie_id: int, genre_id: int, title: str) -> None:
+        self._generation += 1
+        self._titles.setdefault(genre_id, title)
+        if genre_id not in self._movie_genres[movie_id]:
+            self._movie_genres[movie_id].add(genre_id)
+            self._counts[genre_id] += 1
+
+    def unlink(self, movie_id: int, genre_id: int) -> None:
+        self._generation += 1
+        genres = self._movie_genres.get(movie_id)
+        if genres is not None and genre_id in genres:
+            genres.discard(genre_id)
+            self._counts[genre_id] -= 1
+
+    def add_showtimes(self, showtimes: Iterable[tuple[date, int]]) -> None:
+        self._generation += 1
+        for day, movie_id in showtimes:
+            counter = self._days.get(day)
+            if counter is not None:
+                counter[movie_id] += 1
+
+    def remove_showtime(self, day: date, movie_id: int) -> None:
+        self._generation += 1
+        counter = self._days.get(day)
+        if counter is not None:
+            counter[movie_id] -= 1
+            if counter[movie_id] <= 0:
+                del counter[movie_id]
+
+    def link_on_commit(
+        self, db: AsyncSession, movie_id: int, genre_id: int, title: str
+    ) -> None:
+        async def link_committed() -> None:
+            self.link(movie_id, genre_id, title)
+
+        on_commit(db, link_committed)
+
+    def unlink_on_commit(self, db: AsyncSession, movie_id: int, genre_id: int) -> None:
+        async def unlink_committed() -> None:
+            self.unlink(movie_id, genre_id)
+
+        on_commit(db, unlink_committed)
+
+    def add_showtimes_on_commit(
+        self, db: AsyncSession, showtimes: Iterable[tuple[date, int]]
+    ) -> None:
+        showtimes = tuple(showtimes)
+
+        async def add_committed() -> None:
+            self.add_showtimes(showtimes)
+
+        on_commit(db, add_committed)
+
+    def remove_showtime_on_commit(
+        self, db: AsyncSession, day: date, movie_id: int
+    ) -> None:
+        async def remove_committed() -> None:
+            self.remove_showtime(day, movie_id)
+
+        on_commit(db, remove_committed)
+
+
+genre_facets = GenreFacets()
@@ -1,21 +1,63 @@
 from datetime import datetime
 
-from sqlalchemy import Integer
-from sqlalchemy import func, ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, Text
+from sqlalchemy import func, ForeignKey, String, Index, Numeric, Computed, column
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column, relationship, deferred
+from sqlalchemy.sql.expression import FunctionElement
 
 from src.database import Base
 
 
 class MovieGenre(Base):
     __tablename__ = "movie_genre"
+    __table_args__ = (
+        Index("ix_movie_genre_genre_id_movie_id", "genre_id", "movie_id"),
+    )
 
     movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True)
     genre_id: Mapped[int] = mapped_column(ForeignKey("genres.id"), primary_key=True)
 
 
+MOVIE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+class MovieSearchVector(FunctionElement):
+    """Generation expression of `Movie.search_vector`, NULL outside Postgres"""
+
+    type = TSVECTOR()
+    name = "movie_search_vector"
+    inherit_cache = True
+
+
+@compiles(MovieSearchVector, "postgresql")
+def compile_movie_search_vector(element, compiler, **kw) -> str:
+    return MOVIE_SEARCH_VECTOR
+
+
+@compiles(MovieSearchVector)
+def compile_movie_search_vector_fallback(element, compiler, **kw) -> str:
+    return "NULL"
+
+
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (
+        Index(
+            "ix_movies_search_vector", "search_vector", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+        # Typo-tolerant title matching with pg_trgm's % operator
+        Index(
+            "ix_movies_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
@@ -23,15 +65,27 @@ class Movie(Base):
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
     release_date: Mapped[datetime] = mapped_column(nullable=False)
     poster_url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    # Title weighted above description; only read inside search queries.
+    # Other databases (SQLite in tests) get an always-NULL placeholder.
+    search_vector: Mapped[str] = deferred(
+        mapped_column(
+            TSVECTOR().with_variant(Text(), "sqlite"),
+            Computed(MovieSearchVector(), persisted=True),
+        )
+    )
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
     )
 
+    # Relationships raise instead of lazy loading, which can't work under
+    # AsyncSession; queries load what they need with selectinload/joinedload
     genres: Mapped[list["Genre"]] = relationship(
-        secondary="movie_genre", back_populates="movies"
+        secondary="movie_genre", back_populates="movies", lazy="raise"
+    )
+    showtimes: Mapped[list["Showtime"]] = relationship(
+        back_populates="movie", order_by="Showtime.start_time", lazy="raise"
     )
-    showtimes: Mapped["Showtime"] = relationship(back_populates="movie")
 
 
 class Genre(Base):
@@ -42,16 +96,39 @@ class Genre(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     movies: Mapped[list["Movie"]] = relationship(
-        secondary="movie_genre", back_populates="genres"
+        secondary="movie_genre", back_populates="genres", lazy="raise"
     )
 
 
 class Showtime(Base):
     __tablename__ = "showtimes"
+    __table_args__ = (
+        # A hall runs one show at a time, cleaning included (needs btree_gist)
+        ExcludeConstraint(
+            ("cinema_hall_id", "="),
+            (func.tsrange(column("start_time"), column("cleaning_ends_at")), "&&"),
+            name="ex_showtimes_cinema_hall_id_period",
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_showtimes_start_time", "start_time"),
+        Index("ix_showtimes_movie_id_start_time", "movie_id", "start_time"),
+        Index("ix_showtimes_cinema_hall_id_start_time", "cinema_hall_id", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     start_time: Mapped[datetime] = mapped_column(nullable=False)
     end_time: Mapped[datetime] = mapped_column(nullable=False)
+    # The hall is free for the next show from here on
+    cleaning_ends_at: Mapped[datetime] = mapped_column(nullable=False)
+    # Occupancy counters kept in step by the booking and hold paths, so
+    # listings don't have to count reservation_seat rows
+    capacity: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    sold: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    held: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    # Applied to every seat price, below 1 for matinees and above for surges
+    price_multiplier: Mapped[Numeric] = mapped_column(
+        Numeric(4, 2), nullable=False, server_default="1.00"
+    )
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
@@ -64,9 +141,19 @@ class Showtime(Base):
         ForeignKey("cinema_halls.id", ondelete="RESTRICT"), nullable=False
     )
 
-    reservations: Mapped[list["Reservation"]] = relationship(back_populates="showtime")
-    movie: Mapped["Movie"] = relationship(back_populates="showtimes")
-    cinema_hall: Mapped["CinemaHall"] = relationship(back_populates="showtimes")
+    reservations: Mapped[list["Reservation"]] = relationship(
+        back_populates="showtime", lazy="raise"
+    )
+    price_tiers: Mapped[list["ShowtimePriceTier"]] = relationship(
+        back_populates="showtime",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
+    )
+    movie: Mapped["Movie"] = relationship(back_populates="showtimes", lazy="raise")
+    cinema_hall: Mapped["CinemaHall"] = relationship(
+        back_populates="showtimes", lazy="raise"
+    )
 
 
 class CinemaHall(Base):
@@ -74,10 +161,17 @@ class CinemaHall(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
+    # Size of the seating grid, seats may leave gaps in it for aisles
+    row_count: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    seats_per_row: Mapped[int] = mapped_column(nullable=False, server_default="0")
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         server_default=func.now(), onupdate=func.now()
     )
 
-    showtimes: Mapped[list["Showtime"]] = relationship(back_populates="cinema_hall")
-    seats: Mapped[list["Seat"]] = relationship(back_populates="cinema_hall")
+    showtimes: Mapped[list["Showtime"]] = relationship(
+        back_populates="cinema_hall", lazy="raise"
+    )
+    seats: Mapped[list["Seat"]] = relationship(
+        back_populates="cinema_hall", lazy="raise"
+    )
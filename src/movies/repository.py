@@ -0,0 +1,411 @@
+from datetime import datetime, date, timedelta
+from typing import Optional
+
+from sqlalchemy import select, insert, delete, func, tuple_, or_, Select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from src.movies.constants import (
+    MOVIE_UPCOMING_SHOWTIMES_DAYS,
+    GENRE_FACETS_MAX_RANGE_DAYS,
+)
+
+from src.movies.exceptions import (
+    MovieNotFoundError,
+    CinemaHallNotFoundError,
+    ShowtimeNotFoundError,
+    ShowtimeOverlapError,
+    ShowtimeInUseError,
+    ShowtimeInPastError,
+    InvalidCursorError,
+    GenreNotFoundError,
+    InvalidDateRangeError,
+)
+from src.movies.facets import genre_facets
+from src.movies.models import Movie, CinemaHall, Showtime, MovieGenre, Genre
+from src.movies.schedule import showtime_schedule
+from src.movies.search import movie_search_index
+from src.movies.snapshot import schedule_snapshots
+from src.movies.schemas import (
+    GenreFacet,
+    ShowtimeCreateRequest,
+    ShowtimeResponse,
+    WeeklyShowtimesRequest,
+)
+from src.reservations.models import Seat
+from src.utils.pagination import encode_cursor, decode_cursor
+
+# Postgres exclusion_violation
+EXCLUSION_VIOLATION_SQLSTATE = "23P01"
+
+SHOWTIME_COLUMNS = (
+    Showtime.id,
+    Showtime.movie_id,
+    Showtime.cinema_hall_id,
+    Showtime.start_time,
+    Showtime.end_time,
+    Showtime.cleaning_ends_at,
+    Showtime.capacity,
+    Showtime.sold,
+    Showtime.held,
+)
+
+
+class MoviesRepository:
+    """
+    Catalog reads. Related rows are loaded with one SELECT ... IN query per
+    relationship, so a page of movies costs three queries whatever its size.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def load_options() -> list[LoaderOption]:
+        now = datetime.now()
+        upcoming = Showtime.start_time.between(
+            now, now + timedelta(days=MOVIE_UPCOMING_SHOWTIMES_DAYS)
+        )
+        return [
+            selectinload(Movie.genres),
+            selectinload(Movie.showtimes.and_(upcoming)),
+        ]
+
+    async def get_movies_paginated(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        genre_id: Optional[int] = None,
+    ) -> tuple[list[Movie], Optional[str]]:
+        """Newest releases first, keyset-paginated on (release_date, id)"""
+        stmt = (
+            select(Movie)
+            .options(*self.load_options())
+            .order_by(Movie.release_date.desc(), Movie.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            try:
+                release_date, movie_id = decode_cursor(cursor)
+                before = (datetime.fromisoformat(release_date), int(movie_id))
+            except (ValueError, TypeError):
+                raise InvalidCursorError(detail="Invalid cursor")
+            stmt = stmt.where(tuple_(Movie.release_date, Movie.id) < tuple_(*before))
+        stmt = self.filter_movies(stmt, genre_id)
+
+        db_response = await self.db.execute(stmt)
+        movies = list(db_response.scalars().all())
+        next_cursor = None
+        if len(movies) > limit:
+            movies = movies[:limit]
+            next_cursor = encode_cursor(movies[-1].release_date, movies[-1].id)
+        return movies, next_cursor
+
+    @staticmethod
+    def filter_movies(
+        stmt: Select,
+        genre_id: Optional[int] = None,
+        released_from: Optional[date] = None,
+        released_to: Optional[date] = None,
+    ) -> Select:
+        if genre_id is not None:
+            stmt = stmt.where(
+                Movie.id.in_(
+                    select(MovieGenre.movie_id).where(MovieGenre.genre_id == genre_id)
+                )
+            )
+        if released_from is not None:
+            start = datetime.combine(released_from, datetime.min.time())
+            stmt = stmt.where(Movie.release_date >= start)
+        if released_to is not None:
+            end = datetime.combine(released_to + timedelta(days=1), datetime.min.time())
+            stmt = stmt.where(Movie.release_date < end)
+        return stmt
+
+    async def search_movies(
+        self,
+        query: str,
+        limit: int,
+        genre_id: Optional[int] = None,
+        released_from: Optional[date] = None,
+        released_to: Optional[date] = None,
+    ) -> list[Movie]:
+        """
+        Movies matching `query` in title or description, best match first.
+
+        On Postgres a movie matches through the full-text index or, to
+        tolerate typos, through title trigram similarity; the score adds
+        both. Other databases use the in-process `movie_search_index`.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery("english", query)
+            score = func.ts_rank_cd(Movie.search_vector, ts_query) + func.similarity(
+                Movie.title, query
+            )
+            stmt = (
+                select(Movie)
+                .where(
+                    or_(
+                        Movie.search_vector.op("@@")(ts_query),
+                        Movie.title.op("%")(query),
+                    )
+                )
+                .order_by(score.desc(), Movie.id)
+                .limit(limit)
+            )
+            stmt = self.filter_movies(stmt, genre_id, released_from, released_to)
+            db_response = await self.db.execute(stmt.options(*self.load_options()))
+            return list(db_response.scalars().all())
+
+        index = await movie_search_index.get(self.db)
+        ranked = index.search(query)
+        stmt = self.filter_movies(
+            select(Movie.id).where(Movie.id.in_(ranked)),
+            genre_id,
+            released_from,
+            released_to,
+        )
+        matching = set((await self.db.execute(stmt)).scalars())
+        movie_ids = [movie_id for movie_id in ranked if movie_id in matching][:limit]
+        db_response = await self.db.execute(
+            select(Movie).options(*self.load_options()).where(Movie.id.in_(movie_ids))
+        )
+        movies = {movie.id: movie for movie in db_response.scalars()}
+        return [movies[movie_id] for movie_id in movie_ids]
+
+    async def get_movie(self, movie_id: int) -> Movie:
+        db_response = await self.db.execute(
+            select(Movie).options(*self.load_options()).where(Movie.id == movie_id)
+        )
+        movie = db_response.scalar_one_or_none()
+        if movie is None:
+            raise MovieNotFoundError(detail=f"Movie {movie_id} not found")
+        return movie
+
+    async def get_genre_facets(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> list[GenreFacet]:
+        if date_to is not None:
+            # Ranges starting in the past are counted from today
+            date_from = max(date_from or date.today(), date.today())
+            if date_to < date.today():
+                raise InvalidDateRangeError(detail="date_to is in the past")
+            if date_to < date_from:
+                raise InvalidDateRangeError(detail="date_to is before date_from")
+            if (date_to - date_from).days >= GENRE_FACETS_MAX_RANGE_DAYS:
+                raise InvalidDateRangeError(
+                    detail=f"Date range exceeds {GENRE_FACETS_MAX_RANGE_DAYS} days"
+                )
+        return await genre_facets.get(self.db, date_from, date_to)
+
+    async def get_movie_and_genre(self, movie_id: int, genre_id: int) -> Genre:
+        if await self.db.get(Movie, movie_id) is None:
+            raise MovieNotFoundError(detail=f"Movie {movie_id} not found")
+        genre = await self.db.get(Genre, genre_id)
+        if genre is None:
+            raise GenreNotFoundError(detail=f"Genre {genre_id} not found")
+        return genre
+
+    async def link_genre(self, movie_id: int, genre_id: int) -> None:
+        genre = await self.get_movie_and_genre(movie_id, genre_id)
+        if await self.db.get(MovieGenre, (movie_id, genre_id)) is not None:
+            return
+        self.db.add(MovieGenre(movie_id=movie_id, genre_id=genre_id))
+        await self.db.flush()
+        genre_facets.link_on_commit(self.db, movie_id, genre_id, genre.title)
+        schedule_snapshots.invalidate_movie_on_commit(self.db, movie_id)
+
+    async def unlink_genre(self, movie_id: int, genre_id: int) -> None:
+        await self.get_movie_and_genre(movie_id, genre_id)
+        db_response = await self.db.execute(
+            delete(MovieGenre)
+            .where(MovieGenre.movie_id == movie_id, MovieGenre.genre_id == genre_id)
+            .returning(MovieGenre.genre_id)
+        )
+        if db_response.scalar_one_or_none() is None:
+            return
+        genre_facets.unlink_on_commit(self.db, movie_id, genre_id)
+        schedule_snapshots.invalidate_movie_on_commit(self.db, movie_id)
+
+
+class ShowtimesRepository:
+    """
+    Schedules showtimes.
+
+    Each showtime occupies its hall from `start_time` until
+    `cleaning_ends_at`, which is the movie's end plus a cleaning buffer.
+    Overlaps are rejected against the in-memory hall schedule first; the
+    exclusion constraint on the table catches whatever the index missed.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_movie(self, movie_id: int) -> Movie:
+        movie = await self.db.get(Movie, movie_id)
+        if movie is None:
+            raise MovieNotFoundError(detail=f"Movie {movie_id} not found")
+        return movie
+
+    async def get_hall(self, hall_id: int) -> CinemaHall:
+        hall = await self.db.get(CinemaHall, hall_id)
+        if hall is None:
+            raise CinemaHallNotFoundError(detail=f"Cinema hall {hall_id} not found")
+        return hall
+
+    async def get_hall_capacity(self, hall_id: int) -> int:
+        await self.get_hall(hall_id)
+        return await self.db.scalar(
+            select(func.count(Seat.id)).where(Seat.cinema_hall_id == hall_id)
+        )
+
+    @staticmethod
+    def build_showtime(
+        movie: Movie,
+        hall_id: int,
+        capacity: int,
+        start_time: datetime,
+        cleaning_minutes: int,
+    ) -> dict:
+        if start_time <= datetime.now():
+            raise ShowtimeInPastError(
+                detail=f"Showtime at {start_time.isoformat()} is in the past"
+            )
+        end_time = start_time + timedelta(minutes=movie.duration_minutes)
+        return {
+            "movie_id": movie.id,
+            "cinema_hall_id": hall_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "cleaning_ends_at": end_time + timedelta(minutes=cleaning_minutes),
+            "capacity": capacity,
+        }
+
+    async def check_overlaps(self, hall_id: int, showtimes: list[dict]) -> None:
+        """Reject showtimes overlapping each other or the hall's schedule"""
+        schedule = await showtime_schedule.get(self.db, hall_id)
+        conflicts = []
+        previous = None
+        for showtime in sorted(showtimes, key=lambda s: s["start_time"]):
+            start, end = showtime["start_time"], showtime["cleaning_ends_at"]
+            conflict_id = schedule.find_conflict(start, end)
+            if conflict_id is not None or (
+                previous is not None and previous["cleaning_ends_at"] > start
+            ):
+                conflicts.append(
+                    {"start_time": start.isoformat(), "showtime_id": conflict_id}
+                )
+            previous = showtime
+        if conflicts:
+            raise ShowtimeOverlapError(
+                detail={"message": "Hall is already booked", "conflicts": conflicts}
+            )
+
+    async def insert_showtimes(
+        self, hall_id: int, showtimes: list[dict]
+    ) -> list[ShowtimeResponse]:
+        await self.check_overlaps(hall_id, showtimes)
+        try:
+            db_response = await self.db.execute(
+                insert(Showtime).values(showtimes).returning(*SHOWTIME_COLUMNS)
+            )
+        except IntegrityError as e:
+            if getattr(e.orig, "sqlstate", None) != EXCLUSION_VIOLATION_SQLSTATE:
+                raise
+            showtime_schedule.invalidate(hall_id)
+            raise ShowtimeOverlapError(
+                detail={"message": "Hall is already booked", "conflicts": []}
+            )
+
+        created = sorted(
+            (ShowtimeResponse.model_validate(row) for row in db_response),
+            key=lambda showtime: showtime.start_time,
+        )
+        showtime_schedule.add_on_commit(
+            self.db,
+            hall_id,
+            [(s.start_time, s.cleaning_ends_at, s.id) for s in created],
+        )
+        schedule_snapshots.invalidate_days_on_commit(
+            self.db, {showtime.start_time.date() for showtime in created}
+        )
+        genre_facets.add_showtimes_on_commit(
+            self.db, [(s.start_time.date(), s.movie_id) for s in created]
+        )
+        return created
+
+    async def create_showtime(
+        self, showtime: ShowtimeCreateRequest
+    ) -> ShowtimeResponse:
+        movie = await self.get_movie(showtime.movie_id)
+        capacity = await self.get_hall_capacity(showtime.cinema_hall_id)
+        row = self.build_showtime(
+            movie,
+            showtime.cinema_hall_id,
+            capacity,
+            showtime.start_time,
+            showtime.cleaning_minutes,
+        )
+        created = await self.insert_showtimes(showtime.cinema_hall_id, [row])
+        return created[0]
+
+    async def create_weekly_showtimes(
+        self, schedule: WeeklyShowtimesRequest
+    ) -> list[ShowtimeResponse]:
+        """All showtimes of the week are validated and inserted together"""
+        movie = await self.get_movie(schedule.movie_id)
+        capacity = await self.get_hall_capacity(schedule.cinema_hall_id)
+        weekdays = set(schedule.weekdays)
+        rows = []
+        for offset in range(7):
+            day = schedule.week_start + timedelta(days=offset)
+            if day.weekday() not in weekdays:
+                continue
+            for start_time in sorted(set(schedule.start_times)):
+                rows.append(
+                    self.build_showtime(
+                        movie,
+                        schedule.cinema_hall_id,
+                        capacity,
+                        datetime.combine(day, start_time),
+                        schedule.cleaning_minutes,
+                    )
+                )
+        return await self.insert_showtimes(schedule.cinema_hall_id, rows)
+
+    async def get_hall_showtimes(
+        self, hall_id: int, day: date
+    ) -> list[ShowtimeResponse]:
+        start = datetime.combine(day, datetime.min.time())
+        db_response = await self.db.execute(
+            select(*SHOWTIME_COLUMNS)
+            .where(
+                Showtime.cinema_hall_id == hall_id,
+                Showtime.start_time >= start,
+                Showtime.start_time < start + timedelta(days=1),
+            )
+            .order_by(Showtime.start_time)
+        )
+        return [ShowtimeResponse.model_validate(row) for row in db_response]
+
+    async def delete_showtime(self, showtime_id: int) -> None:
+        showtime = await self.db.get(Showtime, showtime_id)
+        if showtime is None:
+            raise ShowtimeNotFoundError(detail=f"Showtime {showtime_id} not found")
+        try:
+            await self.db.execute(delete(Showtime).where(Showtime.id == showtime_id))
+        except IntegrityError:
+            raise ShowtimeInUseError(
+                detail=f"Showtime {showtime_id} has reservations or holds"
+            )
+        showtime_schedule.remove_on_commit(
+            self.db, showtime.cinema_hall_id, showtime.start_time, showtime_id
+        )
+        schedule_snapshots.invalidate_days_on_commit(
+            self.db, [showtime.start_time.date()]
+        )
+        genre_facets.remove_showtime_on_commit(
+            self.db, showtime.start_time.date(), showtime.movie_id
+        )
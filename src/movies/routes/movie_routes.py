@@ -0,0 +1,108 @@
+from datetime import date
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Query, status
+
+from src.constants import ADMIN, STAFF
+from src.dependencies import DBSession, ReadDBSession, requires_roles
+from src.movies.constants import (
+    MOVIES_PAGE_SIZE,
+    MOVIES_MAX_PAGE_SIZE,
+    MOVIE_SEARCH_MAX_RESULTS,
+)
+from src.movies.repository import MoviesRepository
+from src.movies.schemas import MovieResponse, MoviesPage, GenreFacet
+
+router = APIRouter(prefix="/movies", tags=["movies"])
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=MoviesPage,
+)
+async def read_movies(
+    db: ReadDBSession,
+    limit: Annotated[int, Query(ge=1, le=MOVIES_MAX_PAGE_SIZE)] = MOVIES_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    genre_id: Optional[int] = None,
+) -> MoviesPage:
+    """Movies with their genres and the coming week's showtimes"""
+    movies, next_cursor = await MoviesRepository(db).get_movies_paginated(
+        limit=limit, cursor=cursor, genre_id=genre_id
+    )
+    return MoviesPage(
+        items=[MovieResponse.model_validate(movie) for movie in movies],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/search/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[MovieResponse],
+)
+async def search_movies(
+    db: ReadDBSession,
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=MOVIE_SEARCH_MAX_RESULTS)] = MOVIES_PAGE_SIZE,
+    genre_id: Optional[int] = None,
+    released_from: Optional[date] = None,
+    released_to: Optional[date] = None,
+) -> list[MovieResponse]:
+    """Ranked search over titles and descriptions, tolerant of typos in titles"""
+    movies = await MoviesRepository(db).search_movies(
+        q,
+        limit,
+        genre_id=genre_id,
+        released_from=released_from,
+        released_to=released_to,
+    )
+    return [MovieResponse.model_validate(movie) for movie in movies]
+
+
+@router.get(
+    "/facets/genres/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[GenreFacet],
+)
+async def read_genre_facets(
+    db: ReadDBSession,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list[GenreFacet]:
+    """
+    Movies per genre in the catalog or, when a date is given, among movies
+    with a showtime between `date_from` (default today) and `date_to`
+    """
+    return await MoviesRepository(db).get_genre_facets(date_from, date_to)
+
+
+@router.get(
+    "/{movie_id}/",
+    status_code=status.HTTP_200_OK,
+    response_model=MovieResponse,
+)
+async def read_movie(db: ReadDBSession, movie_id: int) -> MovieResponse:
+    movie = await MoviesRepository(db).get_movie(movie_id)
+    return MovieResponse.model_validate(movie)
+
+
+@router.post(
+    "/{movie_id}/genres/{genre_id}/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def link_genre(db: DBSession, movie_id: int, genre_id: int) -> None:
+    await MoviesRepository(db).link_genre(movie_id, genre_id)
+    return None
+
+
+@router.delete(
+    "/{movie_id}/genres/{genre_id}/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def unlink_genre(db: DBSession, movie_id: int, genre_id: int) -> None:
+    await MoviesRepository(db).unlink_genre(movie_id, genre_id)
+    return None
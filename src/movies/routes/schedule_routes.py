@@ -0,0 +1,40 @@
+from datetime import date
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header, Response, status
+
+from src.dependencies import ReadDBSession
+from src.movies.constants import SCHEDULE_SNAPSHOT_TTL_SECONDS
+from src.movies.schemas import DaySchedule
+from src.movies.snapshot import schedule_snapshots
+
+router = APIRouter(prefix="/schedule", tags=["schedule"])
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+@router.get(
+    "/{day}/",
+    status_code=status.HTTP_200_OK,
+    response_model=DaySchedule,
+)
+async def read_day_schedule(
+    db: ReadDBSession,
+    day: date,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    """Movies and their showtimes on `day`, served from a prebuilt snapshot"""
+    snapshot = await schedule_snapshots.get(db, day)
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={int(SCHEDULE_SNAPSHOT_TTL_SECONDS)}",
+    }
+    if if_none_match is not None and etag_matches(snapshot.etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=snapshot.body, media_type="application/json", headers=headers
+    )
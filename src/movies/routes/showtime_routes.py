@@ -0,0 +1,61 @@
+from datetime import date
+
+from fastapi import APIRouter, status
+
+from src.constants import ADMIN, STAFF
+from src.dependencies import DBSession, ReadDBSession, requires_roles
+from src.movies.repository import ShowtimesRepository
+from src.movies.schemas import (
+    ShowtimeCreateRequest,
+    ShowtimeResponse,
+    WeeklyShowtimesRequest,
+)
+
+router = APIRouter(prefix="/showtimes", tags=["showtimes"])
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[ShowtimeResponse],
+)
+async def read_hall_showtimes(
+    db: ReadDBSession, cinema_hall_id: int, day: date
+) -> list[ShowtimeResponse]:
+    return await ShowtimesRepository(db).get_hall_showtimes(cinema_hall_id, day)
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ShowtimeResponse,
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def create_showtime(
+    db: DBSession, showtime: ShowtimeCreateRequest
+) -> ShowtimeResponse:
+    """End time follows from the movie's duration, plus a cleaning buffer"""
+    return await ShowtimesRepository(db).create_showtime(showtime)
+
+
+@router.post(
+    "/weekly/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=list[ShowtimeResponse],
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def create_weekly_showtimes(
+    db: DBSession, schedule: WeeklyShowtimesRequest
+) -> list[ShowtimeResponse]:
+    """Create a week of recurring showtimes, or none if any of them overlaps"""
+    return await ShowtimesRepository(db).create_weekly_showtimes(schedule)
+
+
+@router.delete(
+    "/{showtime_id}/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def delete_showtime(db: DBSession, showtime_id: int) -> None:
+    await ShowtimesRepository(db).delete_showtime(showtime_id)
+    return None
@@ -0,0 +1,136 @@
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import on_commit
+from src.movies.constants import HALL_SCHEDULE_CACHE_SIZE, HALL_SCHEDULE_TTL_SECONDS
+from src.movies.models import Showtime
+
+# (start_time, cleaning_ends_at, showtime id)
+Period = tuple[datetime, datetime, int]
+
+
+class HallSchedule:
+    """
+    Upcoming showtimes of one hall as parallel lists sorted by start time.
+
+    Periods in a hall never overlap, so their ends are sorted as well and a
+    new period can only clash with its two neighbours: finding a conflict
+    is a single binary search.
+    """
+
+    __slots__ = ("hall_id", "starts", "ends", "ids")
+
+    def __init__(self, hall_id: int, periods: Iterable[Period] = ()):
+        self.hall_id = hall_id
+        self.starts: list[datetime] = []
+        self.ends: list[datetime] = []
+        self.ids: list[int] = []
+        for start, end, showtime_id in sorted(periods):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.ids.append(showtime_id)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find_conflict(self, start: datetime, end: datetime) -> Optional[int]:
+        """Id of a showtime overlapping [start, end), if any"""
+        index = bisect_right(self.starts, start)
+        if index > 0 and self.ends[index - 1] > start:
+            return self.ids[index - 1]
+        if index < len(self.starts) and self.starts[index] < end:
+            return self.ids[index]
+        return None
+
+    def add(self, start: datetime, end: datetime, showtime_id: int) -> None:
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.ids.insert(index, showtime_id)
+
+    def remove(self, start: datetime, showtime_id: int) -> None:
+        index = bisect_left(self.starts, start)
+        while index < len(self.starts) and self.starts[index] == start:
+            if self.ids[index] == showtime_id:
+                del self.starts[index], self.ends[index], self.ids[index]
+                return
+            index += 1
+
+
+class ShowtimeSchedule:
+    """
+    Per-hall interval indexes used to reject overlapping showtimes before
+    going to the database.
+
+    Only periods that have not ended yet are loaded, since new showtimes
+    can't start in the past. Indexes are updated after commit and rebuilt
+    after `ttl` seconds; writes from other workers in between are caught
+    by the exclusion constraint on the showtimes table.
+    """
+
+    def __init__(
+        self,
+        max_halls: int = HALL_SCHEDULE_CACHE_SIZE,
+        ttl: float = HALL_SCHEDULE_TTL_SECONDS,
+    ):
+        self.max_halls = max_halls
+        self.ttl = ttl
+        self._halls: OrderedDict[int, tuple[float, HallSchedule]] = OrderedDict()
+
+    async def get(self, db: AsyncSession, hall_id: int) -> HallSchedule:
+        entry = self._halls.get(hall_id)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+            self._halls.move_to_end(hall_id)
+            return entry[1]
+
+        schedule = await self.load(db, hall_id)
+        self._halls[hall_id] = (time.monotonic(), schedule)
+        self._halls.move_to_end(hall_id)
+        while len(self._halls) > self.max_halls:
+            self._halls.popitem(last=False)
+        return schedule
+
+    @staticmethod
+    async def load(db: AsyncSession, hall_id: int) -> HallSchedule:
+        db_response = await db.execute(
+            select(Showtime.start_time, Showtime.cleaning_ends_at, Showtime.id).where(
+                Showtime.cinema_hall_id == hall_id,
+                Showtime.cleaning_ends_at > datetime.now(),
+            )
+        )
+        return HallSchedule(hall_id, [tuple(period) for period in db_response])
+
+    def add_on_commit(
+        self, db: AsyncSession, hall_id: int, periods: Iterable[Period]
+    ) -> None:
+        periods = tuple(periods)
+
+        async def add_committed() -> None:
+            entry = self._halls.get(hall_id)
+            if entry is not None:
+                for period in periods:
+                    entry[1].add(*period)
+
+        on_commit(db, add_committed)
+
+    def remove_on_commit(
+        self, db: AsyncSession, hall_id: int, start: datetime, showtime_id: int
+    ) -> None:
+        async def remove_committed() -> None:
+            entry = self._halls.get(hall_id)
+            if entry is not None:
+                entry[1].remove(start, showtime_id)
+
+        on_commit(db, remove_committed)
+
+    def invalidate(self, hall_id: int) -> None:
+        self._halls.pop(hall_id, None)
+
+
+showtime_schedule = ShowtimeSchedule()
@@ -0,0 +1,128 @@
+from datetime import datetime, date, time
+from typing import Annotated, Optional
+
+from pydantic import AfterValidator, BaseModel, Field, ConfigDict
+
+from src.movies.constants import (
+    SHOWTIME_CLEANING_MINUTES,
+    SHOWTIME_MAX_CLEANING_MINUTES,
+    SHOWTIME_MAX_DAILY_STARTS,
+)
+
+
+def to_local_naive(moment: datetime) -> datetime:
+    """Showtimes are stored and compared as naive server-local times"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def check_no_utc_offset(moment: time) -> time:
+    if moment.tzinfo is not None:
+        raise ValueError("Daily start times are local times without a UTC offset")
+    return moment
+
+
+CleaningMinutes = Annotated[int, Field(ge=0, le=SHOWTIME_MAX_CLEANING_MINUTES)]
+Weekday = Annotated[int, Field(ge=0, le=6)]
+LocalDatetime = Annotated[datetime, AfterValidator(to_local_naive)]
+LocalTime = Annotated[time, AfterValidator(check_no_utc_offset)]
+
+
+class ShowtimeCreateRequest(BaseModel):
+    movie_id: int
+    cinema_hall_id: int
+    start_time: LocalDatetime
+    cleaning_minutes: CleaningMinutes = SHOWTIME_CLEANING_MINUTES
+
+
+class WeeklyShowtimesRequest(BaseModel):
+    """The same daily start times on the chosen weekdays (Monday is 0)"""
+
+    movie_id: int
+    cinema_hall_id: int
+    week_start: date
+    start_times: list[LocalTime] = Field(
+        min_length=1, max_length=SHOWTIME_MAX_DAILY_STARTS
+    )
+    weekdays: list[Weekday] = Field(default=[0, 1, 2, 3, 4, 5, 6], min_length=1)
+    cleaning_minutes: CleaningMinutes = SHOWTIME_CLEANING_MINUTES
+
+
+class ShowtimeResponse(BaseModel):
+    id: int
+    movie_id: int
+    cinema_hall_id: int
+    start_time: datetime
+    end_time: datetime
+    cleaning_ends_at: datetime
+    capacity: int
+    sold: int
+    held: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GenreResponse(BaseModel):
+    id: int
+    title: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MovieShowtime(BaseModel):
+    id: int
+    cinema_hall_id: int
+    start_time: datetime
+    end_time: datetime
+    capacity: int
+    sold: int
+    held: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MovieResponse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    duration_minutes: int
+    release_date: datetime
+    poster_url: str
+    genres: list[GenreResponse]
+    showtimes: list[MovieShowtime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MoviesPage(BaseModel):
+    items: list[MovieResponse]
+    next_cursor: Optional[str]
+
+
+class ScheduleShowtime(BaseModel):
+    id: int
+    cinema_hall_id: int
+    cinema_hall_name: str
+    start_time: datetime
+    end_time: datetime
+
+
+class ScheduleMovie(BaseModel):
+    id: int
+    title: str
+    duration_minutes: int
+    poster_url: str
+    genres: list[str]
+    showtimes: list[ScheduleShowtime]
+
+
+class DaySchedule(BaseModel):
+    day: date
+    movies: list[ScheduleMovie]
+
+
+class GenreFacet(BaseModel):
+    id: int
+    title: str
+    count: int
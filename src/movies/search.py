@@ -0,0 +1,110 @@
+import re
+import time
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.movies.constants import (
+    MOVIE_SEARCH_MIN_SIMILARITY,
+    MOVIE_SEARCH_INDEX_TTL_SECONDS,
+)
+from src.movies.models import Movie
+
+WORD = re.compile(r"\w+")
+
+
+def words(text: str) -> set[str]:
+    return set(WORD.findall(text.lower()))
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams as pg_trgm makes them: per word, padded "  word " """
+    result = set()
+    for word in words(text):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class MovieSearchIndex:
+    """
+    In-process stand-in for the tsvector and pg_trgm indexes, for databases
+    without them (SQLite in local tests).
+
+    Titles are indexed by trigram and scored with pg_trgm's similarity
+    (shared trigrams over the union); title and description words add the
+    share of query words they contain, roughly like the full-text rank.
+    """
+
+    def __init__(self, movies: Iterable[tuple[int, str, Optional[str]]] = ()):
+        self._title_trigrams: dict[int, set[str]] = {}
+        self._words: dict[int, set[str]] = {}
+        self._by_trigram: dict[str, set[int]] = defaultdict(set)
+        self._by_word: dict[str, set[int]] = defaultdict(set)
+        for movie_id, title, description in movies:
+            self.add(movie_id, title, description)
+
+    def __len__(self) -> int:
+        return len(self._title_trigrams)
+
+    def add(self, movie_id: int, title: str, description: Optional[str]) -> None:
+        self._title_trigrams[movie_id] = trigrams(title)
+        self._words[movie_id] = words(f"{title} {description or ''}")
+        for trigram in self._title_trigrams[movie_id]:
+            self._by_trigram[trigram].add(movie_id)
+        for word in self._words[movie_id]:
+            self._by_word[word].add(movie_id)
+
+    def search(
+        self, query: str, min_similarity: float = MOVIE_SEARCH_MIN_SIMILARITY
+    ) -> list[int]:
+        """Ids of matching movies, best first"""
+        query_trigrams = trigrams(query)
+        query_words = words(query)
+        shared: dict[int, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for movie_id in self._by_trigram.get(trigram, ()):
+                shared[movie_id] += 1
+        candidates = set(shared)
+        for word in query_words:
+            candidates.update(self._by_word.get(word, ()))
+
+        scored = []
+        for movie_id in candidates:
+            common = shared.get(movie_id, 0)
+            union = len(query_trigrams) + len(self._title_trigrams[movie_id]) - common
+            similarity = common / union if union else 0.0
+            word_share = (
+                len(query_words & self._words[movie_id]) / len(query_words)
+                if query_words
+                else 0.0
+            )
+            if similarity >= min_similarity or word_share:
+                scored.append((-(similarity + word_share), movie_id))
+        return [movie_id for _, movie_id in sorted(scored)]
+
+
+class MovieSearchIndexes:
+    """Holds the process's fallback index, rebuilt after `ttl` seconds"""
+
+    def __init__(self, ttl: float = MOVIE_SEARCH_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self._index: Optional[MovieSearchIndex] = None
+        self._built_at = 0.0
+
+    async def get(self, db: AsyncSession) -> MovieSearchIndex:
+        if self._index is None or time.monotonic() - self._built_at > self.ttl:
+            db_response = await db.execute(
+                select(Movie.id, Movie.title, Movie.description)
+            )
+            self._index = MovieSearchIndex(db_response.all())
+            self._built_at = time.monotonic()
+        return self._index
+
+    def invalidate(self) -> None:
+        self._index = None
+
+
+movie_search_index = MovieSearchIndexes()
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import on_commit, sessionmanager
+from src.movies.constants import (
+    SCHEDULE_SNAPSHOT_MAX_DAYS,
+    SCHEDULE_SNAPSHOT_TTL_SECONDS,
+)
+from src.movies.models import Movie, Genre, MovieGenre, Showtime, CinemaHall
+from src.movies.schemas import (
+    DaySchedule,
+    ScheduleMovie,
+    ScheduleShowtime,
+)
+
+
+class ScheduleSnapshot(NamedTuple):
+    body: bytes
+    etag: str
+    movie_ids: frozenset[int]
+    built_at: float
+
+
+class ScheduleSnapshots:
+    """
+    The "now showing" schedule of each date, serialized to JSON once and
+    served as-is, with a content hash as ETag.
+
+    Edits to showtimes drop the snapshot of their date after commit, and
+    edits to a movie drop every date it plays on; the next request rebuilds
+    only those dates, and concurrent requests share one rebuild. Snapshots
+    are also rebuilt after `ttl` seconds to pick up edits made through
+    other workers. Past dates are evicted and at most `max_days` are kept.
+
+    A date rebuilt because of an edit is read from the primary: a lagging
+    replica would bring back the old schedule under a fresh ETag.
+    """
+
+    def __init__(
+        self,
+        max_days: int = SCHEDULE_SNAPSHOT_MAX_DAYS,
+        ttl: float = SCHEDULE_SNAPSHOT_TTL_SECONDS,
+    ):
+        self.max_days = max_days
+        self.ttl = ttl
+        self._snapshots: dict[date, ScheduleSnapshot] = {}
+        self._building: dict[date, asyncio.Future] = {}
+        # Bumped by invalidation, so a rebuild that raced an edit isn't kept
+        self._versions: dict[date, int] = {}
+        # Dates edited since their last rebuild
+        self._edited: set[date] = set()
+
+    async def get(self, db: AsyncSession, day: date) -> ScheduleSnapshot:
+        snapshot = self._snapshots.get(day)
+        if snapshot is not None and time.monotonic() - snapshot.built_at <= self.ttl:
+            return snapshot
+
+        building = self._building.get(day)
+        if building is not None:
+            return await asyncio.shield(building)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[day] = future
+        version = self._versions.get(day, 0)
+        try:
+            if day in self._edited and db.info.get("replica") is not None:
+                async with sessionmanager.session() as primary:
+                    snapshot = await self.build(primary, day)
+            else:
+                snapshot = await self.build(db, day)
+            if self._versions.get(day, 0) == version:
+                self._edited.discard(day)
+                self._store(day, snapshot)
+            future.set_result(snapshot)
+            return snapshot
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._building[day]
+
+    def _store(self, day: date, snapshot: ScheduleSnapshot) -> None:
+        self._snapshots[day] = snapshot
+        today = date.today()
+        for cached_day in [d for d in self._snapshots if d < today]:
+            self.evict(cached_day)
+        self._edited = {d for d in self._edited if d >= today}
+        while len(self._snapshots) > self.max_days:
+            # Dates furthest in the future are the least requested
+            self.evict(max(self._snapshots))
+
+    @staticmethod
+    async def build(db: AsyncSession, day: date) -> ScheduleSnapshot:
+        start = datetime.combine(day, datetime.min.time())
+        db_response = await db.execute(
+            select(
+                Movie.id,
+                Movie.title,
+                Movie.duration_minutes,
+                Movie.poster_url,
+                Showtime.id,
+                Showtime.cinema_hall_id,
+                CinemaHall.name,
+                Showtime.start_time,
+                Showtime.end_time,
+            )
+            .join(Showtime, Showtime.movie_id == Movie.id)
+            .join(CinemaHall, CinemaHall.id == Showtime.cinema_hall_id)
+            .where(
+                Showtime.start_time >= start,
+                Showtime.start_time < start + timedelta(days=1),
+            )
+            .order_by(Movie.title, Movie.id, Showtime.start_time, Showtime.id)
+        )
+        movies: dict[int, ScheduleMovie] = {}
+        for row in db_response.all():
+            movie_id, title, duration, poster_url, *showtime = row
+            if movie_id not in movies:
+                movies[movie_id] = ScheduleMovie(
+                    id=movie_id,
+                    title=title,
+                    duration_minutes=duration,
+                    poster_url=poster_url,
+                    genres=[],
+                    showtimes=[],
+                )
+            movies[movie_id].showtimes.append(
+                ScheduleShowtime(
+                    id=showtime[0],
+                    cinema_hall_id=showtime[1],
+                    cinema_hall_name=showtime[2],
+                    start_time=showtime[3],
+                    end_time=showtime[4],
+                )
+            )
+
+        if movies:
+            db_response = await db.execute(
+                select(MovieGenre.movie_id, Genre.title)
+                .join(Genre, Genre.id == MovieGenre.genre_id)
+                .where(MovieGenre.movie_id.in_(list(movies)))
+                .order_by(Genre.title)
+            )
+            for movie_id, genre in db_response.all():
+                movies[movie_id].genres.append(genre)
+
+        body = (
+            DaySchedule(day=day, movies=list(movies.values()))
+            .model_dump_json()
+            .encode()
+        )
+        return ScheduleSnapshot(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            movie_ids=frozenset(movies),
+            built_at=time.monotonic(),
+        )
+
+    def invalidate(self, day: date) -> None:
+        """Drop the snapshot of an edited date"""
+        self._edited.add(day)
+        self.evict(day)
+
+    def evict(self, day: date) -> None:
+        self._snapshots.pop(day, None)
+        self._versions[day] = self._versions.get(day, 0) + 1
+        if not self._building and len(self._versions) > 4 * self.max_days:
+            self._versions.clear()
+
+    def invalidate_movie(self, movie_id: int) -> None:
+        for day, snapshot in list(self._snapshots.items()):
+            if movie_id in snapshot.movie_ids:
+                self.invalidate(day)
+
+    def invalidate_days_on_commit(self, db: AsyncSession, days: Iterable[date]) -> None:
+        days = set(days)
+
+        async def invalidate_committed() -> None:
+            for day in days:
+                self.invalidate(day)
+
+        on_commit(db, invalidate_committed)
+
+    def invalidate_movie_on_commit(self, db: AsyncSession, movie_id: int) -> None:
+        async def invalidate_committed() -> None:
+            self.invalidate_movie(movie_id)
+
+        on_commit(db, invalidate_committed)
+
+
+schedule_snapshots = ScheduleSnapshots()
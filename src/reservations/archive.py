@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database import sessionmanager
+from src.movies.models import Showtime
+from src.reservations.constants import (
+    RESERVATION_ARCHIVE_AFTER_DAYS,
+    RESERVATION_ARCHIVE_BATCH_SIZE,
+)
+from src.reservations.models import (
+    Reservation,
+    ReservationArchive,
+    ReservationSeat,
+    ReservationSeatArchive,
+)
+
+ARCHIVED_RESERVATION_COLUMNS = (
+    "id",
+    "total_amount",
+    "created_at",
+    "updated_at",
+    "user_id",
+    "showtime_id",
+)
+ARCHIVED_SEAT_COLUMNS = ("reservation_id", "seat_id", "showtime_id")
+
+
+async def archive_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """
+    Move up to `batch_size` reservations of showtimes that started before
+    `cutoff`, with their seats, into the archive tables. Returns how many
+    were moved.
+    """
+    stmt = (
+        select(Reservation.id)
+        .join(Showtime, Showtime.id == Reservation.showtime_id)
+        .where(Showtime.start_time < cutoff)
+        .order_by(Reservation.id)
+        .limit(batch_size)
+    )
+    if db.bind.dialect.name == "postgresql":
+        stmt = stmt.with_for_update(of=Reservation, skip_locked=True)
+    reservation_ids = list((await db.execute(stmt)).scalars())
+    if not reservation_ids:
+        return 0
+
+    await db.execute(
+        insert(ReservationArchive).from_select(
+            ARCHIVED_RESERVATION_COLUMNS,
+            select(
+                *(getattr(Reservation, c) for c in ARCHIVED_RESERVATION_COLUMNS)
+            ).where(Reservation.id.in_(reservation_ids)),
+        )
+    )
+    await db.execute(
+        insert(ReservationSeatArchive).from_select(
+            ARCHIVED_SEAT_COLUMNS,
+            select(*(getattr(ReservationSeat, c) for c in ARCHIVED_SEAT_COLUMNS)).where(
+                ReservationSeat.reservation_id.in_(reservation_ids)
+            ),
+        )
+    )
+    await db.execute(
+        delete(ReservationSeat).where(
+            ReservationSeat.reservation_id.in_(reservation_ids)
+        )
+    )
+    await db.execute(delete(Reservation).where(Reservation.id.in_(reservation_ids)))
+    return len(reservation_ids)
+
+
+async def archive_reservations(
+    older_than_days: int = RESERVATION_ARCHIVE_AFTER_DAYS,
+    batch_size: int = RESERVATION_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Archive in batches of one transaction each, so locks and WAL per
+    transaction stay bounded and bookings keep going meanwhile.
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    total = 0
+    while True:
+        async with sessionmanager.unit_of_work() as db:
+            moved = await archive_batch(db, cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+async def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        description="Move reservations of past showtimes to the archive tables"
+    )
+    parser.add_argument("--days", type=int, default=RESERVATION_ARCHIVE_AFTER_DAYS)
+    parser.add_argument(
+        "--batch-size", type=int, default=RESERVATION_ARCHIVE_BATCH_SIZE
+    )
+    args = parser.parse_args(argv)
+
+    sessionmanager.init(settings.get_database_url(), **settings.get_engine_options())
+    try:
+        total = await archive_reservations(args.days, args.batch_size)
+    finally:
+        await sessionmanager.close()
+    print(f"Archived {total} reservations")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,399 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import on_commit
+from src.movies.models import Showtime
+from src.reservations.constants import (
+    SEAT_HOLD_TTL_SECONDS,
+    SEAT_MAP_CACHE_SIZE,
+    SEAT_MAP_TTL_SECONDS,
+)
+from src.reservations.exceptions import ShowtimeNotFoundError, SeatNotFoundError
+from src.reservations.layout import HallLayout, hall_layouts
+from src.reservations.models import (
+    Reservation,
+    ReservationSeat,
+    SeatHold,
+    SeatHoldSeat,
+)
+from src.reservations.schemas import SeatMapResponse, SeatState, SeatStatus
+
+# Called with (showtime_id, seat_ids, state) after a change is committed
+SeatChangeListener = Callable[[int, tuple[int, ...], SeatState], None]
+
+
+def _test_bit(bits: bytearray, index: int) -> bool:
+    return bool(bits[index >> 3] & (1 << (index & 7)))
+
+
+def _set_bit(bits: bytearray, index: int, value: bool) -> None:
+    if value:
+        bits[index >> 3] |= 1 << (index & 7)
+    else:
+        bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+class ShowtimeSeatMap:
+    """
+    Reserved and held seats of one showtime as two bitsets.
+
+    Bit i stands for the i-th seat of the showtime's hall layout, so the
+    whole map of a 500-seat hall fits in 2 * 63 bytes and a row of seats is
+    a contiguous range of bits.
+
+    Held seats also remember when their hold runs out. A hold whose release
+    never reached this map (it was expired by another worker, or its expiry
+    was delayed) reads as free once that time has passed. Holds announced
+    without an expiry time are assumed to run for a full hold TTL.
+    """
+
+    __slots__ = (
+        "showtime_id",
+        "layout",
+        "seat_ids",
+        "seat_codes",
+        "positions",
+        "reserved",
+        "held",
+        "hold_deadlines",
+        "next_hold_deadline",
+    )
+
+    def __init__(
+        self,
+        showtime_id: int,
+        layout: HallLayout,
+        reserved_seat_ids: Iterable[int] = (),
+        held_seats: Iterable[tuple[int, datetime]] = (),
+    ):
+        self.showtime_id = showtime_id
+        self.layout = layout
+        self.seat_ids = layout.seat_ids
+        self.seat_codes = layout.seat_codes
+        self.positions = layout.positions
+        self.reserved = bytearray((len(self.seat_ids) + 7) // 8)
+        self.held = bytearray((len(self.seat_ids) + 7) // 8)
+        # Seat index -> hold expiry, for the seats set in `held`
+        self.hold_deadlines: dict[int, datetime] = {}
+        self.next_hold_deadline: Optional[datetime] = None
+        for seat_id, expires_at in held_seats:
+            self.set_state((seat_id,), SeatState.held, expires_at)
+        self.set_state(reserved_seat_ids, SeatState.reserved)
+
+    def __len__(self) -> int:
+        return len(self.seat_ids)
+
+    def position(self, seat_id: int) -> int:
+        try:
+            return self.positions[seat_id]
+        except KeyError:
+            raise SeatNotFoundError(detail=f"Seat {seat_id} is not in this hall")
+
+    def state_at(self, index: int) -> SeatState:
+        if _test_bit(self.reserved, index):
+            return SeatState.reserved
+        if _test_bit(self.held, index):
+            return SeatState.held
+        return SeatState.free
+
+    def is_free_at(self, index: int) -> bool:
+        return not (_test_bit(self.reserved, index) or _test_bit(self.held, index))
+
+    def is_free(self, seat_id: int) -> bool:
+        self.clear_expired_holds()
+        return self.is_free_at(self.position(seat_id))
+
+    def set_state(
+        self,
+        seat_ids: Iterable[int],
+        state: SeatState,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        if state == SeatState.held and expires_at is None:
+            expires_at = datetime.now() + timedelta(seconds=SEAT_HOLD_TTL_SECONDS)
+        for seat_id in seat_ids:
+            index = self.positions.get(seat_id)
+            if index is None:
+                continue
+            _set_bit(self.reserved, index, state == SeatState.reserved)
+            _set_bit(self.held, index, state == SeatState.held)
+            if state == SeatState.held:
+                self.hold_deadlines[index] = expires_at
+                if (
+                    self.next_hold_deadline is None
+                    or expires_at < self.next_hold_deadline
+                ):
+                    self.next_hold_deadline = expires_at
+            else:
+                self.hold_deadlines.pop(index, None)
+
+    def clear_expired_holds(self, now: Optional[datetime] = None) -> None:
+        """Free held seats whose hold has run out"""
+        if self.next_hold_deadline is None:
+            return
+        now = now or datetime.now()
+        if now < self.next_hold_deadline:
+            return
+        for index, expires_at in list(self.hold_deadlines.items()):
+            if expires_at <= now:
+                del self.hold_deadlines[index]
+                _set_bit(self.held, index, False)
+        self.next_hold_deadline = min(self.hold_deadlines.values(), default=None)
+
+    def seat_states(self) -> dict[int, SeatState]:
+        self.clear_expired_holds()
+        return {
+            seat_id: self.state_at(index) for index, seat_id in enumerate(self.seat_ids)
+        }
+
+    def free_mask(self) -> int:
+        """Free seats as an int with bit i set when seat i is free"""
+        self.clear_expired_holds()
+        taken = int.from_bytes(self.reserved, "little") | int.from_bytes(
+            self.held, "little"
+        )
+        return ~taken & ((1 << len(self.seat_ids)) - 1)
+
+    def suggest_seats(self, count: int) -> Optional[list[int]]:
+        """Best block of `count` adjacent free seats, see `HallLayout.best_block`"""
+        return self.layout.best_block(self.free_mask(), count)
+
+    def free_seat_ids(self) -> list[int]:
+        self.clear_expired_holds()
+        return [
+            seat_id
+            for index, seat_id in enumerate(self.seat_ids)
+            if self.is_free_at(index)
+        ]
+
+    def seat_status_at(self, index: int) -> SeatStatus:
+        return SeatStatus(
+            id=self.seat_ids[index],
+            seat_code=self.seat_codes[index],
+            row_number=self.layout.rows[index],
+            seat_number=self.layout.numbers[index],
+            is_free=self.is_free_at(index),
+            state=self.state_at(index),
+        )
+
+    def to_response(self) -> SeatMapResponse:
+        self.clear_expired_holds()
+        return SeatMapResponse(
+            showtime_id=self.showtime_id,
+            seats=[self.seat_status_at(index) for index in range(len(self.seat_ids))],
+        )
+
+
+class SeatAvailability:
+    """
+    In-memory seat maps for the showtimes clients are looking at.
+
+    A map is built from the database the first time its showtime is asked
+    for, then kept current by `set_state_on_commit` (and its reserve, hold and
+    release shortcuts), which booking, hold and cancellation paths call
+    inside their transaction. Reads
+    never touch the database while the map is cached. Listeners added with
+    `add_listener` hear about every change committed through this worker.
+
+    Maps live in a bounded LRU and are rebuilt after `ttl` seconds, which
+    bounds drift from writes made by other worker processes.
+    """
+
+    def __init__(
+        self,
+        max_showtimes: int = SEAT_MAP_CACHE_SIZE,
+        ttl: float = SEAT_MAP_TTL_SECONDS,
+    ):
+        self.max_showtimes = max_showtimes
+        self.ttl = ttl
+        self._maps: OrderedDict[int, tuple[float, ShowtimeSeatMap]] = OrderedDict()
+        self._building: dict[int, asyncio.Future] = {}
+        self._pending: dict[
+            int, list[tuple[tuple[int, ...], SeatState, Optional[datetime]]]
+        ] = {}
+        self._listeners: list[SeatChangeListener] = []
+
+    def get_cached(self, showtime_id: int) -> Optional[ShowtimeSeatMap]:
+        entry = self._maps.get(showtime_id)
+        if entry is None:
+            return None
+        built_at, seat_map = entry
+        if time.monotonic() - built_at > self.ttl:
+            del self._maps[showtime_id]
+            return None
+        self._maps.move_to_end(showtime_id)
+        return seat_map
+
+    async def get_map(self, db: AsyncSession, showtime_id: int) -> ShowtimeSeatMap:
+        seat_map = self.get_cached(showtime_id)
+        if seat_map is not None:
+            return seat_map
+
+        building = self._building.get(showtime_id)
+        if building is not None:
+            return await asyncio.shield(building)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[showtime_id] = future
+        self._pending[showtime_id] = []
+        try:
+            seat_map = await self.load(db, showtime_id)
+            # Writes committed while we were reading are replayed in order;
+            # each sets an absolute state, so replaying one the read already
+            # saw is harmless.
+            for seat_ids, state, expires_at in self._pending[showtime_id]:
+                seat_map.set_state(seat_ids, state, expires_at)
+            self._store(seat_map)
+            future.set_result(seat_map)
+            return seat_map
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._building[showtime_id]
+            del self._pending[showtime_id]
+
+    def _store(self, seat_map: ShowtimeSeatMap) -> None:
+        self._maps[seat_map.showtime_id] = (time.monotonic(), seat_map)
+        self._maps.move_to_end(seat_map.showtime_id)
+        while len(self._maps) > self.max_showtimes:
+            self._maps.popitem(last=False)
+
+    @staticmethod
+    async def load(db: AsyncSession, showtime_id: int) -> ShowtimeSeatMap:
+        hall_id = (
+            await db.execute(
+                select(Showtime.cinema_hall_id).where(Showtime.id == showtime_id)
+            )
+        ).scalar_one_or_none()
+        if hall_id is None:
+            raise ShowtimeNotFoundError(detail=f"Showtime {showtime_id} not found")
+
+        layout = await hall_layouts.get(db, hall_id)
+        reserved = await db.execute(
+            select(ReservationSeat.seat_id)
+            .join(Reservation, Reservation.id == ReservationSeat.reservation_id)
+            .where(Reservation.showtime_id == showtime_id)
+        )
+        held = await db.execute(
+            select(SeatHoldSeat.seat_id, SeatHold.expires_at)
+            .join(SeatHold, SeatHold.id == SeatHoldSeat.hold_id)
+            .where(
+                SeatHold.showtime_id == showtime_id,
+                SeatHold.expires_at > datetime.now(),
+            )
+        )
+        return ShowtimeSeatMap(
+            showtime_id,
+            layout,
+            reserved.scalars(),
+            held.all(),
+        )
+
+    async def is_seat_free(
+        self, db: AsyncSession, showtime_id: int, seat_id: int
+    ) -> bool:
+        seat_map = await self.get_map(db, showtime_id)
+        return seat_map.is_free(seat_id)
+
+    def apply(
+        self,
+        showtime_id: int,
+        seat_ids: Iterable[int],
+        state: SeatState,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Apply a committed change to the cached map, if there is one.
+        `expires_at` is when a hold runs out, if known.
+        """
+        seat_ids = tuple(seat_ids)
+        if showtime_id in self._pending:
+            self._pending[showtime_id].append((seat_ids, state, expires_at))
+        entry = self._maps.get(showtime_id)
+        if entry is not None:
+            entry[1].set_state(seat_ids, state, expires_at)
+
+    def set_state_on_commit(
+        self,
+        db: AsyncSession,
+        showtime_id: int,
+        seat_ids: Iterable[int],
+        state: SeatState,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        seat_ids = tuple(seat_ids)
+
+        async def apply_committed() -> None:
+            self.apply(showtime_id, seat_ids, state, expires_at)
+            for listener in self._listeners:
+                listener(showtime_id, seat_ids, state)
+
+        on_commit(db, apply_committed)
+
+    def add_listener(self, listener: SeatChangeListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: SeatChangeListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def reserve_on_commit(
+        self, db: AsyncSession, showtime_id: int, seat_ids: Iterable[int]
+    ) -> None:
+        self.set_state_on_commit(db, showtime_id, seat_ids, SeatState.reserved)
+
+    def hold_on_commit(
+        self,
+        db: AsyncSession,
+        showtime_id: int,
+        seat_ids: Iterable[int],
+        expires_at: datetime,
+    ) -> None:
+        self.set_state_on_commit(db, showtime_id, seat_ids, SeatState.held, expires_at)
+
+    def release_on_commit(
+        self, db: AsyncSession, showtime_id: int, seat_ids: Iterable[int]
+    ) -> None:
+        self.set_state_on_commit(db, showtime_id, seat_ids, SeatState.free)
+
+    def invalidate(self, showtime_id: int) -> None:
+        self._maps.pop(showtime_id, None)
+
+    async def check_consistency(
+        self, db: AsyncSession, showtime_id: int, repair: bool = True
+    ) -> list[int]:
+        """
+        Compare the cached map against the database and return the ids of
+        seats whose state differs. With `repair`, a drifted map is replaced
+        by the freshly loaded one.
+        """
+        seat_map = self.get_cached(showtime_id)
+        fresh = await self.load(db, showtime_id)
+        if seat_map is None:
+            return []
+        if seat_map.seat_ids != fresh.seat_ids:
+            mismatched = set(seat_map.seat_ids) ^ set(fresh.seat_ids)
+        else:
+            cached_states = seat_map.seat_states()
+            mismatched = {
+                seat_id
+                for seat_id, state in fresh.seat_states().items()
+                if cached_states[seat_id] != state
+            }
+        if mismatched and repair:
+            self._store(fresh)
+        return sorted(mismatched)
+
+
+seat_availability = SeatAvailability()
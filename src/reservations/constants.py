@@ -0,0 +1,37 @@
+SEAT_MAP_CACHE_SIZE = 1000
+SEAT_MAP_TTL_SECONDS = 60.0
+
+MAX_SEATS_PER_RESERVATION = 10
+# Postgres lock_timeout for booking transactions, so contention fails fast
+RESERVATION_LOCK_TIMEOUT = "2s"
+# Retry-After sent when a booking gave up waiting for a lock
+RESERVATION_RETRY_AFTER_SECONDS = 1
+
+SEAT_HOLD_TTL_SECONDS = 10 * 60
+# Expired holds are deleted in batches of at most this many
+SEAT_HOLD_EXPIRY_BATCH_SIZE = 500
+SEAT_HOLD_EXPIRY_RETRY_SECONDS = 5.0
+# How often each worker looks for expired holds it was not told about
+SEAT_HOLD_SWEEP_SECONDS = 60.0
+
+HALL_LAYOUT_CACHE_SIZE = 200
+HALL_LAYOUT_TTL_SECONDS = 10 * 60
+# Seat suggestions prefer rows this far back from the screen (0 = front)
+SEAT_SUGGESTION_BEST_ROW = 2 / 3
+
+# Reservations of showtimes older than this are moved to the archive tables
+RESERVATION_ARCHIVE_AFTER_DAYS = 30
+RESERVATION_ARCHIVE_BATCH_SIZE = 5000
+
+SHOWTIME_PRICES_CACHE_SIZE = 1000
+SHOWTIME_PRICES_TTL_SECONDS = 60.0
+MAX_PRICE_TIERS_PER_SHOWTIME = 10
+
+# Live seat map streams send a keep-alive comment when idle this long
+SEAT_FEED_HEARTBEAT_SECONDS = 15.0
+# A subscriber with more changed seats than this waiting gets a new snapshot
+SEAT_FEED_MAX_PENDING_SEATS = 100
+# Subscribers that have not taken a change for this long are disconnected
+SEAT_FEED_STALL_SECONDS = 30.0
+# Changes waiting to be published to other workers; newer ones are dropped
+SEAT_FEED_OUTBOX_SIZE = 10_000
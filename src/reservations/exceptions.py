@@ -0,0 +1,60 @@
+from typing import Optional, Any
+
+from starlette import status
+from fastapi import HTTPException
+
+
+class ShowtimeNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class SeatNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class ReservationNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class SeatsUnavailableError(HTTPException):
+    def __init__(self, detail: Any, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT, detail=detail, headers=headers
+        )
+
+
+class SeatsBusyError(HTTPException):
+    def __init__(self, detail: Any, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT, detail=detail, headers=headers
+        )
+
+
+class ShowtimeClosedError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT, detail=detail, headers=headers
+        )
+
+
+class HoldNotFoundError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=detail, headers=headers
+        )
+
+
+class HoldExpiredError(HTTPException):
+    def __init__(self, detail: str, headers: Optional[dict[str, str]] = None):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT, detail=detail, headers=headers
+        )
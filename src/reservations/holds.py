@@ -0,0 +1,188 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import on_commit, sessionmanager
+from src.reservations.constants import (
+    SEAT_HOLD_EXPIRY_BATCH_SIZE,
+    SEAT_HOLD_EXPIRY_RETRY_SECONDS,
+    SEAT_HOLD_SWEEP_SECONDS,
+)
+from src.reservations.models import SeatHold
+
+logger = logging.getLogger(__name__)
+
+
+class HoldExpiryScheduler:
+    """
+    Deletes seat holds when their TTL runs out.
+
+    Deadlines are kept in a min-heap so the single background task only
+    ever sleeps until the earliest one, instead of polling the table.
+    Cancelled holds are left in the heap and skipped when they reach the
+    top; the heap is rebuilt once stale entries outnumber live ones.
+
+    Every worker loads all pending holds on start, and every
+    `sweep_seconds` picks up expired holds it was not told about, such as
+    ones created by another worker that has since stopped. Expiry is
+    idempotent: rows already deleted are skipped, and rows locked by
+    another transaction are retried after `retry_seconds`.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = SEAT_HOLD_EXPIRY_BATCH_SIZE,
+        retry_seconds: float = SEAT_HOLD_EXPIRY_RETRY_SECONDS,
+        sweep_seconds: float = SEAT_HOLD_SWEEP_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        self.sweep_seconds = sweep_seconds
+        self._heap: list[tuple[datetime, int]] = []
+        self._deadlines: dict[int, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, hold_id: int, expires_at: datetime) -> None:
+        self._deadlines[hold_id] = expires_at
+        heapq.heappush(self._heap, (expires_at, hold_id))
+        if self._heap[0] == (expires_at, hold_id):
+            self._wakeup.set()
+
+    def cancel(self, hold_ids: Iterable[int]) -> None:
+        for hold_id in hold_ids:
+            self._deadlines.pop(hold_id, None)
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(at, hold_id) for hold_id, at in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def schedule_on_commit(
+        self, db: AsyncSession, hold_id: int, expires_at: datetime
+    ) -> None:
+        async def schedule_committed() -> None:
+            self.schedule(hold_id, expires_at)
+
+        on_commit(db, schedule_committed)
+
+    def cancel_on_commit(self, db: AsyncSession, hold_ids: Iterable[int]) -> None:
+        hold_ids = tuple(hold_ids)
+
+        async def cancel_committed() -> None:
+            self.cancel(hold_ids)
+
+        on_commit(db, cancel_committed)
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            expires_at, hold_id = self._heap[0]
+            if self._deadlines.get(hold_id) == expires_at:
+                return
+            heapq.heappop(self._heap)
+
+    def next_deadline(self) -> Optional[datetime]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list[int]:
+        due = []
+        self._drop_stale()
+        while self._heap and len(due) < self.batch_size:
+            expires_at, hold_id = self._heap[0]
+            if expires_at > now:
+                break
+            heapq.heappop(self._heap)
+            del self._deadlines[hold_id]
+            due.append(hold_id)
+            self._drop_stale()
+        return due
+
+    async def load(self, expired_only: bool = False) -> None:
+        """
+        Schedule the holds in the database that are not scheduled yet; with
+        `expired_only`, at most a batch of those already due.
+        """
+        stmt = select(SeatHold.id, SeatHold.expires_at)
+        if expired_only:
+            stmt = (
+                stmt.where(SeatHold.expires_at <= datetime.now())
+                .order_by(SeatHold.expires_at)
+                .limit(self.batch_size)
+            )
+        async with sessionmanager.session(read_only=True) as db:
+            db_response = await db.execute(stmt)
+            for hold_id, expires_at in db_response:
+                if hold_id not in self._deadlines:
+                    self.schedule(hold_id, expires_at)
+
+    async def start(self) -> None:
+        await self.load()
+        self._task = asyncio.create_task(self._run())
+        self._sweep_task = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._sweep_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._sweep_task = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                await self.load(expired_only=True)
+            except Exception:
+                logger.exception("Failed to sweep expired seat holds")
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            if deadline is None:
+                await self._wakeup.wait()
+                continue
+            delay = (deadline - datetime.now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.expire_due(datetime.now())
+
+    async def expire_due(self, now: datetime) -> None:
+        hold_ids = self.pop_due(now)
+        try:
+            retry_ids = await expire_holds(hold_ids)
+        except Exception:
+            logger.exception("Failed to expire %d seat holds", len(hold_ids))
+            retry_ids = hold_ids
+        retry_at = now + timedelta(seconds=self.retry_seconds)
+        for hold_id in retry_ids:
+            self.schedule(hold_id, retry_at)
+
+
+async def expire_holds(hold_ids: list[int]) -> list[int]:
+    """Expire the holds, returning the ones to try again"""
+    # Imported here, the repository itself schedules holds on this module
+    from src.reservations.repository import ReservationsRepository
+
+    async with sessionmanager.unit_of_work() as db:
+        return await ReservationsRepository(db).expire_holds(hold_ids)
+
+
+hold_expiry = HoldExpiryScheduler()
@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.movies.models import CinemaHall
+from src.reservations.constants import (
+    HALL_LAYOUT_CACHE_SIZE,
+    HALL_LAYOUT_TTL_SECONDS,
+    SEAT_SUGGESTION_BEST_ROW,
+)
+from src.reservations.models import Seat
+
+
+class HallLayout:
+    """
+    Seats of one hall in (row, number) order, with what the seat finder
+    needs precomputed.
+
+    Position i is also bit i of every `ShowtimeSeatMap` of the hall, so a
+    row is a contiguous range of bits. `adjacent` has bit i set when seat
+    i + 1 sits right next to seat i, and `prefix_scores` turns the score of
+    any block of seats into one subtraction.
+    """
+
+    __slots__ = (
+        "hall_id",
+        "seat_ids",
+        "seat_codes",
+        "rows",
+        "numbers",
+        "positions",
+        "adjacent",
+        "prefix_scores",
+    )
+
+    def __init__(
+        self,
+        hall_id: int,
+        seats: Sequence[tuple[int, str, int, int]],
+        row_count: int = 0,
+        seats_per_row: int = 0,
+    ):
+        self.hall_id = hall_id
+        self.seat_ids = [seat[0] for seat in seats]
+        self.seat_codes = [seat[1] for seat in seats]
+        self.rows = [seat[2] for seat in seats]
+        self.numbers = [seat[3] for seat in seats]
+        self.positions = {seat_id: index for index, seat_id in enumerate(self.seat_ids)}
+
+        self.adjacent = 0
+        for index in range(len(seats) - 1):
+            if (
+                self.rows[index] == self.rows[index + 1]
+                and self.numbers[index] + 1 == self.numbers[index + 1]
+            ):
+                self.adjacent |= 1 << index
+
+        row_count = max(row_count, max(self.rows, default=0), 1)
+        seats_per_row = max(seats_per_row, max(self.numbers, default=0), 1)
+        best_row = 1 + SEAT_SUGGESTION_BEST_ROW * (row_count - 1)
+        centre = (seats_per_row + 1) / 2
+        scores = [
+            abs(row - best_row) / row_count + abs(number - centre) / seats_per_row
+            for row, number in zip(self.rows, self.numbers)
+        ]
+        self.prefix_scores = [0.0, *accumulate(scores)]
+
+    def __len__(self) -> int:
+        return len(self.seat_ids)
+
+    def best_block(self, free: int, count: int) -> Optional[list[int]]:
+        """
+        Ids of the best-scoring `count` adjacent seats among the `free` bits,
+        lower scores being closer to the preferred spot, or None.
+
+        Bit-parallel: after the loop bit i of `starts` is set only if seats
+        i .. i + count - 1 are all free and side by side, so the scan costs
+        `count` big-int operations plus one step per candidate block.
+        """
+        if count < 1 or count > len(self.seat_ids):
+            return None
+        starts = free
+        linked = self.adjacent
+        for shift in range(1, count):
+            starts &= (free >> shift) & linked
+            linked &= self.adjacent >> shift
+
+        best_start, best_score = None, float("inf")
+        prefix = self.prefix_scores
+        while starts:
+            lowest = starts & -starts
+            start = lowest.bit_length() - 1
+            score = prefix[start + count] - prefix[start]
+            if score < best_score:
+                best_start, best_score = start, score
+            starts ^= lowest
+
+        if best_start is None:
+            return None
+        return self.seat_ids[best_start : best_start + count]
+
+
+class HallLayouts:
+    """
+    Bounded cache of hall layouts, shared by all showtimes in a hall.
+    Seating rarely changes, entries are simply rebuilt after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_halls: int = HALL_LAYOUT_CACHE_SIZE,
+        ttl: float = HALL_LAYOUT_TTL_SECONDS,
+    ):
+        self.max_halls = max_halls
+        self.ttl = ttl
+        self._layouts: OrderedDict[int, tuple[float, HallLayout]] = OrderedDict()
+
+    async def get(self, db: AsyncSession, hall_id: int) -> HallLayout:
+        entry = self._layouts.get(hall_id)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+            self._layouts.move_to_end(hall_id)
+            return entry[1]
+
+        layout = await self.load(db, hall_id)
+        self._layouts[hall_id] = (time.monotonic(), layout)
+        self._layouts.move_to_end(hall_id)
+        while len(self._layouts) > self.max_halls:
+            self._layouts.popitem(last=False)
+        return layout
+
+    @staticmethod
+    async def load(db: AsyncSession, hall_id: int) -> HallLayout:
+        grid = (
+            await db.execute(
+                select(CinemaHall.row_count, CinemaHall.seats_per_row).where(
+                    CinemaHall.id == hall_id
+                )
+            )
+        ).one_or_none()
+        seats = await db.execute(
+            select(Seat.id, Seat.seat_code, Seat.row_number, Seat.seat_number)
+            .where(Seat.cinema_hall_id == hall_id)
+            .order_by(Seat.row_number, Seat.seat_number, Seat.id)
+        )
+        return HallLayout(hall_id, [tuple(seat) for seat in seats], *(grid or ()))
+
+    def invalidate(self, hall_id: int) -> None:
+        self._layouts.pop(hall_id, None)
+
+
+hall_layouts = HallLayouts()
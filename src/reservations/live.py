@@ -0,0 +1,361 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Optional
+
+from src.config import settings
+from src.database import sessionmanager
+from src.reservations.availability import (
+    SeatChangeListener,
+    ShowtimeSeatMap,
+    seat_availability,
+)
+from src.reservations.constants import (
+    SEAT_FEED_HEARTBEAT_SECONDS,
+    SEAT_FEED_MAX_PENDING_SEATS,
+    SEAT_FEED_STALL_SECONDS,
+    SEAT_FEED_OUTBOX_SIZE,
+)
+from src.reservations.schemas import SeatDelta, SeatMapDelta, SeatState
+
+logger = logging.getLogger(__name__)
+
+REDIS_RECONNECT_SECONDS = 1.0
+
+
+class SeatFeedBackend(ABC):
+    """Carries committed seat changes between worker processes"""
+
+    @abstractmethod
+    async def publish(
+        self, showtime_id: int, seat_ids: tuple[int, ...], state: SeatState
+    ) -> None: ...
+
+    @abstractmethod
+    async def start(self, listener: SeatChangeListener) -> None:
+        """Call `listener` for every change published by another worker"""
+
+    async def close(self) -> None:
+        return None
+
+
+class LocalSeatFeedBackend(SeatFeedBackend):
+    """
+    In-process stand-in for a pub/sub server. Backends sharing a `hub` see
+    each other's changes like workers sharing Redis; on its own hub a
+    backend has no peers and publishing does nothing.
+    """
+
+    def __init__(self, hub: Optional[list["LocalSeatFeedBackend"]] = None):
+        self._hub = hub if hub is not None else []
+        self._listener: Optional[SeatChangeListener] = None
+
+    async def publish(
+        self, showtime_id: int, seat_ids: tuple[int, ...], state: SeatState
+    ) -> None:
+        for peer in self._hub:
+            if peer is not self and peer._listener is not None:
+                peer._listener(showtime_id, seat_ids, state)
+
+    async def start(self, listener: SeatChangeListener) -> None:
+        self._listener = listener
+        if self not in self._hub:
+            self._hub.append(self)
+
+    async def close(self) -> None:
+        if self in self._hub:
+            self._hub.remove(self)
+        self._listener = None
+
+
+class RedisSeatFeedBackend(SeatFeedBackend):
+    """
+    Changes go through one pub/sub channel of any Redis-protocol server.
+    Messages carry the sender's id so a worker skips its own changes, which
+    it has already applied. Changes missed while disconnected are repaired
+    by the seat map TTL.
+
+    Requires the optional `redis` package unless a ready client is passed in.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[Any] = None,
+        channel: str = "seat-updates",
+    ):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise ImportError(
+                    "The 'redis' package is required for the redis seat feed"
+                ) from e
+            client = Redis.from_url(url)
+        self._client = client
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(
+        self, showtime_id: int, seat_ids: tuple[int, ...], state: SeatState
+    ) -> None:
+        message = {
+            "origin": self._origin,
+            "showtime_id": showtime_id,
+            "seat_ids": list(seat_ids),
+            "state": state.value,
+        }
+        await self._client.publish(self._channel, json.dumps(message))
+
+    async def start(self, listener: SeatChangeListener) -> None:
+        self._task = asyncio.create_task(self._listen(listener))
+
+    async def _listen(self, listener: SeatChangeListener) -> None:
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._dispatch(message["data"], listener)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Seat feed subscription failed, reconnecting")
+                await asyncio.sleep(REDIS_RECONNECT_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def _dispatch(self, data: Any, listener: SeatChangeListener) -> None:
+        try:
+            message = json.loads(data)
+            if message["origin"] == self._origin:
+                return
+            showtime_id = int(message["showtime_id"])
+            seat_ids = tuple(int(seat_id) for seat_id in message["seat_ids"])
+            state = SeatState(message["state"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed seat feed message %r", data)
+            return
+        listener(showtime_id, seat_ids, state)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._client.aclose()
+
+
+class SeatFeedSubscription:
+    """
+    One client's stream of changes to a showtime.
+
+    Changes not yet sent are merged per seat, so a client that falls behind
+    gets the latest state of each seat once instead of a growing backlog.
+    Past `max_pending` seats the backlog is dropped and the client is sent
+    a new snapshot instead.
+    """
+
+    __slots__ = ("showtime_id", "pending", "resync", "closed", "drained_at", "_ready")
+
+    def __init__(self, showtime_id: int):
+        self.showtime_id = showtime_id
+        self.pending: dict[int, SeatState] = {}
+        self.resync = False
+        self.closed = False
+        self.drained_at = time.monotonic()
+        self._ready = asyncio.Event()
+
+    def push(
+        self, seat_ids: tuple[int, ...], state: SeatState, max_pending: int
+    ) -> None:
+        if not self.resync:
+            for seat_id in seat_ids:
+                self.pending[seat_id] = state
+            if len(self.pending) > max_pending:
+                self.pending = {}
+                self.resync = True
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for changes; False if there were none within `timeout`"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def drain(self) -> tuple[bool, dict[int, SeatState]]:
+        resync, pending = self.resync, self.pending
+        self.resync, self.pending = False, {}
+        self.drained_at = time.monotonic()
+        self._ready.clear()
+        return resync, pending
+
+
+class SeatFeed:
+    """
+    Pushes seat changes to clients watching a showtime's seat map.
+
+    Changes committed through this worker reach `publish` through a
+    `seat_availability` listener; they are fanned out to local subscribers
+    right away and queued for the backend, which forwards them to the other
+    workers. Changes from other workers are applied to this worker's seat
+    maps before being fanned out.
+
+    Fan-out never blocks on a client: each subscription only keeps the
+    latest state per seat. A subscriber that has not taken a change for
+    `stall_seconds` is disconnected and can reconnect for a new snapshot.
+    """
+
+    def __init__(
+        self,
+        backend: SeatFeedBackend,
+        max_pending: int = SEAT_FEED_MAX_PENDING_SEATS,
+        stall_seconds: float = SEAT_FEED_STALL_SECONDS,
+        outbox_size: int = SEAT_FEED_OUTBOX_SIZE,
+    ):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.stall_seconds = stall_seconds
+        self._subscriptions: dict[int, set[SeatFeedSubscription]] = {}
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=outbox_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def subscriber_count(self, showtime_id: int) -> int:
+        return len(self._subscriptions.get(showtime_id, ()))
+
+    def subscribe(self, showtime_id: int) -> SeatFeedSubscription:
+        subscription = SeatFeedSubscription(showtime_id)
+        self._subscriptions.setdefault(showtime_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: SeatFeedSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.showtime_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.showtime_id]
+        subscription.close()
+
+    def fan_out(
+        self, showtime_id: int, seat_ids: tuple[int, ...], state: SeatState
+    ) -> None:
+        subscriptions = self._subscriptions.get(showtime_id)
+        if not subscriptions:
+            return
+        stalled_before = time.monotonic() - self.stall_seconds
+        stalled = []
+        for subscription in subscriptions:
+            if (
+                subscription.pending or subscription.resync
+            ) and subscription.drained_at < stalled_before:
+                stalled.append(subscription)
+            else:
+                subscription.push(seat_ids, state, self.max_pending)
+        for subscription in stalled:
+            self.unsubscribe(subscription)
+
+    def publish(
+        self, showtime_id: int, seat_ids: tuple[int, ...], state: SeatState
+    ) -> None:
+        """A change committed through this worker"""
+        self.fan_out(showtime_id, seat_ids, state)
+        if self._task is None:
+            return
+        try:
+            self._outbox.put_nowait((showtime_id, seat_ids, state))
+        except asyncio.QueueFull:
+            logger.warning("Seat feed outbox full, change to %d dropped", showtime_id)
+
+    def receive(
+        self, showtime_id: int, seat_ids: tuple[int, ...], state: SeatState
+    ) -> None:
+        """A change committed through another worker"""
+        seat_availability.apply(showtime_id, seat_ids, state)
+        self.fan_out(showtime_id, seat_ids, state)
+
+    async def start(self) -> None:
+        await self.backend.start(self.receive)
+        seat_availability.add_listener(self.publish)
+        self._task = asyncio.create_task(self._forward())
+
+    async def stop(self) -> None:
+        seat_availability.remove_listener(self.publish)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                self.unsubscribe(subscription)
+        await self.backend.close()
+
+    async def _forward(self) -> None:
+        while True:
+            showtime_id, seat_ids, state = await self._outbox.get()
+            try:
+                await self.backend.publish(showtime_id, seat_ids, state)
+            except Exception:
+                logger.exception("Failed to publish seat change to %d", showtime_id)
+
+    async def events(
+        self, subscription: SeatFeedSubscription, seat_map: ShowtimeSeatMap
+    ) -> AsyncIterator[str]:
+        """Server-sent events for `subscription`, starting from `seat_map`"""
+        showtime_id = subscription.showtime_id
+        try:
+            yield format_event("snapshot", seat_map.to_response().model_dump_json())
+            while not subscription.closed:
+                if not await subscription.wait(SEAT_FEED_HEARTBEAT_SECONDS):
+                    yield ": keep-alive\n\n"
+                    continue
+                resync, changes = subscription.drain()
+                if resync:
+                    seat_map = seat_availability.get_cached(showtime_id)
+                    if seat_map is None:
+                        async with sessionmanager.session() as db:
+                            seat_map = await seat_availability.get_map(db, showtime_id)
+                    snapshot = seat_map.to_response()
+                    yield format_event("snapshot", snapshot.model_dump_json())
+                elif changes:
+                    delta = SeatMapDelta(
+                        showtime_id=showtime_id,
+                        seats=[
+                            SeatDelta(id=seat_id, state=state)
+                            for seat_id, state in changes.items()
+                        ],
+                    )
+                    yield format_event("update", delta.model_dump_json())
+        finally:
+            self.unsubscribe(subscription)
+
+
+def format_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def create_seat_feed_backend() -> SeatFeedBackend:
+    if settings.seat_feed_backend == "redis":
+        return RedisSeatFeedBackend(url=settings.seat_feed_url)
+    if settings.seat_feed_backend == "local":
+        return LocalSeatFeedBackend()
+    raise ValueError(f"Unknown seat feed backend {settings.seat_feed_backend!r}")
+
+
+seat_feed = SeatFeed(create_seat_feed_backend())
@@ -1,6 +1,14 @@
 from datetime import datetime
 
-from sqlalchemy import func, ForeignKey, String, Numeric
+from sqlalchemy import (
+    func,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    String,
+    Numeric,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -8,15 +16,35 @@ from src.database import Base
 
 class ReservationSeat(Base):
     __tablename__ = "reservation_seat"
-
-    reservation_id: Mapped[int] = mapped_column(
-        ForeignKey("reservations.id"), primary_key=True
+    __table_args__ = (
+        # A seat can be sold only once per showtime
+        UniqueConstraint(
+            "showtime_id", "seat_id", name="uq_reservation_seat_showtime_id_seat_id"
+        ),
+        # Keeps showtime_id equal to the owning reservation's showtime
+        ForeignKeyConstraint(
+            ["reservation_id", "showtime_id"],
+            ["reservations.id", "reservations.showtime_id"],
+            name="fk_reservation_seat_reservation",
+            ondelete="CASCADE",
+        ),
+        Index("ix_reservation_seat_seat_id", "seat_id"),
     )
+
+    reservation_id: Mapped[int] = mapped_column(primary_key=True)
     seat_id: Mapped[int] = mapped_column(ForeignKey("seats.id"), primary_key=True)
+    showtime_id: Mapped[int] = mapped_column(nullable=False)
 
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        UniqueConstraint("id", "showtime_id", name="uq_reservations_id_showtime_id"),
+        # A user's reservations, newest first
+        Index("ix_reservations_user_id_created_at", "user_id", "created_at"),
+        Index("ix_reservations_showtime_id", "showtime_id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     total_amount: Mapped[Numeric] = mapped_column(Numeric(10, 2), nullable=False)
@@ -33,7 +61,7 @@ class Reservation(Base):
     )
 
     seats: Mapped[list["Seat"]] = relationship(
-        secondary="reservation_seat", back_populates="reservations"
+        secondary="reservation_seat", back_populates="reservations", viewonly=True
     )
     showtime: Mapped["Showtime"] = relationship(back_populates="reservations")
     user: Mapped["User"] = relationship(back_populates="reservations")
@@ -41,9 +69,21 @@ class Reservation(Base):
 
 class Seat(Base):
     __tablename__ = "seats"
+    __table_args__ = (
+        # Also serves the (row, number) ordered scan that builds hall layouts
+        UniqueConstraint(
+            "cinema_hall_id",
+            "row_number",
+            "seat_number",
+            name="uq_seats_cinema_hall_id_row_number_seat_number",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     seat_code: Mapped[str] = mapped_column(String(10), unique=True)
+    # 1-based, rows counted from the screen and seats from the left
+    row_number: Mapped[int] = mapped_column(nullable=False)
+    seat_number: Mapped[int] = mapped_column(nullable=False)
     price: Mapped[Numeric] = mapped_column(Numeric(10, 2), nullable=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -55,6 +95,100 @@ class Seat(Base):
     )
 
     reservations: Mapped[list["Reservation"]] = relationship(
-        secondary="reservation_seat", back_populates="seats"
+        secondary="reservation_seat", back_populates="seats", viewonly=True
     )
     cinema_hall: Mapped["CinemaHall"] = relationship(back_populates="seats")
+
+
+class SeatHoldSeat(Base):
+    __tablename__ = "seat_hold_seat"
+    __table_args__ = (
+        # A seat can be held by only one hold per showtime
+        UniqueConstraint(
+            "showtime_id", "seat_id", name="uq_seat_hold_seat_showtime_id_seat_id"
+        ),
+        ForeignKeyConstraint(
+            ["hold_id", "showtime_id"],
+            ["seat_holds.id", "seat_holds.showtime_id"],
+            name="fk_seat_hold_seat_hold",
+            ondelete="CASCADE",
+        ),
+        Index("ix_seat_hold_seat_seat_id", "seat_id"),
+    )
+
+    hold_id: Mapped[int] = mapped_column(primary_key=True)
+    seat_id: Mapped[int] = mapped_column(ForeignKey("seats.id"), primary_key=True)
+    showtime_id: Mapped[int] = mapped_column(nullable=False)
+
+
+class SeatHold(Base):
+    """Seats kept for a user during checkout until `expires_at`"""
+
+    __tablename__ = "seat_holds"
+    __table_args__ = (
+        UniqueConstraint("id", "showtime_id", name="uq_seat_holds_id_showtime_id"),
+        Index("ix_seat_holds_showtime_id", "showtime_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    expires_at: Mapped[datetime] = mapped_column(nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="RESTRICT"), nullable=False, index=True
+    )
+    showtime_id: Mapped[int] = mapped_column(
+        ForeignKey("showtimes.id", ondelete="RESTRICT"), nullable=False
+    )
+
+
+class ReservationSeatArchive(Base):
+    """Cold copy of reservation_seat rows of archived reservations"""
+
+    __tablename__ = "reservation_seat_archive"
+    __table_args__ = (Index("ix_reservation_seat_archive_showtime_id", "showtime_id"),)
+
+    reservation_id: Mapped[int] = mapped_column(primary_key=True)
+    seat_id: Mapped[int] = mapped_column(primary_key=True)
+    showtime_id: Mapped[int] = mapped_column(nullable=False)
+
+
+class ReservationArchive(Base):
+    """
+    Reservations of long past showtimes, moved out of `reservations` by
+    `src.reservations.archive` so the hot table and its indexes stay small.
+    Rows keep their original ids; there are no foreign keys to keep writes
+    and deletes elsewhere cheap.
+    """
+
+    __tablename__ = "reservations_archive"
+    __table_args__ = (
+        Index("ix_reservations_archive_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    total_amount: Mapped[Numeric] = mapped_column(Numeric(10, 2), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    user_id: Mapped[int] = mapped_column(nullable=False)
+    showtime_id: Mapped[int] = mapped_column(nullable=False)
+
+
+class ShowtimePriceTier(Base):
+    """Surcharge on a range of rows for one showtime, e.g. premium rows"""
+
+    __tablename__ = "showtime_price_tiers"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    first_row: Mapped[int] = mapped_column(nullable=False)
+    last_row: Mapped[int] = mapped_column(nullable=False)
+    surcharge: Mapped[Numeric] = mapped_column(Numeric(10, 2), nullable=False)
+
+    showtime_id: Mapped[int] = mapped_column(
+        ForeignKey("showtimes.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+
+    showtime: Mapped["Showtime"] = relationship(back_populates="price_tiers")
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import sys
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database import sessionmanager
+from src.movies.models import Showtime
+from src.reservations.models import (
+    ReservationSeat,
+    ReservationSeatArchive,
+    Seat,
+    SeatHoldSeat,
+)
+
+
+async def add_to_counters(
+    db: AsyncSession, showtime_id: int, sold: int = 0, held: int = 0
+) -> None:
+    """
+    Shift a showtime's occupancy counters inside the caller's transaction.
+
+    This locks the showtime row until commit, so callers do it as their
+    last statement to keep concurrent bookings of the showtime waiting as
+    briefly as possible.
+    """
+    if not sold and not held:
+        return
+    await db.execute(
+        update(Showtime)
+        .where(Showtime.id == showtime_id)
+        .values(sold=Showtime.sold + sold, held=Showtime.held + held)
+    )
+
+
+async def reconcile_counters(
+    db: AsyncSession, showtime_ids: Optional[Iterable[int]] = None
+) -> list[int]:
+    """
+    Recount capacity, sold and held seats and fix the showtimes whose
+    counters drifted. Returns the ids of the repaired showtimes.
+
+    Counts come from the statement's snapshot, so a showtime booked while
+    this runs may be reported again by the next pass.
+    """
+    capacity = (
+        select(func.count(Seat.id))
+        .where(Seat.cinema_hall_id == Showtime.cinema_hall_id)
+        .scalar_subquery()
+    )
+    # Archived seats stay sold, they only moved to the cold table
+    sold = (
+        select(func.count(ReservationSeat.seat_id))
+        .where(ReservationSeat.showtime_id == Showtime.id)
+        .scalar_subquery()
+    ) + (
+        select(func.count(ReservationSeatArchive.seat_id))
+        .where(ReservationSeatArchive.showtime_id == Showtime.id)
+        .scalar_subquery()
+    )
+    held = (
+        select(func.count(SeatHoldSeat.seat_id))
+        .where(SeatHoldSeat.showtime_id == Showtime.id)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Showtime)
+        .where(
+            or_(
+                Showtime.capacity != capacity,
+                Showtime.sold != sold,
+                Showtime.held != held,
+            )
+        )
+        .values(capacity=capacity, sold=sold, held=held)
+        .returning(Showtime.id)
+    )
+    if showtime_ids is not None:
+        stmt = stmt.where(Showtime.id.in_(list(showtime_ids)))
+    db_response = await db.execute(stmt)
+    return sorted(db_response.scalars())
+
+
+async def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Repair showtime occupancy counters")
+    parser.add_argument("showtime_ids", nargs="*", type=int, help="default: all")
+    args = parser.parse_args(argv)
+
+    sessionmanager.init(settings.get_database_url(), **settings.get_engine_options())
+    try:
+        async with sessionmanager.unit_of_work() as db:
+            repaired = await reconcile_counters(db, args.showtime_ids or None)
+    finally:
+        await sessionmanager.close()
+    print(f"Repaired {len(repaired)} showtimes: {repaired}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
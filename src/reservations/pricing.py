@@ -0,0 +1,168 @@
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import select, update, delete, insert, func, ColumnElement, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import on_commit
+from src.movies.models import Showtime
+from src.reservations.constants import (
+    SHOWTIME_PRICES_CACHE_SIZE,
+    SHOWTIME_PRICES_TTL_SECONDS,
+)
+from src.reservations.exceptions import ShowtimeNotFoundError, SeatNotFoundError
+from src.reservations.models import Seat, ShowtimePriceTier
+from src.reservations.schemas import ShowtimePricing, PriceTier
+
+
+def seat_price() -> ColumnElement[Decimal]:
+    """
+    Price of `Seat` at `Showtime`: base price plus the highest surcharge of
+    the tiers covering the seat's row, times the showtime's multiplier.
+    """
+    surcharge = (
+        select(func.max(ShowtimePriceTier.surcharge))
+        .where(
+            ShowtimePriceTier.showtime_id == Showtime.id,
+            Seat.row_number.between(
+                ShowtimePriceTier.first_row, ShowtimePriceTier.last_row
+            ),
+        )
+        .correlate(Seat, Showtime)
+        .scalar_subquery()
+    )
+    return func.round(
+        (Seat.price + func.coalesce(surcharge, 0)) * Showtime.price_multiplier,
+        2,
+        type_=Numeric(10, 2),
+    )
+
+
+async def price_seats(
+    db: AsyncSession, showtime_id: int, seat_ids: Iterable[int]
+) -> Decimal:
+    """Total for the seats computed by the database in a single query"""
+    db_response = await db.execute(
+        select(func.coalesce(func.sum(seat_price()), 0))
+        .select_from(Seat)
+        .join(Showtime, Showtime.cinema_hall_id == Seat.cinema_hall_id)
+        .where(Showtime.id == showtime_id, Seat.id.in_(list(seat_ids)))
+    )
+    return db_response.scalar_one()
+
+
+class ShowtimePrices:
+    """
+    Per-showtime seat price tables for quotes, so pricing a 10-seat
+    selection is 10 dict lookups once the table is loaded.
+
+    Tables are dropped when the showtime's pricing changes and rebuilt
+    after `ttl` seconds otherwise. Bookings never use them: the charged
+    total is always recomputed by `price_seats` in the booking transaction.
+    """
+
+    def __init__(
+        self,
+        max_showtimes: int = SHOWTIME_PRICES_CACHE_SIZE,
+        ttl: float = SHOWTIME_PRICES_TTL_SECONDS,
+    ):
+        self.max_showtimes = max_showtimes
+        self.ttl = ttl
+        self._tables: OrderedDict[int, tuple[float, dict[int, Decimal]]] = OrderedDict()
+
+    async def get(self, db: AsyncSession, showtime_id: int) -> dict[int, Decimal]:
+        entry = self._tables.get(showtime_id)
+        if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+            self._tables.move_to_end(showtime_id)
+            return entry[1]
+
+        prices = await self.load(db, showtime_id)
+        self._tables[showtime_id] = (time.monotonic(), prices)
+        self._tables.move_to_end(showtime_id)
+        while len(self._tables) > self.max_showtimes:
+            self._tables.popitem(last=False)
+        return prices
+
+    @staticmethod
+    async def load(db: AsyncSession, showtime_id: int) -> dict[int, Decimal]:
+        db_response = await db.execute(
+            select(Seat.id, seat_price())
+            .join(Showtime, Showtime.cinema_hall_id == Seat.cinema_hall_id)
+            .where(Showtime.id == showtime_id)
+        )
+        prices = dict(db_response.all())
+        if not prices and await db.get(Showtime, showtime_id) is None:
+            raise ShowtimeNotFoundError(detail=f"Showtime {showtime_id} not found")
+        return prices
+
+    async def quote(
+        self, db: AsyncSession, showtime_id: int, seat_ids: Iterable[int]
+    ) -> Decimal:
+        prices = await self.get(db, showtime_id)
+        seat_ids = set(seat_ids)
+        missing = seat_ids - prices.keys()
+        if missing:
+            raise SeatNotFoundError(
+                detail=f"Seats {sorted(missing)} are not in this showtime's hall"
+            )
+        return sum((prices[seat_id] for seat_id in seat_ids), Decimal(0))
+
+    def invalidate_on_commit(self, db: AsyncSession, showtime_id: int) -> None:
+        async def invalidate_committed() -> None:
+            self._tables.pop(showtime_id, None)
+
+        on_commit(db, invalidate_committed)
+
+
+class PricingRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_pricing(self, showtime_id: int) -> ShowtimePricing:
+        multiplier = await self.db.scalar(
+            select(Showtime.price_multiplier).where(Showtime.id == showtime_id)
+        )
+        if multiplier is None:
+            raise ShowtimeNotFoundError(detail=f"Showtime {showtime_id} not found")
+        db_response = await self.db.execute(
+            select(ShowtimePriceTier)
+            .where(ShowtimePriceTier.showtime_id == showtime_id)
+            .order_by(ShowtimePriceTier.first_row, ShowtimePriceTier.id)
+        )
+        return ShowtimePricing(
+            price_multiplier=multiplier,
+            tiers=[PriceTier.model_validate(tier) for tier in db_response.scalars()],
+        )
+
+    async def set_pricing(
+        self, showtime_id: int, pricing: ShowtimePricing
+    ) -> ShowtimePricing:
+        """Replace the showtime's pricing; existing reservations keep their totals"""
+        db_response = await self.db.execute(
+            update(Showtime)
+            .where(Showtime.id == showtime_id)
+            .values(price_multiplier=pricing.price_multiplier)
+            .returning(Showtime.id)
+        )
+        if db_response.scalar_one_or_none() is None:
+            raise ShowtimeNotFoundError(detail=f"Showtime {showtime_id} not found")
+        await self.db.execute(
+            delete(ShowtimePriceTier).where(
+                ShowtimePriceTier.showtime_id == showtime_id
+            )
+        )
+        if pricing.tiers:
+            await self.db.execute(
+                insert(ShowtimePriceTier),
+                [
+                    {"showtime_id": showtime_id, **tier.model_dump()}
+                    for tier in pricing.tiers
+                ],
+            )
+        showtime_prices.invalidate_on_commit(self.db, showtime_id)
+        return pricing
+
+
+showtime_prices = ShowtimePrices()
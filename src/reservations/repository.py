@@ -0,0 +1,504 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Union
+
+from sqlalchemy import select, insert, delete, text, bindparam, union_all, Select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Integer
+
+from src.movies.models import Showtime
+from src.reservations.availability import seat_availability
+from src.reservations.constants import (
+    RESERVATION_LOCK_TIMEOUT,
+    RESERVATION_RETRY_AFTER_SECONDS,
+    SEAT_HOLD_TTL_SECONDS,
+)
+from src.reservations.exceptions import (
+    ShowtimeNotFoundError,
+    SeatNotFoundError,
+    SeatsUnavailableError,
+    SeatsBusyError,
+    ShowtimeClosedError,
+    ReservationNotFoundError,
+    HoldNotFoundError,
+    HoldExpiredError,
+)
+from src.reservations.holds import hold_expiry
+from src.reservations.models import (
+    Reservation,
+    ReservationArchive,
+    ReservationSeat,
+    ReservationSeatArchive,
+    Seat,
+    SeatHold,
+    SeatHoldSeat,
+)
+from src.reservations.occupancy import add_to_counters
+from src.reservations.pricing import price_seats
+from src.reservations.schemas import (
+    ReservationResponse,
+    SeatHoldResponse,
+    SeatState,
+)
+
+
+# Postgres lock_not_available (lock_timeout hit) and deadlock_detected
+LOCK_CONFLICT_SQLSTATES = ("55P03", "40P01")
+
+CLAIM_SEATS_STMT = text(
+    "SELECT count(*) FILTER ("
+    "WHERE NOT pg_try_advisory_xact_lock(CAST(:showtime_id AS integer), seat_id)"
+    ") FROM unnest(:seat_ids) AS seat_id"
+).bindparams(bindparam("seat_ids", type_=ARRAY(Integer)))
+
+
+def is_lock_conflict(error: OperationalError) -> bool:
+    return getattr(error.orig, "sqlstate", None) in LOCK_CONFLICT_SQLSTATES
+
+
+class ReservationsRepository:
+    """
+    Books, holds and cancels seats.
+
+    Double booking is prevented by the (showtime_id, seat_id) unique
+    constraints on reservation_seat and seat_hold_seat; this class only makes
+    contention cheap: seats are inserted in ascending id order so concurrent
+    bookings never wait on each other in a cycle, and a short lock_timeout
+    turns any wait on a competing uncommitted booking into an immediate
+    conflict.
+
+    Since a seat can be either held or sold, booking and hold paths also take
+    a transaction-scoped advisory lock per (showtime, seat) before checking
+    the other table, so neither can slip past the other's check.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def is_postgresql(self) -> bool:
+        return self.db.bind.dialect.name == "postgresql"
+
+    async def set_lock_timeout(self) -> None:
+        if self.is_postgresql:
+            await self.db.execute(
+                text(f"SET LOCAL lock_timeout = '{RESERVATION_LOCK_TIMEOUT}'")
+            )
+
+    async def claim_seats(self, showtime_id: int, seat_ids: list[int]) -> None:
+        """Fail fast if another transaction is booking or holding these seats"""
+        if not self.is_postgresql:
+            return
+        db_response = await self.db.execute(
+            CLAIM_SEATS_STMT, {"showtime_id": showtime_id, "seat_ids": seat_ids}
+        )
+        if db_response.scalar_one():
+            await self.raise_busy(seat_ids)
+
+    async def get_bookable_showtime(self, showtime_id: int) -> Showtime:
+        showtime = await self.db.get(Showtime, showtime_id)
+        if showtime is None:
+            raise ShowtimeNotFoundError(detail=f"Showtime {showtime_id} not found")
+        if showtime.start_time <= datetime.now():
+            raise ShowtimeClosedError(detail="Showtime has already started")
+        return showtime
+
+    async def get_hall_seats(self, hall_id: int, seat_ids: list[int]) -> list[Seat]:
+        db_response = await self.db.execute(
+            select(Seat)
+            .where(Seat.cinema_hall_id == hall_id, Seat.id.in_(seat_ids))
+            .order_by(Seat.id)
+        )
+        seats = list(db_response.scalars())
+        missing = set(seat_ids) - {seat.id for seat in seats}
+        if missing:
+            raise SeatNotFoundError(
+                detail=f"Seats {sorted(missing)} are not in this showtime's hall"
+            )
+        return seats
+
+    async def get_taken_seat_ids(
+        self, showtime_id: int, seat_ids: Iterable[int]
+    ) -> list[int]:
+        db_response = await self.db.execute(
+            select(ReservationSeat.seat_id).where(
+                ReservationSeat.showtime_id == showtime_id,
+                ReservationSeat.seat_id.in_(list(seat_ids)),
+            )
+        )
+        return sorted(db_response.scalars())
+
+    async def get_held_seat_ids(
+        self, showtime_id: int, seat_ids: Iterable[int]
+    ) -> list[int]:
+        db_response = await self.db.execute(
+            select(SeatHoldSeat.seat_id)
+            .join(SeatHold, SeatHold.id == SeatHoldSeat.hold_id)
+            .where(
+                SeatHoldSeat.showtime_id == showtime_id,
+                SeatHoldSeat.seat_id.in_(list(seat_ids)),
+                SeatHold.expires_at > datetime.now(),
+            )
+        )
+        return sorted(db_response.scalars())
+
+    async def check_cached_availability(
+        self, showtime_id: int, seat_ids: list[int]
+    ) -> None:
+        """
+        Reject seats the cached map shows as taken, before any lock is taken.
+        The map can miss releases made by other workers, so taken seats are
+        confirmed against the database first; seats that turn out to be free
+        are freed in the map too.
+        """
+        seat_map = seat_availability.get_cached(showtime_id)
+        if seat_map is None:
+            return
+        cached_taken = [
+            seat_id
+            for seat_id in seat_ids
+            if seat_id in seat_map.positions and not seat_map.is_free(seat_id)
+        ]
+        if not cached_taken:
+            return
+        taken = await self.get_taken_seat_ids(showtime_id, cached_taken)
+        taken += await self.get_held_seat_ids(showtime_id, cached_taken)
+        released = set(cached_taken) - set(taken)
+        if released:
+            seat_availability.apply(showtime_id, released, SeatState.free)
+        if taken:
+            raise SeatsUnavailableError(
+                detail={"message": "Seats are already taken", "seat_ids": sorted(taken)}
+            )
+
+    async def raise_unavailable(self, showtime_id: int, seat_ids: list[int]) -> None:
+        """Roll back the failed insert and report which seats are taken"""
+        await self.db.rollback()
+        taken = await self.get_taken_seat_ids(showtime_id, seat_ids)
+        taken += await self.get_held_seat_ids(showtime_id, seat_ids)
+        raise SeatsUnavailableError(
+            detail={"message": "Seats are already taken", "seat_ids": sorted(taken)}
+        )
+
+    async def raise_busy(self, seat_ids: list[int]) -> None:
+        """
+        Roll back a transaction that hit lock_timeout, a deadlock or another
+        transaction's seat claim. The competing booking may still fail, so
+        the client is told to retry.
+        """
+        await self.db.rollback()
+        raise SeatsBusyError(
+            detail={"message": "Seats are being booked", "seat_ids": seat_ids},
+            headers={"Retry-After": str(RESERVATION_RETRY_AFTER_SECONDS)},
+        )
+
+    async def insert_reservation(
+        self,
+        user_id: int,
+        showtime_id: int,
+        seats: list[Seat],
+        released_holds: int = 0,
+    ) -> ReservationResponse:
+        """
+        Book `seats`, converting `released_holds` held seats to sold ones.
+        The counters are updated once, last, so the showtime row is locked
+        only until the commit that follows.
+        """
+        seat_ids = [seat.id for seat in seats]
+        reservation = Reservation(
+            user_id=user_id,
+            showtime_id=showtime_id,
+            # Always priced here, inside the booking transaction
+            total_amount=await price_seats(self.db, showtime_id, seat_ids),
+        )
+        try:
+            self.db.add(reservation)
+            await self.db.flush()
+            await self.db.execute(
+                insert(ReservationSeat),
+                [
+                    {
+                        "reservation_id": reservation.id,
+                        "showtime_id": showtime_id,
+                        "seat_id": seat_id,
+                    }
+                    for seat_id in seat_ids
+                ],
+            )
+            await add_to_counters(
+                self.db, showtime_id, sold=len(seat_ids), held=-released_holds
+            )
+        except IntegrityError:
+            await self.raise_unavailable(showtime_id, seat_ids)
+        except OperationalError as e:
+            if not is_lock_conflict(e):
+                raise
+            await self.raise_busy(seat_ids)
+
+        seat_availability.reserve_on_commit(self.db, showtime_id, seat_ids)
+        return ReservationResponse(
+            id=reservation.id,
+            user_id=user_id,
+            showtime_id=showtime_id,
+            total_amount=reservation.total_amount,
+            created_at=reservation.created_at,
+            seat_ids=seat_ids,
+        )
+
+    async def prepare_seats(self, showtime_id: int, seat_ids: list[int]) -> list[Seat]:
+        """
+        Lock the requested seats and make sure nobody else holds them.
+        Holds that have expired but were not cleaned up yet are removed.
+        """
+        showtime = await self.get_bookable_showtime(showtime_id)
+        seats = await self.get_hall_seats(showtime.cinema_hall_id, seat_ids)
+        await self.claim_seats(showtime_id, seat_ids)
+        await self.delete_expired_holds_for_seats(showtime_id, seat_ids)
+        held = await self.get_held_seat_ids(showtime_id, seat_ids)
+        if held:
+            raise SeatsUnavailableError(
+                detail={"message": "Seats are on hold", "seat_ids": held}
+            )
+        return seats
+
+    async def create_reservation(
+        self, user_id: int, showtime_id: int, seat_ids: list[int]
+    ) -> ReservationResponse:
+        seat_ids = sorted(set(seat_ids))
+        await self.check_cached_availability(showtime_id, seat_ids)
+
+        await self.set_lock_timeout()
+        seats = await self.prepare_seats(showtime_id, seat_ids)
+        return await self.insert_reservation(user_id, showtime_id, seats)
+
+    @staticmethod
+    def select_user_reservation_seats(
+        reservation: type[Union[Reservation, ReservationArchive]],
+        reservation_seat: type[Union[ReservationSeat, ReservationSeatArchive]],
+        user_id: int,
+    ) -> Select:
+        return (
+            select(
+                reservation.id,
+                reservation.user_id,
+                reservation.showtime_id,
+                reservation.total_amount,
+                reservation.created_at,
+                reservation_seat.seat_id,
+            )
+            .join(reservation_seat, reservation_seat.reservation_id == reservation.id)
+            .where(reservation.user_id == user_id)
+        )
+
+    async def get_user_reservations(
+        self, user_id: int, include_archived: bool = False
+    ) -> list[ReservationResponse]:
+        """Newest first; archived ones come from the cold tables via UNION ALL"""
+        stmt = self.select_user_reservation_seats(Reservation, ReservationSeat, user_id)
+        if include_archived:
+            stmt = union_all(
+                stmt,
+                self.select_user_reservation_seats(
+                    ReservationArchive, ReservationSeatArchive, user_id
+                ),
+            )
+        rows = stmt.subquery()
+        db_response = await self.db.execute(
+            select(rows).order_by(rows.c.created_at.desc(), rows.c.id, rows.c.seat_id)
+        )
+        reservations: dict[int, ReservationResponse] = {}
+        for row in db_response:
+            if row.id not in reservations:
+                reservations[row.id] = ReservationResponse(
+                    id=row.id,
+                    user_id=row.user_id,
+                    showtime_id=row.showtime_id,
+                    total_amount=row.total_amount,
+                    created_at=row.created_at,
+                    seat_ids=[],
+                )
+            reservations[row.id].seat_ids.append(row.seat_id)
+        return list(reservations.values())
+
+    async def cancel_reservation(self, user_id: int, reservation_id: int) -> None:
+        db_response = await self.db.execute(
+            select(Reservation.showtime_id, Showtime.start_time)
+            .join(Showtime, Showtime.id == Reservation.showtime_id)
+            .where(Reservation.id == reservation_id, Reservation.user_id == user_id)
+            .with_for_update(of=Reservation)
+        )
+        reservation = db_response.one_or_none()
+        if reservation is None:
+            raise ReservationNotFoundError(
+                detail=f"Reservation {reservation_id} not found"
+            )
+        if reservation.start_time <= datetime.now():
+            raise ShowtimeClosedError(detail="Showtime has already started")
+
+        db_response = await self.db.execute(
+            delete(ReservationSeat)
+            .where(ReservationSeat.reservation_id == reservation_id)
+            .returning(ReservationSeat.seat_id)
+        )
+        seat_ids = list(db_response.scalars())
+        await self.db.execute(
+            delete(Reservation).where(Reservation.id == reservation_id)
+        )
+        await add_to_counters(self.db, reservation.showtime_id, sold=-len(seat_ids))
+        seat_availability.release_on_commit(self.db, reservation.showtime_id, seat_ids)
+
+    async def create_hold(
+        self, user_id: int, showtime_id: int, seat_ids: list[int]
+    ) -> SeatHoldResponse:
+        seat_ids = sorted(set(seat_ids))
+        await self.check_cached_availability(showtime_id, seat_ids)
+
+        await self.set_lock_timeout()
+        await self.prepare_seats(showtime_id, seat_ids)
+        taken = await self.get_taken_seat_ids(showtime_id, seat_ids)
+        if taken:
+            raise SeatsUnavailableError(
+                detail={"message": "Seats are already taken", "seat_ids": taken}
+            )
+
+        hold = SeatHold(
+            user_id=user_id,
+            showtime_id=showtime_id,
+            expires_at=datetime.now() + timedelta(seconds=SEAT_HOLD_TTL_SECONDS),
+        )
+        try:
+            self.db.add(hold)
+            await self.db.flush()
+            await self.db.execute(
+                insert(SeatHoldSeat),
+                [
+                    {"hold_id": hold.id, "showtime_id": showtime_id, "seat_id": seat_id}
+                    for seat_id in seat_ids
+                ],
+            )
+            await add_to_counters(self.db, showtime_id, held=len(seat_ids))
+        except IntegrityError:
+            await self.raise_unavailable(showtime_id, seat_ids)
+        except OperationalError as e:
+            if not is_lock_conflict(e):
+                raise
+            await self.raise_busy(seat_ids)
+
+        seat_availability.hold_on_commit(
+            self.db, showtime_id, seat_ids, hold.expires_at
+        )
+        hold_expiry.schedule_on_commit(self.db, hold.id, hold.expires_at)
+        return SeatHoldResponse(
+            id=hold.id,
+            user_id=user_id,
+            showtime_id=showtime_id,
+            expires_at=hold.expires_at,
+            seat_ids=seat_ids,
+        )
+
+    async def get_user_hold(self, user_id: int, hold_id: int) -> SeatHold:
+        db_response = await self.db.execute(
+            select(SeatHold)
+            .where(SeatHold.id == hold_id, SeatHold.user_id == user_id)
+            .with_for_update()
+        )
+        hold = db_response.scalar_one_or_none()
+        if hold is None:
+            raise HoldNotFoundError(detail=f"Hold {hold_id} not found")
+        return hold
+
+    async def confirm_hold(self, user_id: int, hold_id: int) -> ReservationResponse:
+        """Turn a live hold into a reservation in the same transaction"""
+        await self.set_lock_timeout()
+        hold = await self.get_user_hold(user_id, hold_id)
+        if hold.expires_at <= datetime.now():
+            raise HoldExpiredError(detail=f"Hold {hold_id} has expired")
+
+        db_response = await self.db.execute(
+            select(SeatHoldSeat.seat_id)
+            .where(SeatHoldSeat.hold_id == hold_id)
+            .order_by(SeatHoldSeat.seat_id)
+        )
+        seat_ids = list(db_response.scalars())
+        showtime = await self.get_bookable_showtime(hold.showtime_id)
+        seats = await self.get_hall_seats(showtime.cinema_hall_id, seat_ids)
+        await self.claim_seats(hold.showtime_id, seat_ids)
+        await self.remove_holds([hold_id])
+        return await self.insert_reservation(
+            user_id, hold.showtime_id, seats, released_holds=len(seat_ids)
+        )
+
+    async def release_hold(self, user_id: int, hold_id: int) -> None:
+        await self.get_user_hold(user_id, hold_id)
+        await self.delete_holds([hold_id])
+
+    async def remove_holds(self, hold_ids: list[int]) -> dict[int, list[int]]:
+        """
+        Delete holds and drop them from the expiry heap, leaving counters and
+        the seat maps to the caller. Returns the seat ids per showtime.
+        """
+        if not hold_ids:
+            return {}
+        db_response = await self.db.execute(
+            delete(SeatHoldSeat)
+            .where(SeatHoldSeat.hold_id.in_(hold_ids))
+            .returning(SeatHoldSeat.showtime_id, SeatHoldSeat.seat_id)
+        )
+        released = defaultdict(list)
+        for showtime_id, seat_id in db_response:
+            released[showtime_id].append(seat_id)
+        await self.db.execute(delete(SeatHold).where(SeatHold.id.in_(hold_ids)))
+        hold_expiry.cancel_on_commit(self.db, hold_ids)
+        return released
+
+    async def delete_holds(self, hold_ids: list[int]) -> None:
+        """Delete holds and mark their seats free once the transaction commits"""
+        released = await self.remove_holds(hold_ids)
+        for showtime_id, seat_ids in sorted(released.items()):
+            await add_to_counters(self.db, showtime_id, held=-len(seat_ids))
+            seat_availability.release_on_commit(self.db, showtime_id, seat_ids)
+
+    async def lock_expired_holds(self, *criteria) -> list[int]:
+        """Ids of expired holds matching `criteria`, skipping ones in use"""
+        stmt = (
+            select(SeatHold.id)
+            .where(SeatHold.expires_at <= datetime.now(), *criteria)
+            .order_by(SeatHold.id)
+        )
+        if self.is_postgresql:
+            stmt = stmt.with_for_update(skip_locked=True)
+        db_response = await self.db.execute(stmt)
+        return list(db_response.scalars())
+
+    async def delete_expired_holds_for_seats(
+        self, showtime_id: int, seat_ids: list[int]
+    ) -> None:
+        hold_ids = await self.lock_expired_holds(
+            SeatHold.id.in_(
+                select(SeatHoldSeat.hold_id).where(
+                    SeatHoldSeat.showtime_id == showtime_id,
+                    SeatHoldSeat.seat_id.in_(seat_ids),
+                )
+            )
+        )
+        await self.delete_holds(hold_ids)
+
+    async def expire_holds(self, hold_ids: list[int]) -> list[int]:
+        """
+        Delete the given holds if they really have expired. Returns the ids
+        of expired holds skipped because another transaction had them
+        locked, so the caller can try them again later.
+        """
+        expired = await self.lock_expired_holds(SeatHold.id.in_(hold_ids))
+        await self.delete_holds(expired)
+        skipped = set(hold_ids) - set(expired)
+        if not skipped:
+            return []
+        db_response = await self.db.execute(
+            select(SeatHold.id)
+            .where(SeatHold.id.in_(skipped), SeatHold.expires_at <= datetime.now())
+            .order_by(SeatHold.id)
+        )
+        return list(db_response.scalars())
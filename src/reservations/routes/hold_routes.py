@@ -0,0 +1,56 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+
+from src.auth.schemas import AccessTokenData
+from src.dependencies import get_current_user_from_jwt, UserDBSession
+from src.reservations.repository import ReservationsRepository
+from src.reservations.schemas import (
+    ReservationResponse,
+    SeatHoldCreateRequest,
+    SeatHoldResponse,
+)
+
+router = APIRouter(
+    prefix="/holds",
+    tags=["reservations"],
+)
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=SeatHoldResponse,
+)
+async def create_hold(
+    db: UserDBSession,
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+    hold: SeatHoldCreateRequest,
+) -> SeatHoldResponse:
+    """Hold seats for a few minutes while the user checks out"""
+    return await ReservationsRepository(db).create_hold(
+        current_user.id, hold.showtime_id, hold.seat_ids
+    )
+
+
+@router.post(
+    "/{hold_id}/confirm/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ReservationResponse,
+)
+async def confirm_hold(
+    db: UserDBSession,
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+    hold_id: int,
+) -> ReservationResponse:
+    return await ReservationsRepository(db).confirm_hold(current_user.id, hold_id)
+
+
+@router.delete("/{hold_id}/", status_code=status.HTTP_204_NO_CONTENT)
+async def release_hold(
+    db: UserDBSession,
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+    hold_id: int,
+) -> None:
+    await ReservationsRepository(db).release_hold(current_user.id, hold_id)
+    return None
@@ -0,0 +1,54 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query, status
+
+from src.constants import ADMIN, STAFF
+from src.dependencies import DBSession, ReadDBSession, requires_roles
+from src.reservations.constants import MAX_SEATS_PER_RESERVATION
+from src.reservations.pricing import PricingRepository, showtime_prices
+from src.reservations.schemas import PriceQuote, ShowtimePricing
+
+router = APIRouter(prefix="/showtimes", tags=["pricing"])
+
+
+@router.get(
+    "/{showtime_id}/pricing/",
+    status_code=status.HTTP_200_OK,
+    response_model=ShowtimePricing,
+)
+async def read_pricing(db: ReadDBSession, showtime_id: int) -> ShowtimePricing:
+    return await PricingRepository(db).get_pricing(showtime_id)
+
+
+@router.put(
+    "/{showtime_id}/pricing/",
+    status_code=status.HTTP_200_OK,
+    response_model=ShowtimePricing,
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def update_pricing(
+    db: DBSession, showtime_id: int, pricing: ShowtimePricing
+) -> ShowtimePricing:
+    """Replace the multiplier and all price tiers of a showtime"""
+    return await PricingRepository(db).set_pricing(showtime_id, pricing)
+
+
+@router.get(
+    "/{showtime_id}/quote/",
+    status_code=status.HTTP_200_OK,
+    response_model=PriceQuote,
+)
+async def quote_seats(
+    db: ReadDBSession,
+    showtime_id: int,
+    seat_ids: Annotated[
+        list[int], Query(min_length=1, max_length=MAX_SEATS_PER_RESERVATION)
+    ],
+) -> PriceQuote:
+    """Indicative total; the booking itself is priced again when it is made"""
+    seat_ids = sorted(set(seat_ids))
+    return PriceQuote(
+        showtime_id=showtime_id,
+        seat_ids=seat_ids,
+        total_amount=await showtime_prices.quote(db, showtime_id, seat_ids),
+    )
@@ -0,0 +1,59 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+
+from src.auth.schemas import AccessTokenData
+from src.dependencies import (
+    get_current_user_from_jwt,
+    UserDBSession,
+    UserReadDBSession,
+)
+from src.reservations.repository import ReservationsRepository
+from src.reservations.schemas import ReservationCreateRequest, ReservationResponse
+
+router = APIRouter(
+    prefix="/reservations",
+    tags=["reservations"],
+)
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ReservationResponse,
+)
+async def create_reservation(
+    db: UserDBSession,
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+    reservation: ReservationCreateRequest,
+) -> ReservationResponse:
+    """Book all requested seats for one showtime, or none of them"""
+    return await ReservationsRepository(db).create_reservation(
+        current_user.id, reservation.showtime_id, reservation.seat_ids
+    )
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=list[ReservationResponse],
+)
+async def read_my_reservations(
+    db: UserReadDBSession,
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+    include_archived: bool = False,
+) -> list[ReservationResponse]:
+    """`include_archived` adds reservations of long past showtimes"""
+    return await ReservationsRepository(db).get_user_reservations(
+        current_user.id, include_archived
+    )
+
+
+@router.delete("/{reservation_id}/", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_reservation(
+    db: UserDBSession,
+    current_user: Annotated[AccessTokenData, Depends(get_current_user_from_jwt)],
+    reservation_id: int,
+) -> None:
+    await ReservationsRepository(db).cancel_reservation(current_user.id, reservation_id)
+    return None
@@ -0,0 +1,102 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query, status
+from fastapi.responses import StreamingResponse
+
+from src.constants import ADMIN, STAFF
+from src.dependencies import DBSession, requires_roles
+from src.reservations.availability import seat_availability
+from src.reservations.constants import MAX_SEATS_PER_RESERVATION
+from src.reservations.exceptions import SeatsUnavailableError
+from src.reservations.live import seat_feed
+from src.reservations.schemas import (
+    SeatMapResponse,
+    SeatStatus,
+    SeatMapConsistency,
+    SeatSuggestion,
+)
+
+router = APIRouter(prefix="/showtimes", tags=["seats"])
+
+
+@router.get(
+    "/{showtime_id}/seats/",
+    status_code=status.HTTP_200_OK,
+    response_model=SeatMapResponse,
+)
+async def read_seat_map(db: DBSession, showtime_id: int) -> SeatMapResponse:
+    seat_map = await seat_availability.get_map(db, showtime_id)
+    return seat_map.to_response()
+
+
+@router.get(
+    "/{showtime_id}/seats/live/",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def stream_seat_map(db: DBSession, showtime_id: int) -> StreamingResponse:
+    """
+    Server-sent events: a `snapshot` event with the full seat map, then an
+    `update` event with the new state of the seats that changed. A client
+    that falls behind gets a fresh `snapshot` or is disconnected.
+    """
+    subscription = seat_feed.subscribe(showtime_id)
+    try:
+        seat_map = await seat_availability.get_map(db, showtime_id)
+    except BaseException:
+        seat_feed.unsubscribe(subscription)
+        raise
+    return StreamingResponse(
+        seat_feed.events(subscription, seat_map),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{showtime_id}/seats/consistency/",
+    status_code=status.HTTP_200_OK,
+    response_model=SeatMapConsistency,
+    dependencies=[requires_roles(ADMIN, STAFF)],
+)
+async def check_seat_map(db: DBSession, showtime_id: int) -> SeatMapConsistency:
+    mismatched = await seat_availability.check_consistency(db, showtime_id)
+    return SeatMapConsistency(
+        showtime_id=showtime_id,
+        mismatched_seat_ids=mismatched,
+        repaired=bool(mismatched),
+    )
+
+
+@router.get(
+    "/{showtime_id}/seats/suggestions/",
+    status_code=status.HTTP_200_OK,
+    response_model=SeatSuggestion,
+)
+async def suggest_seats(
+    db: DBSession,
+    showtime_id: int,
+    count: Annotated[int, Query(ge=1, le=MAX_SEATS_PER_RESERVATION)] = 2,
+) -> SeatSuggestion:
+    """Best block of `count` adjacent free seats, favouring the middle of the hall"""
+    seat_map = await seat_availability.get_map(db, showtime_id)
+    seat_ids = seat_map.suggest_seats(count)
+    if seat_ids is None:
+        raise SeatsUnavailableError(
+            detail=f"No {count} adjacent seats are free for this showtime"
+        )
+    return SeatSuggestion(
+        showtime_id=showtime_id,
+        seat_ids=seat_ids,
+        seat_codes=[seat_map.seat_codes[seat_map.positions[i]] for i in seat_ids],
+    )
+
+
+@router.get(
+    "/{showtime_id}/seats/{seat_id}/",
+    status_code=status.HTTP_200_OK,
+    response_model=SeatStatus,
+)
+async def read_seat_status(db: DBSession, showtime_id: int, seat_id: int) -> SeatStatus:
+    seat_map = await seat_availability.get_map(db, showtime_id)
+    return seat_map.seat_status_at(seat_map.position(seat_id))
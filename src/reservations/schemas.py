@@ -0,0 +1,109 @@
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+from src.reservations.constants import (
+    MAX_SEATS_PER_RESERVATION,
+    MAX_PRICE_TIERS_PER_SHOWTIME,
+)
+
+
+class SeatState(str, Enum):
+    free = "free"
+    held = "held"
+    reserved = "reserved"
+
+
+class SeatStatus(BaseModel):
+    id: int
+    seat_code: str
+    row_number: int
+    seat_number: int
+    is_free: bool
+    state: SeatState
+
+
+class SeatMapResponse(BaseModel):
+    showtime_id: int
+    seats: list[SeatStatus]
+
+
+class SeatDelta(BaseModel):
+    id: int
+    state: SeatState
+
+
+class SeatMapDelta(BaseModel):
+    showtime_id: int
+    seats: list[SeatDelta]
+
+
+class SeatSuggestion(BaseModel):
+    showtime_id: int
+    seat_ids: list[int]
+    seat_codes: list[str]
+
+
+class ReservationCreateRequest(BaseModel):
+    showtime_id: int
+    seat_ids: list[int] = Field(min_length=1, max_length=MAX_SEATS_PER_RESERVATION)
+
+
+class ReservationResponse(BaseModel):
+    id: int
+    user_id: int
+    showtime_id: int
+    total_amount: Decimal
+    created_at: datetime
+    seat_ids: list[int]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SeatHoldCreateRequest(BaseModel):
+    showtime_id: int
+    seat_ids: list[int] = Field(min_length=1, max_length=MAX_SEATS_PER_RESERVATION)
+
+
+class SeatHoldResponse(BaseModel):
+    id: int
+    user_id: int
+    showtime_id: int
+    expires_at: datetime
+    seat_ids: list[int]
+
+
+class SeatMapConsistency(BaseModel):
+    showtime_id: int
+    mismatched_seat_ids: list[int]
+    repaired: bool
+
+
+class PriceTier(BaseModel):
+    name: str = Field(min_length=1, max_length=50)
+    first_row: int = Field(ge=1)
+    last_row: int = Field(ge=1)
+    surcharge: Decimal = Field(ge=0, max_digits=10, decimal_places=2)
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="after")
+    def check_rows(self) -> "PriceTier":
+        if self.last_row < self.first_row:
+            raise ValueError("last_row must not be before first_row")
+        return self
+
+
+class ShowtimePricing(BaseModel):
+    """Seat price = (seat base price + highest matching tier surcharge) * multiplier"""
+
+    price_multiplier: Decimal = Field(gt=0, max_digits=4, decimal_places=2)
+    tiers: list[PriceTier] = Field(default=[], max_length=MAX_PRICE_TIERS_PER_SHOWTIME)
+
+
+class PriceQuote(BaseModel):
+    showtime_id: int
+    seat_ids: list[int]
+    total_amount: Decimal
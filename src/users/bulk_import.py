@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterator, Optional, Union, TextIO, Iterable
+
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database import sessionmanager
+from src.users.constants import (
+    USERS_IMPORT_BATCH_SIZE,
+    USERS_IMPORT_MAX_REPORTED_ERRORS,
+)
+from src.users.export import UsersFileFormat
+from src.users.models import User, Role, RoleName
+from src.users.schemas import UserCreateRequest, ImportReport, ImportRowError
+from src.utils.passwords import hash_passwords
+
+
+IMPORT_COLUMNS = (
+    "username",
+    "phone_number",
+    "email",
+    "password",
+    "first_name",
+    "last_name",
+)
+
+ON_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+CONFLICT_ERROR = "Username, email or phone number already exists"
+
+
+def iter_records(
+    stream: TextIO, import_format: UsersFileFormat
+) -> Iterator[tuple[int, Union[dict, str]]]:
+    """
+    Yield (line number, record) pairs from CSV with a header row or NDJSON.
+    Lines that cannot be parsed yield an error message instead of a record.
+    """
+    if import_format == UsersFileFormat.csv:
+        for line_number, record in enumerate(csv.DictReader(stream), start=2):
+            yield line_number, {
+                key: value if value != "" else None for key, value in record.items()
+            }
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, "Malformed JSON"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        yield line_number, record
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def parse_records(
+    records: Iterator[tuple[int, Union[dict, str]]], count: int
+) -> list[tuple[int, Union[UserCreateRequest, str]]]:
+    """
+    Read and validate up to `count` records. Blocking: reads the upload and
+    parses it, so it is run in a worker thread.
+    """
+    parsed = []
+    for row, record in itertools.islice(records, count):
+        if isinstance(record, str):
+            parsed.append((row, record))
+            continue
+        try:
+            parsed.append((row, UserCreateRequest.model_validate(record)))
+        except ValidationError as e:
+            parsed.append((row, format_validation_error(e)))
+    return parsed
+
+
+class ImportWorkerPool:
+    """
+    Process pool that hashes imported passwords, shared by every import.
+    Started with the app and shut down with it; shutting down waits for
+    running work in a thread so the event loop keeps serving meanwhile.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            raise RuntimeError("Import worker pool is not started")
+        return self._executor
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    async def stop(self) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True)
+
+
+import_pool = ImportWorkerPool(settings.pwd_hash_workers)
+
+
+class UsersBulkImporter:
+    """
+    Loads users in batches: validate rows, hash passwords across a process
+    pool, then insert the batch with Postgres COPY into a staging table (or
+    a batched INSERT ... ON CONFLICT on other backends).
+
+    Every batch commits on its own. Rows that fail validation or clash with
+    existing users are reported one by one instead of aborting the import.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        workers: int,
+        batch_size: int = USERS_IMPORT_BATCH_SIZE,
+        role: RoleName = RoleName.customer,
+    ):
+        self.executor = executor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.role = role
+        self.report = ImportReport()
+
+    def add_error(self, row: int, error: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < USERS_IMPORT_MAX_REPORTED_ERRORS:
+            self.report.errors.append(ImportRowError(row=row, error=error))
+
+    async def run(
+        self, records: Iterable[tuple[int, Union[dict, str]]]
+    ) -> ImportReport:
+        records = iter(records)
+        while parsed := await asyncio.to_thread(
+            parse_records, records, self.batch_size
+        ):
+            batch: list[tuple[int, UserCreateRequest]] = []
+            for row, record in parsed:
+                self.report.total += 1
+                if isinstance(record, str):
+                    self.add_error(row, record)
+                else:
+                    batch.append((row, record))
+            if batch:
+                await self.import_batch(batch)
+        return self.report
+
+    def drop_duplicates(
+        self, batch: list[tuple[int, UserCreateRequest]]
+    ) -> list[tuple[int, UserCreateRequest]]:
+        """Keep the first of rows sharing a unique value within the batch"""
+        seen = set()
+        unique_rows = []
+        for row, user in batch:
+            keys = {
+                ("username", user.username),
+                ("email", user.email),
+                ("phone_number", user.phone_number),
+            }
+            if keys & seen:
+                self.add_error(row, CONFLICT_ERROR)
+                continue
+            seen |= keys
+            unique_rows.append((row, user))
+        return unique_rows
+
+    async def hash_batch(self, passwords: list[str]) -> list[str]:
+        loop = asyncio.get_running_loop()
+        chunk_size = max(1, -(-len(passwords) // self.workers))
+        chunks = [
+            passwords[start : start + chunk_size]
+            for start in range(0, len(passwords), chunk_size)
+        ]
+        hashed_chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, hash_passwords, chunk)
+                for chunk in chunks
+            )
+        )
+        return [hashed for chunk in hashed_chunks for hashed in chunk]
+
+    async def import_batch(self, batch: list[tuple[int, UserCreateRequest]]) -> None:
+        batch = self.drop_duplicates(batch)
+        if not batch:
+            return
+        hashes = await self.hash_batch([user.password for _, user in batch])
+        rows = []
+        for (row, user), hashed in zip(batch, hashes):
+            values = user.model_dump(include=set(IMPORT_COLUMNS))
+            values["password"] = hashed
+            rows.append((row, values))
+
+        async with sessionmanager.unit_of_work() as db:
+            role_id = (
+                await db.execute(select(Role.id).where(Role.name == self.role))
+            ).scalar_one()
+            if db.bind.dialect.driver == "psycopg":
+                created = await self.copy_rows(db, rows, role_id)
+            else:
+                created = await self.insert_rows(db, rows, role_id)
+
+        for row, values in rows:
+            if values["username"] in created:
+                self.report.created += 1
+            else:
+                self.add_error(row, CONFLICT_ERROR)
+
+    @staticmethod
+    async def copy_rows(
+        db: AsyncSession, rows: list[tuple[int, dict]], role_id: int
+    ) -> set[str]:
+        """COPY into a transaction-local staging table, then move what fits"""
+        await db.execute(
+            text(
+                "CREATE TEMP TABLE users_import ("
+                "row_number integer, username varchar(100), "
+                "phone_number varchar(20), email varchar(100), "
+                "password varchar(255), first_name varchar(50), "
+                "last_name varchar(50)"
+                ") ON COMMIT DROP"
+            )
+        )
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(
+                f"COPY users_import (row_number, {', '.join(IMPORT_COLUMNS)}) "
+                "FROM STDIN"
+            ) as copy:
+                for row, values in rows:
+                    await copy.write_row(
+                        (row, *(values[column] for column in IMPORT_COLUMNS))
+                    )
+
+        columns = ", ".join(IMPORT_COLUMNS)
+        db_response = await db.execute(
+            text(
+                f"INSERT INTO users ({columns}, is_active, role_id) "
+                f"SELECT {columns}, true, :role_id FROM users_import "
+                "ORDER BY row_number "
+                "ON CONFLICT DO NOTHING "
+                "RETURNING username"
+            ),
+            {"role_id": role_id},
+        )
+        return set(db_response.scalars())
+
+    @staticmethod
+    async def insert_rows(
+        db: AsyncSession, rows: list[tuple[int, dict]], role_id: int
+    ) -> set[str]:
+        dialect = db.bind.dialect.name
+        if dialect not in ON_CONFLICT_INSERTS:
+            raise NotImplementedError(f"Bulk import is not supported on {dialect!r}")
+        stmt = (
+            ON_CONFLICT_INSERTS[dialect](User)
+            .values(
+                [
+                    {**values, "is_active": True, "role_id": role_id}
+                    for _, values in rows
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(User.username)
+        )
+        db_response = await db.execute(stmt)
+        return set(db_response.scalars())
+
+
+async def import_users(
+    stream: TextIO,
+    import_format: UsersFileFormat,
+    batch_size: int = USERS_IMPORT_BATCH_SIZE,
+    pool: ImportWorkerPool = import_pool,
+) -> ImportReport:
+    importer = UsersBulkImporter(pool.executor, pool.workers, batch_size=batch_size)
+    return await importer.run(iter_records(stream, import_format))
+
+
+async def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import users")
+    parser.add_argument("path", help="CSV (with header) or NDJSON file")
+    parser.add_argument(
+        "--format",
+        choices=[import_format.value for import_format in UsersFileFormat],
+        default=UsersFileFormat.csv.value,
+    )
+    parser.add_argument("--batch-size", type=int, default=USERS_IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    sessionmanager.init(settings.get_database_url(), **settings.get_engine_options())
+    import_pool.start()
+    try:
+        with io.open(args.path, encoding="utf-8", newline="") as stream:
+            report = await import_users(
+                stream, UsersFileFormat(args.format), batch_size=args.batch_size
+            )
+    finally:
+        await import_pool.stop()
+        await sessionmanager.close()
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,174 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database import on_commit
+from src.users.schemas import UserSnapshot
+
+
+class UserCacheBackend(ABC):
+    """Storage for user snapshots, keyed by plain strings"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[UserSnapshot]: ...
+
+    @abstractmethod
+    async def set(self, key: str, user: UserSnapshot, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryUserCacheBackend(UserCacheBackend):
+    """Per-process LRU with a per-entry TTL, snapshots are kept as models"""
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, UserSnapshot]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[UserSnapshot]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user
+
+    async def set(self, key: str, user: UserSnapshot, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+class RedisUserCacheBackend(UserCacheBackend):
+    """
+    Cache shared by all workers, stored as JSON in any Redis-protocol server.
+
+    Requires the optional `redis` package unless a ready client is passed in.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[Any] = None,
+        prefix: str = "users:",
+    ):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise ImportError(
+                    "The 'redis' package is required for the redis user cache"
+                ) from e
+            client = Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[UserSnapshot]:
+        raw = await self._client.get(self._prefix + key)
+        if raw is None:
+            return None
+        return UserSnapshot.model_validate_json(raw)
+
+    async def set(self, key: str, user: UserSnapshot, ttl: float) -> None:
+        await self._client.set(
+            self._prefix + key, user.model_dump_json(), px=int(ttl * 1000)
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*(self._prefix + key for key in keys))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class UserCache:
+    """
+    Snapshots of users looked up by id or username on authenticated requests.
+    Password hashes are never cached; login always reads the database.
+
+    Entries live for `ttl` seconds at most. Writers must call `invalidate` (or
+    `invalidate_on_commit`) so that changes such as deactivation take effect
+    on the next request. Invalidation only reaches every worker with a shared
+    backend (Redis): with the in-memory one, other workers keep serving the
+    old snapshot for up to `ttl` seconds.
+    """
+
+    def __init__(self, backend: UserCacheBackend, ttl: float = 60.0):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _id_key(user_id: int) -> str:
+        return f"id:{user_id}"
+
+    @staticmethod
+    def _name_key(username: str) -> str:
+        return f"name:{username}"
+
+    async def get_by_id(self, user_id: int) -> Optional[UserSnapshot]:
+        return await self.backend.get(self._id_key(user_id))
+
+    async def get_by_name(self, username: str) -> Optional[UserSnapshot]:
+        return await self.backend.get(self._name_key(username))
+
+    async def set(self, user: UserSnapshot) -> None:
+        if self.ttl <= 0:
+            return
+        await self.backend.set(self._id_key(user.id), user, self.ttl)
+        await self.backend.set(self._name_key(user.username), user, self.ttl)
+
+    async def invalidate(self, user_id: int, *usernames: str) -> None:
+        cached = await self.backend.get(self._id_key(user_id))
+        names = set(usernames)
+        if cached is not None:
+            names.add(cached.username)
+        await self.backend.delete(
+            self._id_key(user_id), *(self._name_key(name) for name in names)
+        )
+
+    async def invalidate_on_commit(
+        self, db: AsyncSession, user_id: int, *usernames: str
+    ) -> None:
+        """
+        Drop the user now and again after `db` commits, so a concurrent reader
+        cannot re-cache the pre-commit row for the rest of the TTL.
+        """
+        await self.invalidate(user_id, *usernames)
+
+        async def invalidate_committed() -> None:
+            await self.invalidate(user_id, *usernames)
+
+        on_commit(db, invalidate_committed)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def create_user_cache() -> UserCache:
+    if settings.user_cache_backend == "redis":
+        backend = RedisUserCacheBackend(url=settings.user_cache_url)
+    elif settings.user_cache_backend == "memory":
+        backend = InMemoryUserCacheBackend(max_size=settings.user_cache_max_size)
+    else:
+        raise ValueError(f"Unknown user cache backend {settings.user_cache_backend!r}")
+    return UserCache(backend, ttl=settings.user_cache_ttl_seconds)
+
+
+user_cache = create_user_cache()
@@ -0,0 +1,5 @@
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 200
+USERS_EXPORT_BATCH_SIZE = 1000
+USERS_IMPORT_BATCH_SIZE = 1000
+USERS_IMPORT_MAX_REPORTED_ERRORS = 10_000
@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+from src.database import sessionmanager
+from src.users.repository import UsersRepository
+
+
+class UsersFileFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    UsersFileFormat.ndjson: "application/x-ndjson",
+    UsersFileFormat.csv: "text/csv",
+}
+
+CSV_COLUMNS = (
+    "id",
+    "username",
+    "phone_number",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "role_id",
+    "role",
+)
+
+
+def row_to_user_response(row: Row) -> dict:
+    """Same shape as UserResponse, built without re-validating stored data"""
+    return {
+        "username": row.username,
+        "phone_number": row.phone_number,
+        "email": row.email,
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "id": row.id,
+        "is_active": row.is_active,
+        "role_id": row.role_id,
+        "role": {"name": row.role.value},
+    }
+
+
+def rows_to_ndjson(rows: Sequence[Row]) -> bytes:
+    lines = (
+        json.dumps(row_to_user_response(row), ensure_ascii=False) + "\n" for row in rows
+    )
+    return "".join(lines).encode()
+
+
+def rows_to_csv(rows: Sequence[Row], with_header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if with_header:
+        writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            (
+                row.id,
+                row.username,
+                row.phone_number,
+                row.email,
+                row.first_name,
+                row.last_name,
+                row.is_active,
+                row.role_id,
+                row.role.value,
+            )
+        )
+    return buffer.getvalue().encode()
+
+
+async def export_users(
+    export_format: UsersFileFormat, batch_size: int
+) -> AsyncIterator[bytes]:
+    """
+    Stream every user as NDJSON or CSV, one chunk per fetched batch.
+
+    Opens its own read-only session because the response body is produced
+    after request dependencies have been torn down. Rows come from a
+    server-side cursor, so memory stays flat regardless of table size.
+    """
+    async with sessionmanager.session(read_only=True) as db:
+        if export_format == UsersFileFormat.csv:
+            yield rows_to_csv((), with_header=True)
+        async for rows in UsersRepository(db).stream_user_rows(batch_size):
+            if export_format == UsersFileFormat.csv:
+                yield rows_to_csv(rows)
+            else:
+                yield rows_to_ndjson(rows)
@@ -3,7 +3,7 @@ from typing import Optional
 from enum import Enum
 
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import func, ForeignKey, String
+from sqlalchemy import func, ForeignKey, String, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -35,6 +35,23 @@ class Role(Base):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally scoped by filter
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_id_created_at_id", "role_id", "created_at", "id"),
+        Index("ix_users_is_active_created_at_id", "is_active", "created_at", "id"),
+        # Prefix search with LIKE 'x%' regardless of the database collation
+        Index(
+            "ix_users_username_prefix",
+            "username",
+            postgresql_ops={"username": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_email_prefix",
+            "email",
+            postgresql_ops={"email": "text_pattern_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
@@ -1,13 +1,26 @@
-from typing import Optional, Union
+from datetime import datetime
+from typing import Optional, Union, AsyncIterator, Sequence
 
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, Select, update, ScalarSelect, Result
+from sqlalchemy import (
+    select,
+    Select,
+    update,
+    ScalarSelect,
+    Result,
+    Row,
+    tuple_,
+    or_,
+)
 from sqlalchemy.sql.dml import ReturningInsert, ReturningUpdate
 
+from src.database import sessionmanager
+from src.users.cache import user_cache
 from src.users.exceptions import UserNotFoundError, UserDataError, CreationError
 from src.users.models import User, RoleName, Role
 from src.users.schemas import UserCreateRequest, UserUpdateRequest
+from src.utils.pagination import encode_cursor, decode_cursor
 from src.utils.passwords import hash_user_pwd
 
 
@@ -27,7 +40,13 @@ class UsersRepository:
     ) -> Result:
         try:
             db_response = await self.db.execute(stmt)
-        except SQLAlchemyError:
+        except SQLAlchemyError as e:
+            # A replica that went away is retried on the primary; other
+            # connection problems are not the caller's fault, let them surface
+            if await sessionmanager.fail_over(self.db, e):
+                return await self.execute_stmt(stmt, error)
+            if sessionmanager.is_connection_error(e):
+                raise
             raise error
         return db_response
 
@@ -51,10 +70,77 @@ class UsersRepository:
         users = db_response.scalars().all()
         return [user for user in users]
 
+    async def get_users_paginated(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        role: Optional[RoleName] = None,
+        is_active: Optional[bool] = None,
+        prefix: Optional[str] = None,
+    ) -> tuple[list[User], Optional[str]]:
+        """
+        Page of users ordered by (created_at, id), seeking past `cursor`
+        instead of using OFFSET so every page costs the same.
+
+        Returns the users and the cursor of the next page, if any.
+        """
+        stmt = select(User).order_by(User.created_at, User.id).limit(limit + 1)
+        if cursor is not None:
+            try:
+                created_at, user_id = decode_cursor(cursor)
+                after = (datetime.fromisoformat(created_at), int(user_id))
+            except (ValueError, TypeError):
+                raise UserDataError(detail="Invalid cursor")
+            stmt = stmt.where(tuple_(User.created_at, User.id) > tuple_(*after))
+        if role is not None:
+            stmt = stmt.where(User.role_id == self.get_role_id_subquery(role))
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+        if prefix:
+            stmt = stmt.where(
+                or_(
+                    User.username.startswith(prefix, autoescape=True),
+                    User.email.startswith(prefix, autoescape=True),
+                )
+            )
+
+        db_response = await self.execute_stmt(stmt)
+        users = list(db_response.scalars().all())
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+        return users, next_cursor
+
+    async def stream_user_rows(self, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield plain rows of every user in batches of `batch_size`, read through
+        a server-side cursor so only one batch is held in memory at a time.
+        """
+        stmt = (
+            select(
+                User.id,
+                User.username,
+                User.phone_number,
+                User.email,
+                User.first_name,
+                User.last_name,
+                User.is_active,
+                User.role_id,
+                Role.name.label("role"),
+            )
+            .join(Role, User.role_id == Role.id)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        db_response = await self.db.stream(stmt)
+        async for rows in db_response.partitions(batch_size):
+            yield rows
+
     async def create_user(
         self, user: UserCreateRequest, role: RoleName = RoleName.customer
     ) -> User:
-        user_data = hash_user_pwd(user)
+        user_data = await hash_user_pwd(user)
         db_response = await self.db.execute(select(Role).where(Role.name == role))
 
         role_obj = db_response.scalar_one()
@@ -62,7 +148,7 @@ class UsersRepository:
 
         try:
             self.db.add(new_user)
-            await self.db.commit()
+            await self.db.flush()
         except IntegrityError as e:
             await self.db.rollback()
             raise CreationError(exception=e)
@@ -70,20 +156,31 @@ class UsersRepository:
         return new_user
 
     async def update_user(self, user_data: UserUpdateRequest, user_id: int) -> User:
-        stmt = (
-            update(User)
-            .where(User.id == user_id)
-            .values(**user_data.model_dump(exclude_unset=True, exclude_none=True))
-            .returning(User)
-        )
+        values = user_data.model_dump(exclude_unset=True, exclude_none=True)
+        old_usernames = []
+        if "username" in values:
+            old_username = await self.db.execute(
+                select(User.username).where(User.id == user_id)
+            )
+            old_usernames.extend(old_username.scalars())
+
+        stmt = update(User).where(User.id == user_id).values(**values).returning(User)
         db_response = await self.execute_stmt(
             stmt=stmt, error=UserDataError(detail="Wrong user data")
         )
         updated_user = db_response.scalar_one()
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(updated_user)
+        await user_cache.invalidate_on_commit(
+            self.db, user_id, updated_user.username, *old_usernames
+        )
         return updated_user
 
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
+        stmt = update(User).where(User.id == user_id).values(password=hashed_password)
+        await self.db.execute(stmt)
+        await user_cache.invalidate_on_commit(self.db, user_id)
+
     async def deactivate_user(self, user_id: int) -> User:
         stmt = (
             update(User)
@@ -95,6 +192,7 @@ class UsersRepository:
             stmt=stmt, error=UserDataError(detail="Wrong user data")
         )
         updated_user = db_response.scalar_one()
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(updated_user)
+        await user_cache.invalidate_on_commit(self.db, user_id, updated_user.username)
         return updated_user
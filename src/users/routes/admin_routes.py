@@ -1,13 +1,26 @@
-from typing import Annotated
+import io
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, status, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, status, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from src.constants import ADMIN
-from src.database import get_async_db_session
-from src.dependencies import requires_roles
+from src.dependencies import requires_roles, DBSession, ReadDBSession
+from src.users.constants import (
+    USERS_PAGE_SIZE,
+    USERS_MAX_PAGE_SIZE,
+    USERS_EXPORT_BATCH_SIZE,
+)
+from src.users.bulk_import import import_users
+from src.users.export import UsersFileFormat, EXPORT_MEDIA_TYPES, export_users
+from src.users.models import RoleName
 from src.users.repository import UsersRepository
-from src.users.schemas import UserUpdateRequest, UserResponse
+from src.users.schemas import (
+    UserUpdateRequest,
+    UserResponse,
+    UsersPage,
+    ImportReport,
+)
 
 router = APIRouter(
     prefix="/admin",
@@ -19,13 +32,59 @@ router = APIRouter(
 @router.get(
     "/users/",
     status_code=status.HTTP_200_OK,
-    response_model=list[UserResponse],
+    response_model=UsersPage,
 )
 async def read_all_users(
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
-) -> list[UserResponse]:
-    users = await UsersRepository(db).get_users_paginated()
-    return [UserResponse.model_validate(user) for user in users]
+    db: ReadDBSession,
+    limit: Annotated[int, Query(ge=1, le=USERS_MAX_PAGE_SIZE)] = USERS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    role: Optional[RoleName] = None,
+    is_active: Optional[bool] = None,
+    search: Annotated[Optional[str], Query(min_length=1, max_length=100)] = None,
+) -> UsersPage:
+    """Users ordered by sign-up time, `search` matches username or email prefix"""
+    users, next_cursor = await UsersRepository(db).get_users_paginated(
+        limit=limit, cursor=cursor, role=role, is_active=is_active, prefix=search
+    )
+    return UsersPage(
+        items=[UserResponse.model_validate(user) for user in users],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/users/export/", status_code=status.HTTP_200_OK)
+async def export_all_users(
+    export_format: Annotated[
+        UsersFileFormat, Query(alias="format")
+    ] = UsersFileFormat.ndjson,
+) -> StreamingResponse:
+    """Stream all users as NDJSON or CSV for compliance dumps"""
+    return StreamingResponse(
+        export_users(export_format, USERS_EXPORT_BATCH_SIZE),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{export_format.value}"'
+        },
+    )
+
+
+@router.post(
+    "/users/import/",
+    status_code=status.HTTP_200_OK,
+    response_model=ImportReport,
+)
+async def import_users_file(
+    file: UploadFile,
+    import_format: Annotated[
+        UsersFileFormat, Query(alias="format")
+    ] = UsersFileFormat.csv,
+) -> ImportReport:
+    """
+    Bulk-create customers from a CSV (with header) or NDJSON upload.
+    Each failed row is reported, the rest are imported.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return await import_users(stream, import_format)
 
 
 @router.patch(
@@ -34,7 +93,7 @@ async def read_all_users(
     response_model=UserResponse,
 )
 async def update_user_info(
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
+    db: DBSession,
     new_user_data: UserUpdateRequest,
     user_id: int,
 ) -> UserResponse:
@@ -49,7 +108,7 @@ async def update_user_info(
 )
 async def read_user_by_id(
     user_id: int,
-    db: Annotated[AsyncSession, Depends(get_async_db_session)],
+    db: ReadDBSession,
 ):
     user = await UsersRepository(db).get_user_by_id(user_id)
     return UserResponse.model_validate(user)
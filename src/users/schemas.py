@@ -30,16 +30,38 @@ class UserResponse(UserBase):
     role: Optional[RoleScheme]
 
 
-class RawUserResponse(UserResponse):
-    password: str
+class UsersPage(BaseModel):
+    items: list[UserResponse]
+    next_cursor: Optional[str] = None
+
+
+class UserSnapshot(UserResponse):
+    """What the user cache keeps: the user without the password hash"""
+
     created_at: datetime
     updated_at: datetime
 
 
+class RawUserResponse(UserSnapshot):
+    password: str
+
+
 class UserCreateRequest(UserBase):
     password: str = Field(min_length=8, max_length=100)
 
 
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = []
+
+
 class UserUpdateRequest(UserBase):
     username: Optional[str] = Field(None, min_length=3, max_length=50)
     phone_number: Optional[PhoneNumber] = Field(None, min_length=11)
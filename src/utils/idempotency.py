@@ -0,0 +1,476 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Any
+
+from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# How long a key stays claimed by a request that never finishes (crashed
+# worker); a running request renews its claim every third of this
+IDEMPOTENCY_PENDING_TTL_SECONDS = 60.0
+# Larger request bodies are rejected with 413 instead of being buffered
+IDEMPOTENCY_MAX_BODY_BYTES = 1024 * 1024
+# Larger responses are passed through without being stored for replay
+IDEMPOTENCY_MAX_RESPONSE_BYTES = 1024 * 1024
+# How long a duplicate waits for the original request before giving up
+IDEMPOTENCY_WAIT_SECONDS = 30.0
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Answers that ask the client to try again; replaying them would never let
+# the retry through
+IDEMPOTENCY_RETRYABLE_STATUS_CODES = frozenset({409, 429})
+# Responses with these headers are not stored: the client is told to retry,
+# or they set cookies (refresh tokens) that must not sit in a shared store
+IDEMPOTENCY_UNSTORED_HEADERS = frozenset({"retry-after", "set-cookie"})
+
+# Resolves the verified user id behind a request's headers, None if anonymous
+CallerResolver = Callable[[Headers], Awaitable[Optional[str]]]
+
+
+class IdempotencyRecord(BaseModel):
+    """A claimed key: pending until the first request's response is stored"""
+
+    fingerprint: str
+    status_code: Optional[int] = None
+    headers: list[tuple[str, str]] = []
+    body: str = ""  # base64
+
+    @property
+    def is_pending(self) -> bool:
+        return self.status_code is None
+
+
+class IdempotencyBackend(ABC):
+    """Storage for idempotency records, keyed by plain strings"""
+
+    @abstractmethod
+    async def claim(
+        self, key: str, record: IdempotencyRecord, ttl: float
+    ) -> Optional[IdempotencyRecord]:
+        """Store `record` unless the key exists; return the existing record"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[IdempotencyRecord]: ...
+
+    @abstractmethod
+    async def set(self, key: str, record: IdempotencyRecord, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        """Poll until the record is no longer pending, or `timeout` runs out"""
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            record = await self.get(key)
+            if record is None or not record.is_pending:
+                return record
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return record
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    """
+    Per-process bounded store; duplicates wait on an event, not by polling.
+
+    Past `max_size` the least recently used stored responses are evicted.
+    Live claims are never evicted, since their waiters would take the
+    missing record for a failed request and run it again.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, IdempotencyRecord]] = OrderedDict()
+        self._done: dict[str, asyncio.Event] = {}
+
+    async def claim(
+        self, key: str, record: IdempotencyRecord, ttl: float
+    ) -> Optional[IdempotencyRecord]:
+        existing = await self.get(key)
+        if existing is not None:
+            return existing
+        await self.set(key, record, ttl)
+        return None
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at <= time.monotonic():
+            await self.delete(key)
+            return None
+        return record
+
+    async def set(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, record)
+        self._entries.move_to_end(key)
+        if record.is_pending:
+            self._done.setdefault(key, asyncio.Event())
+        else:
+            self._notify(key)
+        if len(self._entries) > self.max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key, (expires_at, record) in list(self._entries.items()):
+            if len(self._entries) <= self.max_size:
+                return
+            if not record.is_pending or expires_at <= now:
+                del self._entries[key]
+                self._notify(key)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._notify(key)
+
+    def _notify(self, key: str) -> None:
+        done = self._done.pop(key, None)
+        if done is not None:
+            done.set()
+
+    async def wait(self, key: str, timeout: float) -> Optional[IdempotencyRecord]:
+        done = self._done.get(key)
+        if done is not None:
+            try:
+                await asyncio.wait_for(done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(key)
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """
+    Store shared by all workers, kept as JSON in any Redis-protocol server.
+    Claims use SET NX so exactly one worker runs a given key.
+
+    Requires the optional `redis` package unless a ready client is passed in.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[Any] = None,
+        prefix: str = "idempotency:",
+    ):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise ImportError(
+                    "The 'redis' package is required for the redis idempotency store"
+                ) from e
+            client = Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+
+    async def claim(
+        self, key: str, record: IdempotencyRecord, ttl: float
+    ) -> Optional[IdempotencyRecord]:
+        claimed = await self._client.set(
+            self._prefix + key, record.model_dump_json(), px=int(ttl * 1000), nx=True
+        )
+        if claimed:
+            return None
+        return await self.get(key)
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        raw = await self._client.get(self._prefix + key)
+        if raw is None:
+            return None
+        return IdempotencyRecord.model_validate_json(raw)
+
+    async def set(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        await self._client.set(
+            self._prefix + key, record.model_dump_json(), px=int(ttl * 1000)
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._prefix + key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class IdempotencyMiddleware:
+    """
+    Makes write requests carrying an `Idempotency-Key` header safe to retry.
+
+    The first request with a key claims it and runs; its response is stored
+    for `ttl` seconds and replayed to later requests with the same key,
+    marked with `Idempotent-Replayed: true`. A duplicate arriving while the
+    first one is still running waits for its response instead of running
+    again. Reusing a key for a different request (method, path, query or
+    body) is rejected with 422.
+
+    Keys are scoped to the user id `identify` resolves from the request,
+    falling back to the client address, so a refreshed token keeps its keys
+    and anonymous callers cannot replay each other's responses. The claim
+    is renewed while the request runs, so slow requests keep it past
+    `pending_ttl`.
+
+    Request bodies over `max_body_size` are rejected with 413. 5xx
+    responses, failed requests, event streams, responses over
+    `max_response_size`, responses asking for a retry (409, 429 or
+    `Retry-After`) and responses setting cookies are not stored; the key is
+    released and a retry runs the request again.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: IdempotencyBackend,
+        ttl: float = 24 * 60 * 60,
+        methods: frozenset[str] = WRITE_METHODS,
+        identify: Optional[CallerResolver] = None,
+        pending_ttl: float = IDEMPOTENCY_PENDING_TTL_SECONDS,
+        max_body_size: int = IDEMPOTENCY_MAX_BODY_BYTES,
+        max_response_size: int = IDEMPOTENCY_MAX_RESPONSE_BYTES,
+    ):
+        self.app = app
+        self.backend = backend
+        self.ttl = ttl
+        self.methods = methods
+        self.identify = identify
+        self.pending_ttl = pending_ttl
+        self.max_body_size = max_body_size
+        self.max_response_size = max_response_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return await self.reject(
+                400, "Invalid Idempotency-Key", scope, receive, send
+            )
+
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            return await self.reject(
+                413, "Request body too large", scope, receive, send
+            )
+        body = await self.read_body(scope, receive, send)
+        if body is None:
+            return
+        fingerprint = self.fingerprint(scope, body)
+        store_key = await self.store_key(key, scope, headers)
+
+        while True:
+            record = await self.backend.claim(
+                store_key, IdempotencyRecord(fingerprint=fingerprint), self.pending_ttl
+            )
+            if record is None:
+                return await self.run(
+                    store_key, fingerprint, body, scope, receive, send
+                )
+            if record.fingerprint != fingerprint:
+                return await self.reject(
+                    422,
+                    "Idempotency-Key was already used for a different request",
+                    scope,
+                    receive,
+                    send,
+                )
+            if record.is_pending:
+                record = await self.backend.wait(store_key, IDEMPOTENCY_WAIT_SECONDS)
+                if record is None:
+                    # The first request failed and released the key
+                    continue
+                if record.is_pending:
+                    return await self.reject(
+                        409,
+                        "A request with this Idempotency-Key is in progress",
+                        scope,
+                        receive,
+                        send,
+                    )
+            return await self.replay(record, send)
+
+    async def read_body(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> Optional[bytes]:
+        """The whole request body; None once the request has been answered"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                await self.reject(413, "Request body too large", scope, receive, send)
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def fingerprint(scope: Scope, body: bytes) -> str:
+        digest = hashlib.sha256()
+        for part in (scope["method"], scope["path"], scope["query_string"], body):
+            part = part.encode() if isinstance(part, str) else part
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    async def store_key(self, key: str, scope: Scope, headers: Headers) -> str:
+        user_id = await self.identify(headers) if self.identify else None
+        if user_id is not None:
+            caller = f"user:{user_id}"
+        elif scope.get("client"):
+            caller = f"client:{scope['client'][0]}"
+        else:
+            caller = f"route:{scope['method']} {scope['path']}"
+        return f"{hashlib.sha256(caller.encode()).hexdigest()[:32]}:{key}"
+
+    async def keep_claimed(self, store_key: str, fingerprint: str) -> None:
+        """Renew the pending claim until cancelled"""
+        record = IdempotencyRecord(fingerprint=fingerprint)
+        while True:
+            await asyncio.sleep(self.pending_ttl / 3)
+            try:
+                await self.backend.set(store_key, record, self.pending_ttl)
+            except Exception:
+                logger.exception("Failed to renew idempotency claim")
+
+    async def run(
+        self,
+        store_key: str,
+        fingerprint: str,
+        body: bytes,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        body_sent = False
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = None
+        response_headers: list[tuple[str, str]] = []
+        chunks = []
+        size = 0
+        storable = True
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status_code, response_headers, size, storable
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                ]
+                content_type = Headers(raw=message.get("headers", [])).get(
+                    "content-type", ""
+                )
+                storable = not content_type.startswith("text/event-stream")
+            elif message["type"] == "http.response.body" and storable:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > self.max_response_size:
+                    storable = False
+                    chunks.clear()
+                else:
+                    chunks.append(chunk)
+            await send(message)
+
+        heartbeat = asyncio.create_task(self.keep_claimed(store_key, fingerprint))
+        try:
+            try:
+                await self.app(scope, receive_body, send_and_capture)
+            finally:
+                heartbeat.cancel()
+                await asyncio.wait([heartbeat])
+        except BaseException:
+            await self.backend.delete(store_key)
+            raise
+
+        if not storable or not self.is_storable(status_code, response_headers):
+            await self.backend.delete(store_key)
+            return
+        await self.backend.set(
+            store_key,
+            IdempotencyRecord(
+                fingerprint=fingerprint,
+                status_code=status_code,
+                headers=response_headers,
+                body=base64.b64encode(b"".join(chunks)).decode(),
+            ),
+            self.ttl,
+        )
+
+    @staticmethod
+    def is_storable(status_code: Optional[int], headers: list[tuple[str, str]]) -> bool:
+        if status_code is None or status_code >= 500:
+            return False
+        if status_code in IDEMPOTENCY_RETRYABLE_STATUS_CODES:
+            return False
+        return not any(
+            name.lower() in IDEMPOTENCY_UNSTORED_HEADERS for name, _ in headers
+        )
+
+    @staticmethod
+    async def replay(record: IdempotencyRecord, send: Send) -> None:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in record.headers
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": record.status_code,
+                "headers": headers,
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": base64.b64decode(record.body)}
+        )
+
+    @staticmethod
+    async def reject(
+        status_code: int, detail: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status_code)
+        await response(scope, receive, send)
+
+
+def create_idempotency_backend() -> IdempotencyBackend:
+    if settings.idempotency_backend == "redis":
+        return RedisIdempotencyBackend(url=settings.idempotency_url)
+    if settings.idempotency_backend == "memory":
+        return InMemoryIdempotencyBackend(max_size=settings.idempotency_max_keys)
+    raise ValueError(f"Unknown idempotency backend {settings.idempotency_backend!r}")
+
+
+idempotency_backend = create_idempotency_backend()
@@ -1,5 +1,10 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, Callable, Any
+
 from passlib.context import CryptContext
 
+from src.config import settings
 from src.users.schemas import UserCreateRequest
 
 
@@ -14,8 +19,77 @@ def verify_pwd(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def hash_user_pwd(user: UserCreateRequest) -> dict:
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a chunk of passwords, meant to run in a worker process"""
+    return [get_pwd_hash(password) for password in passwords]
+
+
+def verify_and_update_pwd(plain_password, hashed_password):
+    """Return (is_valid, new_hash), new_hash is set only for outdated hashes"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a worker pool so hashing never blocks the event loop.
+
+    At most `max_workers` operations are handed to the pool at once; further
+    callers wait on a semaphore, so a login burst queues up instead of
+    starving other requests of the loop.
+    """
+
+    def __init__(self, executor_type: str = "thread", max_workers: int = 4):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type {executor_type!r}")
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            executor_cls = (
+                ProcessPoolExecutor
+                if self.executor_type == "process"
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_cls(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, func: Callable, *args) -> Any:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_pwd_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_pwd, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_pwd, plain_password, hashed_password)
+
+    async def shutdown(self) -> None:
+        """
+        Drop queued work and wait for running hashes in a thread, so the
+        event loop keeps serving while the pool drains.
+        """
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.pwd_hash_executor,
+    max_workers=settings.pwd_hash_workers,
+)
+
+
+async def hash_user_pwd(user: UserCreateRequest) -> dict:
     """Return user's data with hashed password"""
     user_data = user.model_dump()
-    user_data["password"] = get_pwd_hash(user_data["password"])
+    user_data["password"] = await password_hasher.hash(user_data["password"])
     return user_data
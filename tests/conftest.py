@@ -0,0 +1,230 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def write_rsa_key_pair(directory: Path, name: str) -> tuple[Path, Path]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_path = directory / f"{name}-private.pem"
+    public_path = directory / f"{name}-public.pem"
+    private_path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    public_path.write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return private_path, public_path
+
+
+# Settings are read when src is first imported, so the environment is set up
+# before any test module imports it
+KEYS_DIR = Path(tempfile.mkdtemp(prefix="movie-reservation-keys-"))
+PRIVATE_KEY_PATH, PUBLIC_KEY_PATH = write_rsa_key_pair(KEYS_DIR, "jwt")
+for name, value in {
+    "SECRET_KEY": "test-secret",
+    "DB_DRIVER": "sqlite+aiosqlite",
+    "DB_USER": "test",
+    "DB_PWD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "JWT_PRIVATE_KEY_PATH": str(PRIVATE_KEY_PATH),
+    "JWT_PUBLIC_KEY_PATH": str(PUBLIC_KEY_PATH),
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from src.database import Base, sessionmanager  # noqa: E402
+from src.main import app  # noqa: E402, F401  (imports every model)
+from src.movies.facets import genre_facets  # noqa: E402
+from src.movies.models import CinemaHall, Movie, Showtime  # noqa: E402
+from src.movies.schedule import showtime_schedule  # noqa: E402
+from src.movies.search import movie_search_index  # noqa: E402
+from src.movies.snapshot import schedule_snapshots  # noqa: E402
+from src.reservations.availability import seat_availability  # noqa: E402
+from src.reservations.holds import hold_expiry  # noqa: E402
+from src.reservations.layout import hall_layouts  # noqa: E402
+from src.reservations.models import Seat  # noqa: E402
+from src.reservations.pricing import showtime_prices  # noqa: E402
+from src.users.models import Role, RoleName, User  # noqa: E402
+
+PROCESS_CACHES = (
+    genre_facets,
+    showtime_schedule,
+    movie_search_index,
+    schedule_snapshots,
+    seat_availability,
+    hold_expiry,
+    hall_layouts,
+    showtime_prices,
+)
+
+
+def sqlite_url(path: Path) -> str:
+    return f"sqlite+aiosqlite:///{path}"
+
+
+async def create_schema(url: str) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def reset_process_caches():
+    """Every test database reuses the same ids, so cached state must go"""
+    for cache in PROCESS_CACHES:
+        cache.__init__()
+
+
+@pytest.fixture
+def database_url(tmp_path: Path) -> str:
+    return sqlite_url(tmp_path / "primary.db")
+
+
+@pytest.fixture
+async def database(database_url: str):
+    """The process-wide session manager on a fresh SQLite file"""
+    await create_schema(database_url)
+    sessionmanager.init(database_url)
+    yield sessionmanager
+    await sessionmanager.close()
+
+
+async def seed_user(
+    db: AsyncSession,
+    username: str = "alice",
+    role: RoleName = RoleName.customer,
+    password: str = "not-a-real-hash",
+    **values,
+) -> int:
+    role_id = (
+        await db.execute(select(Role.id).where(Role.name == role))
+    ).scalar_one_or_none()
+    if role_id is None:
+        role_id = (
+            await db.execute(insert(Role).values(name=role).returning(Role.id))
+        ).scalar_one()
+    count = (await db.execute(select(func.count(User.id)))).scalar_one()
+    return (
+        await db.execute(
+            insert(User)
+            .values(
+                username=username,
+                phone_number=f"+1415555{2600 + count:04d}",
+                email=f"{username}@example.com",
+                password=password,
+                role_id=role_id,
+                **values,
+            )
+            .returning(User.id)
+        )
+    ).scalar_one()
+
+
+async def seed_movie(db: AsyncSession, title: str = "Heat", **values) -> int:
+    values = {
+        "description": None,
+        "duration_minutes": 120,
+        "release_date": datetime(1995, 12, 15),
+        "poster_url": "https://example.com/poster.jpg",
+        **values,
+    }
+    return (
+        await db.execute(
+            insert(Movie).values(title=title, **values).returning(Movie.id)
+        )
+    ).scalar_one()
+
+
+async def seed_showtime(
+    db: AsyncSession,
+    rows: int = 4,
+    seats_per_row: int = 5,
+    start_time: Optional[datetime] = None,
+    movie_id: Optional[int] = None,
+) -> tuple[int, list[int]]:
+    """A showtime in a new hall; returns its id and the hall's seat ids"""
+    hall_count = (await db.execute(select(func.count(CinemaHall.id)))).scalar_one()
+    hall_id = (
+        await db.execute(
+            insert(CinemaHall)
+            .values(
+                name=f"Hall {hall_count + 1}",
+                row_count=rows,
+                seats_per_row=seats_per_row,
+            )
+            .returning(CinemaHall.id)
+        )
+    ).scalar_one()
+    seat_ids = list(
+        (
+            await db.execute(
+                insert(Seat).returning(Seat.id),
+                [
+                    {
+                        "seat_code": f"{hall_id}-{row}-{number}",
+                        "row_number": row,
+                        "seat_number": number,
+                        "price": 10,
+                        "cinema_hall_id": hall_id,
+                    }
+                    for row in range(1, rows + 1)
+                    for number in range(1, seats_per_row + 1)
+                ],
+            )
+        ).scalars()
+    )
+    if movie_id is None:
+        movie_id = await seed_movie(db, title=f"Movie {hall_id}")
+    if start_time is None:
+        start_time = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    showtime_id = (
+        await db.execute(
+            insert(Showtime)
+            .values(
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=2),
+                cleaning_ends_at=start_time + timedelta(hours=2, minutes=30),
+                capacity=len(seat_ids),
+                movie_id=movie_id,
+                cinema_hall_id=hall_id,
+            )
+            .returning(Showtime.id)
+        )
+    ).scalar_one()
+    return showtime_id, sorted(seat_ids)
+
+
+@pytest.fixture
+async def showtime(database) -> tuple[int, int, list[int]]:
+    """A customer and a showtime: (user id, showtime id, seat ids)"""
+    async with database.unit_of_work() as db:
+        user_id = await seed_user(db)
+        showtime_id, seat_ids = await seed_showtime(db)
+    return user_id, showtime_id, seat_ids
+
+
+async def get_counters(database, showtime_id: int) -> tuple[int, int]:
+    """Sold and held counters of the showtime"""
+    async with database.unit_of_work(read_only=True) as db:
+        showtime = await db.get(Showtime, showtime_id)
+        return showtime.sold, showtime.held
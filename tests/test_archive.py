@@ -0,0 +1,146 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, select
+
+from src.reservations.archive import archive_reservations
+from src.reservations.models import (
+    Reservation,
+    ReservationArchive,
+    ReservationSeat,
+    ReservationSeatArchive,
+)
+from src.reservations.occupancy import reconcile_counters
+from src.reservations.repository import ReservationsRepository
+from tests.conftest import seed_showtime, seed_user
+
+
+def seat_pairs(seat_ids: list[int]) -> list[list[int]]:
+    return [list(pair) for pair in zip(seat_ids[::2], seat_ids[1::2])]
+
+
+async def insert_reservations(
+    db, user_id: int, showtime_id: int, seat_ids: list[int], count: int
+) -> list[int]:
+    """`count` two-seat reservations, bypassing the booking checks"""
+    reservation_ids = []
+    for pair in seat_pairs(seat_ids)[:count]:
+        reservation_id = (
+            await db.execute(
+                insert(Reservation)
+                .values(user_id=user_id, showtime_id=showtime_id, total_amount=20)
+                .returning(Reservation.id)
+            )
+        ).scalar_one()
+        await db.execute(
+            insert(ReservationSeat),
+            [
+                {
+                    "reservation_id": reservation_id,
+                    "showtime_id": showtime_id,
+                    "seat_id": seat_id,
+                }
+                for seat_id in pair
+            ],
+        )
+        reservation_ids.append(reservation_id)
+    return reservation_ids
+
+
+async def count_rows(database, model) -> int:
+    async with database.unit_of_work(read_only=True) as db:
+        return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def test_past_reservations_move_to_the_archive(database):
+    async with database.unit_of_work() as db:
+        user_id = await seed_user(db)
+        past_id, past_seats = await seed_showtime(
+            db, start_time=datetime.now() - timedelta(days=60)
+        )
+        future_id, future_seats = await seed_showtime(db)
+        archived = await insert_reservations(db, user_id, past_id, past_seats, 5)
+        kept = await insert_reservations(db, user_id, future_id, future_seats, 2)
+        await reconcile_counters(db)
+
+    # Batches smaller than the backlog, so several transactions are needed
+    assert await archive_reservations(older_than_days=30, batch_size=2) == 5
+
+    assert await count_rows(database, Reservation) == 2
+    assert await count_rows(database, ReservationSeat) == 4
+    assert await count_rows(database, ReservationArchive) == 5
+    assert await count_rows(database, ReservationSeatArchive) == 10
+    async with database.unit_of_work() as db:
+        repository = ReservationsRepository(db)
+        hot = await repository.get_user_reservations(user_id)
+        everything = await repository.get_user_reservations(
+            user_id, include_archived=True
+        )
+        # Archived seats still count as sold
+        assert await reconcile_counters(db) == []
+
+    assert sorted(r.id for r in hot) == kept
+    assert sorted(r.id for r in everything) == sorted(archived + kept)
+    assert {r.id: r.seat_ids for r in everything if r.id in archived} == dict(
+        zip(archived, seat_pairs(past_seats))
+    )
+    assert await archive_reservations(older_than_days=30, batch_size=2) == 0
+
+
+async def test_booking_never_reads_a_large_archive(database):
+    # Scaled down from years of history; enough that a scan would show
+    archived = 20_000
+    created_at = datetime.now() - timedelta(days=400)
+    async with database.unit_of_work() as db:
+        user_id = await seed_user(db)
+        showtime_id, seat_ids = await seed_showtime(db)
+        await db.execute(
+            insert(ReservationArchive),
+            [
+                {
+                    "id": 1_000_000 + i,
+                    "total_amount": 20,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "user_id": user_id,
+                    "showtime_id": showtime_id + 1 + i % 100,
+                }
+                for i in range(archived)
+            ],
+        )
+        await db.execute(
+            insert(ReservationSeatArchive),
+            [
+                {
+                    "reservation_id": 1_000_000 + i,
+                    "seat_id": seat,
+                    "showtime_id": showtime_id + 1 + i % 100,
+                }
+                for i in range(archived)
+                for seat in (1, 2)
+            ],
+        )
+
+    statements = []
+    engine = database._engine.sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        started = time.perf_counter()
+        async with database.unit_of_work() as db:
+            await ReservationsRepository(db).create_reservation(
+                user_id, showtime_id, seat_ids[:2]
+            )
+        elapsed = time.perf_counter() - started
+        async with database.unit_of_work(read_only=True) as db:
+            hot = await ReservationsRepository(db).get_user_reservations(user_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(hot) == 1
+    assert statements
+    assert not [s for s in statements if "archive" in s], statements
+    assert elapsed < 1.0, f"booking took {elapsed * 1000:.0f} ms"
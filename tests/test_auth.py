@@ -0,0 +1,201 @@
+import time
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from sqlalchemy import update
+
+from src.auth import services
+from src.auth.cache import AccessTokenCache, InMemoryRevocationBackend
+from src.auth.config import JWTSettings
+from src.auth.exceptions import UserInactiveError, WrongCredentialError
+from src.auth.keys import KEY_TYPES, KeyRing
+from src.auth.schemas import AccessTokenData
+from src.auth.services import AuthenticationService
+from src.database import DBAsyncSessionManager, sessionmanager
+from src.users.cache import InMemoryUserCacheBackend, UserCache
+from src.users.models import RoleName, User
+from src.users.schemas import UserResponse
+from tests.conftest import create_schema, seed_user, sqlite_url
+
+
+def make_user() -> UserResponse:
+    return UserResponse.model_validate(
+        {
+            "id": 1,
+            "username": "alice",
+            "phone_number": "+14155552671",
+            "email": "alice@example.com",
+            "is_active": True,
+            "role_id": 1,
+            "role": {"name": RoleName.customer},
+        }
+    )
+
+
+async def test_revocation_is_seen_by_every_worker_sharing_the_backend():
+    shared = InMemoryRevocationBackend()
+    services = [AuthenticationService(), AuthenticationService()]
+    for service in services:
+        service.token_cache = AccessTokenCache(shared)
+    token = services[0].create_access_token(make_user())
+    for service in services:
+        assert (await service.verify_access_token(token)).username == "alice"
+
+    await services[0].revoke_access_token(token)
+
+    for service in services:
+        with pytest.raises(WrongCredentialError):
+            await service.verify_access_token(token)
+
+
+async def test_expired_revocations_are_dropped():
+    backend = InMemoryRevocationBackend()
+    now = time.time()
+    await backend.add("expiring", now + 0.01)
+    await backend.add("kept", now + 60)
+    time.sleep(0.02)
+
+    await backend.add("new", now + 60)
+
+    assert set(backend._revoked) == {"kept", "new"}
+    assert not await backend.contains("expiring")
+    assert await backend.contains("kept")
+
+
+def write_key_pair(directory: Path, name: str, private_key) -> tuple[Path, Path]:
+    private_path = directory / f"{name}-private.pem"
+    public_path = directory / f"{name}-public.pem"
+    private_path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    public_path.write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return private_path, public_path
+
+
+def make_service(settings: JWTSettings) -> AuthenticationService:
+    service = AuthenticationService()
+    service.keys = KeyRing.from_settings(settings)
+    service.algorithm = service.keys.algorithm
+    service.token_cache = AccessTokenCache(InMemoryRevocationBackend())
+    return service
+
+
+async def test_tokens_signed_before_a_key_rotation_keep_verifying(tmp_path: Path):
+    old_private, old_public = write_key_pair(
+        tmp_path, "old", ec.generate_private_key(ec.SECP256R1())
+    )
+    new_private, new_public = write_key_pair(
+        tmp_path, "new", ed25519.Ed25519PrivateKey.generate()
+    )
+    before = make_service(
+        JWTSettings(
+            algorithm="ES256",
+            key_id="2024-01",
+            private_key_path=old_private,
+            public_key_path=old_public,
+        )
+    )
+    after = make_service(
+        JWTSettings(
+            algorithm="EdDSA",
+            key_id="2024-02",
+            private_key_path=new_private,
+            public_key_path=new_public,
+            retired_keys={"2024-01": f"ES256:{old_public}"},
+        )
+    )
+    old_token = before.create_access_token(make_user())
+    new_token = after.create_access_token(make_user())
+
+    assert after.decode_jwt(old_token)["sub"] == "alice"
+    assert (await after.verify_access_token(old_token)).username == "alice"
+    assert (await after.verify_access_token(new_token)).username == "alice"
+    # The old deployment never learned the new key
+    with pytest.raises(WrongCredentialError):
+        await before.verify_access_token(new_token)
+
+
+PRIVATE_KEYS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def tokens_per_second(operation, count: int = 200) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        operation()
+    return count / (time.perf_counter() - started)
+
+
+def test_issue_and_verify_throughput_per_algorithm(tmp_path: Path):
+    assert set(PRIVATE_KEYS) == set(KEY_TYPES)
+    issued, verified = {}, {}
+    for algorithm, generate in PRIVATE_KEYS.items():
+        private_path, public_path = write_key_pair(tmp_path, algorithm, generate())
+        service = make_service(
+            JWTSettings(
+                algorithm=algorithm,
+                private_key_path=private_path,
+                public_key_path=public_path,
+            )
+        )
+        token = service.create_access_token(make_user())
+        assert service.decode_jwt(token)["sub"] == "alice"
+        issued[algorithm] = tokens_per_second(
+            lambda: service.create_access_token(make_user())
+        )
+        verified[algorithm] = tokens_per_second(lambda: service.decode_jwt(token))
+
+    rates = {
+        algorithm: f"{issued[algorithm]:.0f}/s issued, {verified[algorithm]:.0f}/s"
+        " verified"
+        for algorithm in PRIVATE_KEYS
+    }
+    # Loose floors, far below what any of them reach, to catch regressions
+    # like re-parsing the PEM key on every call
+    assert min(issued.values()) > 100, rates
+    assert min(verified.values()) > 500, rates
+    # RSA signing is the slow one; that is what the elliptic curves buy
+    assert issued["ES256"] > issued["RS256"], rates
+    assert issued["EdDSA"] > issued["RS256"], rates
+
+
+async def test_user_cache_is_filled_from_the_primary(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(services, "user_cache", UserCache(InMemoryUserCacheBackend()))
+    primary_url = sqlite_url(tmp_path / "primary.db")
+    replica_url = sqlite_url(tmp_path / "replica.db")
+    replica = DBAsyncSessionManager()
+    for url, manager in ((primary_url, sessionmanager), (replica_url, replica)):
+        await create_schema(url)
+        manager.init(url)
+        async with manager.unit_of_work() as db:
+            user_id = await seed_user(db)
+    await replica.close()
+    # The replica has not seen the deactivation yet
+    async with sessionmanager.unit_of_work() as db:
+        await db.execute(update(User).values(is_active=False))
+    await sessionmanager.close()
+
+    sessionmanager.init(primary_url, replica_urls=[replica_url])
+    token_data = AccessTokenData(id=user_id, username="alice", role="customer")
+    try:
+        async with sessionmanager.unit_of_work(read_only=True) as db:
+            assert db.info["replica"] == 0
+            with pytest.raises(UserInactiveError):
+                await AuthenticationService().get_user_from_token_data(db, token_data)
+    finally:
+        await sessionmanager.close()
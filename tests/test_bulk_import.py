@@ -0,0 +1,65 @@
+import asyncio
+import io
+
+import pytest
+from sqlalchemy import select
+
+from src.users.bulk_import import ImportWorkerPool, import_users
+from src.users.export import UsersFileFormat
+from src.users.models import User
+from tests.conftest import seed_user
+
+CSV_UPLOAD = """username,phone_number,email,password,first_name,last_name
+bob,+14155552701,bob@example.com,password-1,Bob,
+carol,+14155552702,carol@example.com,password-2,,
+dave,+14155552703,not-an-email,password-3,,
+bob,+14155552704,bob2@example.com,password-4,,
+alice,+14155552705,alice2@example.com,password-5,,
+erin,+14155552706,erin@example.com,short,,
+"""
+
+
+@pytest.fixture
+async def pool():
+    pool = ImportWorkerPool(workers=2)
+    pool.start()
+    yield pool
+    await pool.stop()
+
+
+async def test_import_reports_failed_rows_and_creates_the_rest(database, pool):
+    async with database.unit_of_work() as db:
+        await seed_user(db, username="alice")
+
+    report = await import_users(
+        io.StringIO(CSV_UPLOAD), UsersFileFormat.csv, batch_size=2, pool=pool
+    )
+
+    assert (report.total, report.created, report.failed) == (6, 2, 4)
+    assert sorted(error.row for error in report.errors) == [4, 5, 6, 7]
+    async with database.unit_of_work(read_only=True) as db:
+        usernames = (await db.execute(select(User.username))).scalars().all()
+    assert sorted(usernames) == ["alice", "bob", "carol"]
+
+
+async def test_imports_share_one_executor(database, pool):
+    async with database.unit_of_work() as db:
+        await seed_user(db, username="alice")
+    executor = pool.executor
+
+    await asyncio.gather(
+        *(
+            import_users(io.StringIO(upload), UsersFileFormat.ndjson, pool=pool)
+            for upload in (
+                '{"username": "bob", "phone_number": "+14155552701", '
+                '"email": "bob@example.com", "password": "password-1"}\n',
+                '{"username": "carol", "phone_number": "+14155552702", '
+                '"email": "carol@example.com", "password": "password-2"}\n',
+            )
+        )
+    )
+
+    assert pool.executor is executor
+    await pool.stop()
+    with pytest.raises(RuntimeError):
+        pool.executor
@@ -0,0 +1,114 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import OperationalError
+
+from src import database
+from src.database import DBAsyncSessionManager, sessionmanager
+from src.users.models import Role, RoleName, User
+from src.users.repository import UsersRepository
+from tests.conftest import create_schema, sqlite_url
+
+
+def make_database(path: Path, name: str) -> str:
+    """SQLite file whose `marker` table tells which database served a read"""
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE marker (name TEXT)")
+        connection.execute("INSERT INTO marker VALUES (?)", (name,))
+    return sqlite_url(path)
+
+
+async def served_by(manager: DBAsyncSessionManager, **options) -> str:
+    async with manager.unit_of_work(**options) as session:
+        return (await session.execute(text("SELECT name FROM marker"))).scalar_one()
+
+
+@pytest.fixture
+async def manager(tmp_path: Path):
+    manager = DBAsyncSessionManager()
+    manager.init(
+        make_database(tmp_path / "primary.db", "primary"),
+        replica_urls=[
+            make_database(tmp_path / "replica-1.db", "replica-1"),
+            make_database(tmp_path / "replica-2.db", "replica-2"),
+        ],
+        read_your_writes_seconds=60.0,
+    )
+    yield manager
+    await manager.close()
+
+
+async def test_writes_go_to_primary_and_reads_round_robin(manager):
+    assert await served_by(manager) == "primary"
+    assert [await served_by(manager, read_only=True) for _ in range(4)] == [
+        "replica-1",
+        "replica-2",
+        "replica-1",
+        "replica-2",
+    ]
+
+
+async def test_read_your_writes_window_is_per_key(manager):
+    async with manager.unit_of_work(sticky_key=1) as session:
+        await session.execute(text("UPDATE marker SET name = name"))
+
+    assert await served_by(manager, read_only=True, sticky_key=1) == "primary"
+    assert await served_by(manager, read_only=True, sticky_key=2) == "replica-1"
+
+
+async def test_expired_writes_are_pruned(manager, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(database.time, "monotonic", lambda: now)
+    for user_id in range(100):
+        manager.mark_written(user_id)
+    assert len(manager._recent_writes) == 100
+
+    now += 61.0
+    manager.mark_written("latest")
+    assert list(manager._recent_writes) == ["latest"]
+
+
+async def test_unreachable_replica_is_skipped(tmp_path: Path):
+    manager = DBAsyncSessionManager()
+    manager.init(
+        make_database(tmp_path / "primary.db", "primary"),
+        replica_urls=[sqlite_url(tmp_path / "missing" / "replica.db")],
+    )
+    with pytest.raises(OperationalError):
+        await served_by(manager, read_only=True)
+    # Marked down for replica_retry_seconds, reads fall back to the primary
+    assert await served_by(manager, read_only=True) == "primary"
+    await manager.close()
+
+
+async def test_user_lookup_fails_over_to_primary_in_the_same_request(
+    tmp_path: Path,
+):
+    primary_url = sqlite_url(tmp_path / "primary.db")
+    await create_schema(primary_url)
+    sessionmanager.init(
+        primary_url, replica_urls=[sqlite_url(tmp_path / "missing" / "replica.db")]
+    )
+    try:
+        async with sessionmanager.unit_of_work() as session:
+            await session.execute(insert(Role).values(id=1, name=RoleName.customer))
+            await session.execute(
+                insert(User).values(
+                    username="alice",
+                    phone_number="+10000000000",
+                    email="alice@example.com",
+                    password="hash",
+                    role_id=1,
+                )
+            )
+
+        async with sessionmanager.unit_of_work(read_only=True) as session:
+            assert session.info["replica"] == 0
+            user = await UsersRepository(session).get_user_by_name("alice")
+
+        assert user.username == "alice"
+        assert sessionmanager._pick_replica(None) is None
+    finally:
+        await sessionmanager.close()
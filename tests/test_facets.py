@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from src.movies.exceptions import InvalidDateRangeError
+from src.movies.facets import genre_facets
+from src.movies.models import Genre
+from src.movies.repository import MoviesRepository, ShowtimesRepository
+from src.movies.schemas import ShowtimeCreateRequest
+from tests.conftest import seed_movie, seed_showtime
+
+TODAY = date.today()
+
+
+def at(days: int, hour: int = 10) -> datetime:
+    return datetime.combine(TODAY + timedelta(days=days), datetime.min.time()).replace(
+        hour=hour
+    )
+
+
+@pytest.fixture
+async def catalog(database) -> dict[str, int]:
+    """Crime plays tomorrow, Drama in three days; Comedy has no movies"""
+    ids = {}
+    async with database.unit_of_work() as db:
+        for genre in ("Crime", "Drama", "Comedy"):
+            ids[genre] = (
+                await db.execute(insert(Genre).values(title=genre).returning(Genre.id))
+            ).scalar_one()
+        for title, days in (("Heat", 1), ("Amadeus", 3)):
+            ids[title] = await seed_movie(db, title=title)
+            await seed_showtime(db, start_time=at(days), movie_id=ids[title])
+    async with database.unit_of_work() as db:
+        await MoviesRepository(db).link_genre(ids["Heat"], ids["Crime"])
+        await MoviesRepository(db).link_genre(ids["Amadeus"], ids["Drama"])
+    return ids
+
+
+async def facet_counts(database, date_from=None, date_to=None) -> dict[str, int]:
+    async with database.unit_of_work(read_only=True) as db:
+        facets = await MoviesRepository(db).get_genre_facets(date_from, date_to)
+    return {facet.title: facet.count for facet in facets}
+
+
+async def test_links_and_unlinks_are_applied_without_a_reload(database, catalog):
+    assert await facet_counts(database) == {"Crime": 1, "Drama": 1, "Comedy": 0}
+    loaded_at = genre_facets._loaded_at
+
+    async with database.unit_of_work() as db:
+        await MoviesRepository(db).link_genre(catalog["Heat"], catalog["Comedy"])
+        await MoviesRepository(db).link_genre(catalog["Amadeus"], catalog["Crime"])
+    assert await facet_counts(database) == {"Crime": 2, "Drama": 1, "Comedy": 1}
+
+    async with database.unit_of_work() as db:
+        await MoviesRepository(db).unlink_genre(catalog["Heat"], catalog["Crime"])
+        # Unlinking twice changes nothing
+        await MoviesRepository(db).unlink_genre(catalog["Heat"], catalog["Crime"])
+    assert await facet_counts(database) == {"Crime": 1, "Drama": 1, "Comedy": 1}
+    assert genre_facets._loaded_at == loaded_at
+
+
+async def test_counts_are_scoped_to_the_date_range(database, catalog):
+    tomorrow, in_three_days = (TODAY + timedelta(days=d) for d in (1, 3))
+    assert await facet_counts(database, tomorrow, tomorrow) == {
+        "Crime": 1,
+        "Drama": 0,
+        "Comedy": 0,
+    }
+    assert await facet_counts(database, tomorrow, in_three_days) == {
+        "Crime": 1,
+        "Drama": 1,
+        "Comedy": 0,
+    }
+    # A range starting in the past counts from today
+    assert await facet_counts(database, TODAY - timedelta(days=60), tomorrow) == {
+        "Crime": 1,
+        "Drama": 0,
+        "Comedy": 0,
+    }
+    with pytest.raises(InvalidDateRangeError):
+        await facet_counts(
+            database, TODAY - timedelta(days=9), TODAY - timedelta(days=2)
+        )
+
+    # Showtimes created and deleted later update the loaded days
+    async with database.unit_of_work() as db:
+        created = await ShowtimesRepository(db).create_showtime(
+            ShowtimeCreateRequest(
+                movie_id=catalog["Amadeus"],
+                cinema_hall_id=1,
+                start_time=at(1, hour=18),
+            )
+        )
+    assert (await facet_counts(database, tomorrow, tomorrow))["Drama"] == 1
+    async with database.unit_of_work() as db:
+        await ShowtimesRepository(db).delete_showtime(created.id)
+    assert (await facet_counts(database, tomorrow, tomorrow))["Drama"] == 0
+
+
+class EditDuringQuery:
+    """Session stand-in that commits `edit` right after the `nth` query"""
+
+    def __init__(self, db, nth: int, edit):
+        self.db = db
+        self.nth = nth
+        self.edit = edit
+
+    async def execute(self, *args, **kwargs):
+        result = await self.db.execute(*args, **kwargs)
+        self.nth -= 1
+        if self.nth == 0:
+            await self.edit()
+        return result
+
+
+async def test_reload_racing_a_link_keeps_the_link(database, catalog):
+    async def link() -> None:
+        async with database.unit_of_work() as db:
+            await MoviesRepository(db).link_genre(catalog["Heat"], catalog["Comedy"])
+
+    genre_facets.ttl = -1
+    async with database.unit_of_work(read_only=True) as db:
+        # The link commits after the reload has read the links
+        facets = await genre_facets.get(EditDuringQuery(db, 2, link))
+    assert {facet.title: facet.count for facet in facets}["Comedy"] == 1
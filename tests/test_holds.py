@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from src.reservations import repository
+from src.reservations.availability import ShowtimeSeatMap, seat_availability
+from src.reservations.holds import hold_expiry
+from src.reservations.layout import HallLayout
+from src.reservations.models import SeatHold, SeatHoldSeat
+from src.reservations.repository import ReservationsRepository
+from src.reservations.schemas import SeatState
+from tests.conftest import get_counters, seed_user
+
+LAYOUT = HallLayout(1, [(i, f"A{i}", 1, i) for i in range(1, 5)], 1, 4)
+
+
+def test_lapsed_hold_reads_as_free():
+    now = datetime.now()
+    seat_map = ShowtimeSeatMap(
+        1, LAYOUT, reserved_seat_ids=[1], held_seats=[(2, now - timedelta(seconds=1))]
+    )
+    seat_map.set_state([3], SeatState.held, now + timedelta(minutes=5))
+    # A hold announced by another worker, without its expiry time
+    seat_map.set_state([4], SeatState.held)
+
+    assert seat_map.seat_states() == {
+        1: SeatState.reserved,
+        2: SeatState.free,
+        3: SeatState.held,
+        4: SeatState.held,
+    }
+    assert seat_map.free_seat_ids() == [2]
+
+    seat_map.clear_expired_holds(now + timedelta(minutes=6))
+    assert seat_map.free_seat_ids() == [2, 3]
+    seat_map.clear_expired_holds(now + timedelta(days=1))
+    assert seat_map.free_seat_ids() == [2, 3, 4]
+    assert seat_map.next_hold_deadline is None
+
+
+async def test_seats_of_a_lapsed_hold_can_be_booked_before_the_sweep(
+    database, showtime, monkeypatch
+):
+    user_id, showtime_id, seat_ids = showtime
+    monkeypatch.setattr(repository, "SEAT_HOLD_TTL_SECONDS", 0.05)
+    async with database.unit_of_work() as db:
+        other_user_id = await seed_user(db, username="bob")
+        await seat_availability.get_map(db, showtime_id)
+    async with database.unit_of_work() as db:
+        await ReservationsRepository(db).create_hold(
+            other_user_id, showtime_id, seat_ids[:2]
+        )
+    assert not seat_availability.get_cached(showtime_id).is_free(seat_ids[0])
+
+    # The hold runs out without the expiry task deleting it
+    await asyncio.sleep(0.1)
+    async with database.unit_of_work() as db:
+        reservation = await ReservationsRepository(db).create_reservation(
+            user_id, showtime_id, seat_ids[:2]
+        )
+
+    assert reservation.seat_ids == seat_ids[:2]
+    assert await get_counters(database, showtime_id) == (2, 0)
+
+
+async def insert_expired_hold(database, user_id, showtime_id, seat_ids) -> int:
+    async with database.unit_of_work() as db:
+        hold_id = (
+            await db.execute(
+                insert(SeatHold)
+                .values(
+                    user_id=user_id,
+                    showtime_id=showtime_id,
+                    expires_at=datetime.now() - timedelta(seconds=1),
+                )
+                .returning(SeatHold.id)
+            )
+        ).scalar_one()
+        await db.execute(
+            insert(SeatHoldSeat),
+            [
+                {"hold_id": hold_id, "showtime_id": showtime_id, "seat_id": seat_id}
+                for seat_id in seat_ids
+            ],
+        )
+    return hold_id
+
+
+async def hold_ids(database) -> list[int]:
+    async with database.unit_of_work(read_only=True) as db:
+        return list((await db.execute(select(SeatHold.id))).scalars())
+
+
+async def test_sweep_picks_up_holds_it_was_not_told_about(database, showtime):
+    user_id, showtime_id, seat_ids = showtime
+    hold_id = await insert_expired_hold(database, user_id, showtime_id, seat_ids[:1])
+    assert len(hold_expiry) == 0
+
+    await hold_expiry.load(expired_only=True)
+    assert len(hold_expiry) == 1
+    await hold_expiry.expire_due(datetime.now())
+
+    assert hold_id not in await hold_ids(database)
+    assert len(hold_expiry) == 0
+
+
+async def test_locked_holds_are_retried(database, showtime, monkeypatch):
+    user_id, showtime_id, seat_ids = showtime
+    hold_id = await insert_expired_hold(database, user_id, showtime_id, seat_ids[:1])
+    hold_expiry.schedule(hold_id, datetime.now() - timedelta(seconds=1))
+
+    async def all_locked(self, *criteria):
+        return []
+
+    # As if another transaction had the hold locked (SKIP LOCKED on Postgres)
+    with monkeypatch.context() as patch:
+        patch.setattr(ReservationsRepository, "lock_expired_holds", all_locked)
+        await hold_expiry.expire_due(datetime.now())
+    assert await hold_ids(database) == [hold_id]
+    retry_at = hold_expiry.next_deadline()
+    assert retry_at is not None
+
+    await hold_expiry.expire_due(retry_at)
+    assert await hold_ids(database) == []
+    assert hold_expiry.next_deadline() is None
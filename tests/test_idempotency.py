@@ -0,0 +1,222 @@
+import asyncio
+from typing import Optional
+
+import httpx
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from src.dependencies import auth_service, get_caller_id
+from src.utils.idempotency import (
+    IdempotencyMiddleware,
+    IdempotencyRecord,
+    InMemoryIdempotencyBackend,
+)
+
+
+class CountingApp:
+    """Answers every request after `delay` seconds and counts the calls"""
+
+    def __init__(self, delay: float = 0.0, body: bytes = b"", stream: bool = False):
+        self.calls = 0
+        self.delay = delay
+        self.body = body
+        self.stream = stream
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.calls += 1
+        await Request(scope, receive).body()
+        await asyncio.sleep(self.delay)
+        if self.stream:
+
+            async def events():
+                yield b"event: snapshot\ndata: {}\n\n"
+
+            response = StreamingResponse(events(), media_type="text/event-stream")
+        elif self.body:
+            response = Response(self.body)
+        else:
+            response = JSONResponse({"call": self.calls}, status_code=201)
+        await response(scope, receive, send)
+
+
+class ScriptedApp(CountingApp):
+    """Answers the n-th call with the n-th of `responses`"""
+
+    def __init__(self, *responses: Response):
+        super().__init__()
+        self.responses = responses
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.calls += 1
+        await Request(scope, receive).body()
+        await self.responses[self.calls - 1](scope, receive, send)
+
+
+async def token_owner(headers: Headers) -> Optional[str]:
+    """Test resolver: `Bearer <user>-<anything>` belongs to <user>"""
+    authorization = headers.get("authorization")
+    if authorization is None:
+        return None
+    return authorization.removeprefix("Bearer ").split("-")[0]
+
+
+def make_client(
+    app, client: tuple[str, int] = ("10.0.0.1", 1234), **options
+) -> httpx.AsyncClient:
+    middleware = IdempotencyMiddleware(
+        app, backend=InMemoryIdempotencyBackend(), identify=token_owner, **options
+    )
+    return client_for(middleware, client)
+
+
+def client_for(middleware, client: tuple[str, int]) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=middleware, client=client)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def post(client: httpx.AsyncClient, key: str = "key-1", **options):
+    headers = {"Idempotency-Key": key, **options.pop("headers", {})}
+    return client.post("/reservations/", headers=headers, **options)
+
+
+async def test_retry_replays_the_stored_response():
+    app = CountingApp()
+    async with make_client(app) as client:
+        first = await post(client, json={"seats": [1]})
+        retry = await post(client, json={"seats": [1]})
+        reused = await post(client, json={"seats": [2]})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == {"call": 1}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert reused.status_code == 422
+    assert app.calls == 1
+
+
+async def test_oversized_request_body_is_rejected():
+    app = CountingApp()
+    async with make_client(app, max_body_size=16) as client:
+        response = await post(client, content=b"x" * 17)
+        # Without a Content-Length the body is counted while it is read
+        chunked = await post(client, content=chunks(b"x" * 10, b"x" * 10))
+
+    assert response.status_code == chunked.status_code == 413
+    assert app.calls == 0
+
+
+async def test_oversized_and_streaming_responses_are_not_stored():
+    large = CountingApp(body=b"x" * 32)
+    stream = CountingApp(stream=True)
+    async with make_client(large, max_response_size=16) as client:
+        responses = [await post(client) for _ in range(2)]
+    assert [len(response.content) for response in responses] == [32, 32]
+    assert large.calls == 2
+
+    async with make_client(stream) as client:
+        responses = [await post(client) for _ in range(2)]
+    assert responses[1].text.startswith("event: snapshot")
+    assert "idempotent-replayed" not in responses[1].headers
+    assert stream.calls == 2
+
+
+async def test_busy_response_is_not_replayed_to_the_retry():
+    app = ScriptedApp(
+        JSONResponse(
+            {"detail": "Seats are being booked"},
+            status_code=409,
+            headers={"Retry-After": "1"},
+        ),
+        JSONResponse({"call": 2}, status_code=201),
+    )
+    async with make_client(app) as client:
+        busy = await post(client)
+        retry = await post(client)
+        replayed = await post(client)
+
+    assert busy.status_code == 409
+    assert retry.status_code == 201
+    assert replayed.headers["idempotent-replayed"] == "true"
+    assert app.calls == 2
+
+
+async def test_responses_setting_cookies_are_not_stored():
+    login = JSONResponse({"access_token": "secret"})
+    login.set_cookie("refresh_token", "secret", httponly=True)
+    app = ScriptedApp(login, login)
+    backend = InMemoryIdempotencyBackend()
+    middleware = IdempotencyMiddleware(app, backend=backend)
+    async with client_for(middleware, ("10.0.0.1", 1)) as client:
+        responses = [await post(client) for _ in range(2)]
+
+    assert "idempotent-replayed" not in responses[1].headers
+    assert app.calls == 2
+    assert len(backend._entries) == 0
+
+
+async def test_eviction_spares_pending_claims():
+    backend = InMemoryIdempotencyBackend(max_size=2)
+    pending = IdempotencyRecord(fingerprint="a")
+    await backend.claim("pending", pending, 60)
+    waiter = asyncio.create_task(backend.wait("pending", 1))
+    for key in ("done-1", "done-2"):
+        await backend.set(key, IdempotencyRecord(fingerprint=key, status_code=201), 60)
+
+    assert await backend.get("pending") == pending
+    assert await backend.get("done-1") is None
+    assert not waiter.done()
+
+    # With only live claims left the store grows past max_size instead
+    await backend.delete("done-2")
+    await backend.claim("pending-2", pending, 60)
+    await backend.claim("pending-3", pending, 60)
+    assert len(backend._entries) == 3
+    await backend.delete("pending")
+    assert await waiter is None
+
+
+async def test_slow_request_keeps_its_claim_past_the_pending_ttl():
+    app = CountingApp(delay=0.5)
+    async with make_client(app, pending_ttl=0.15) as client:
+        first = asyncio.create_task(post(client))
+        await asyncio.sleep(0.3)
+        duplicate = await post(client)
+        await first
+
+    assert duplicate.json() == {"call": 1}
+    assert duplicate.headers["idempotent-replayed"] == "true"
+    assert app.calls == 1
+
+
+async def test_keys_are_scoped_by_user_then_client_address():
+    app = CountingApp()
+    middleware = IdempotencyMiddleware(
+        app, backend=InMemoryIdempotencyBackend(), identify=token_owner
+    )
+    alice = {"Authorization": "Bearer alice-1"}
+    refreshed = {"Authorization": "Bearer alice-2"}
+    async with client_for(middleware, ("10.0.0.1", 1)) as client:
+        assert (await post(client, headers=alice)).json() == {"call": 1}
+        assert (
+            await post(client, headers={"Authorization": "Bearer bob-1"})
+        ).json() == {"call": 2}
+        assert (await post(client)).json() == {"call": 3}
+    async with client_for(middleware, ("10.0.0.2", 1)) as client:
+        # A new token for the same user replays, even from another address
+        assert (await post(client, headers=refreshed)).json() == {"call": 1}
+        assert (await post(client)).json() == {"call": 4}
+
+
+async def test_caller_id_comes_from_a_verified_token():
+    token = auth_service.encode_jwt(
+        {"type": "access", "sub": "alice", "sub_id": 7, "exp": 2**32}
+    )
+
+    assert await get_caller_id(Headers({"authorization": f"Bearer {token}"})) == "7"
+    assert await get_caller_id(Headers({"authorization": "Bearer forged"})) is None
+    assert await get_caller_id(Headers({})) is None
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import time
+
+from src.reservations.availability import seat_availability
+from src.reservations.live import LocalSeatFeedBackend, SeatFeed
+from src.reservations.schemas import SeatState
+
+
+async def next_event(events) -> tuple[str, dict]:
+    """The next server-sent event as (name, decoded data)"""
+    message = await asyncio.wait_for(anext(events), 1)
+    name, data = message.rstrip("\n").split("\n")
+    return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def seat_states(snapshot: dict) -> dict[int, str]:
+    return {seat["id"]: seat["state"] for seat in snapshot["seats"]}
+
+
+async def test_snapshot_then_updates_then_resync(database, showtime):
+    _, showtime_id, seat_ids = showtime
+    feed = SeatFeed(LocalSeatFeedBackend(), max_pending=3)
+    await feed.start()
+    async with database.session() as db:
+        seat_map = await seat_availability.get_map(db, showtime_id)
+    events = feed.events(feed.subscribe(showtime_id), seat_map)
+    try:
+        name, snapshot = await next_event(events)
+        assert name == "snapshot"
+        assert set(seat_states(snapshot).values()) == {"free"}
+
+        async with database.unit_of_work() as db:
+            seat_availability.reserve_on_commit(db, showtime_id, seat_ids[:2])
+        name, delta = await next_event(events)
+        assert name == "update"
+        assert delta == {
+            "showtime_id": showtime_id,
+            "seats": [{"id": seat_id, "state": "reserved"} for seat_id in seat_ids[:2]],
+        }
+
+        # More changed seats than max_pending: the backlog is replaced by
+        # a fresh snapshot
+        async with database.unit_of_work() as db:
+            seat_availability.reserve_on_commit(db, showtime_id, seat_ids[2:6])
+        name, snapshot = await next_event(events)
+        assert name == "snapshot"
+        states = seat_states(snapshot)
+        assert [states[seat_id] for seat_id in seat_ids[:7]] == ["reserved"] * 6 + [
+            "free"
+        ]
+    finally:
+        await events.aclose()
+        await feed.stop()
+    assert feed.subscriber_count(showtime_id) == 0
+
+
+async def test_changes_reach_subscribers_of_other_workers(database, showtime):
+    _, showtime_id, seat_ids = showtime
+    hub = []
+    first, second = (SeatFeed(LocalSeatFeedBackend(hub)) for _ in range(2))
+    await first.start()
+    await second.start()
+    async with database.session() as db:
+        seat_map = await seat_availability.get_map(db, showtime_id)
+    events = second.events(second.subscribe(showtime_id), seat_map)
+    try:
+        assert (await next_event(events))[0] == "snapshot"
+
+        first.publish(showtime_id, (seat_ids[0],), SeatState.held)
+        name, delta = await next_event(events)
+        assert name == "update"
+        assert delta["seats"] == [{"id": seat_ids[0], "state": "held"}]
+        # The receiving worker's cached map is updated too
+        cached = seat_availability.get_cached(showtime_id)
+        assert cached.seat_states()[seat_ids[0]] == SeatState.held
+    finally:
+        await events.aclose()
+        await first.stop()
+        await second.stop()
+
+
+async def test_stalled_subscriber_is_disconnected():
+    feed = SeatFeed(LocalSeatFeedBackend(), max_pending=100, stall_seconds=0)
+    stalled = feed.subscribe(1)
+
+    feed.publish(1, (1,), SeatState.reserved)
+    assert stalled.pending == {1: SeatState.reserved}
+    # It has not taken the first change, so the second one drops it
+    feed.publish(1, (2,), SeatState.reserved)
+    assert stalled.closed
+    assert feed.subscriber_count(1) == 0
+
+
+async def test_fan_out_to_many_subscribers_coalesces_and_drops_stalled():
+    # Scaled down from 10k subscribers to keep the suite fast
+    feed = SeatFeed(LocalSeatFeedBackend(), max_pending=20, stall_seconds=60)
+    subscriptions = [feed.subscribe(1) for _ in range(2000)]
+
+    started = time.perf_counter()
+    for change in range(100):
+        state = SeatState.held if change % 2 else SeatState.reserved
+        feed.publish(1, (change % 10,), state)
+    elapsed = time.perf_counter() - started
+
+    # 200k deliveries; each is a dict write, not a queued message
+    assert elapsed < 2.0, f"{elapsed:.2f}s to fan out 100 changes"
+    for subscription in subscriptions:
+        assert subscription.pending == {
+            seat_id: SeatState.held if seat_id % 2 else SeatState.reserved
+            for seat_id in range(10)
+        }
+
+    # Past max_pending seats the backlog is swapped for a resync
+    feed.publish(1, tuple(range(10, 21)), SeatState.reserved)
+    assert all(
+        subscription.resync and not subscription.pending
+        for subscription in subscriptions
+    )
+
+    # Subscribers that took their changes stay; the rest have stalled
+    keeping = subscriptions[::2]
+    for subscription in keeping:
+        subscription.drain()
+    feed.stall_seconds = 0
+    feed.publish(1, (0,), SeatState.free)
+    assert feed.subscriber_count(1) == len(keeping)
+    assert all(subscription.closed for subscription in subscriptions[1::2])
+    assert all(subscription.pending == {0: SeatState.free} for subscription in keeping)
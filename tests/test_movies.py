@@ -0,0 +1,209 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import event, insert
+
+from src.main import app
+from src.movies.constants import MOVIES_PAGE_SIZE
+from src.movies.models import Genre, Movie, MovieGenre
+from src.movies.search import MovieSearchIndex
+from tests.conftest import seed_movie, seed_showtime
+
+
+@contextmanager
+def count_selects(database):
+    """Collects the SELECT statements run on the primary engine"""
+    statements = []
+
+    def record(connection, cursor, statement, *args) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = database._engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+async def seed_catalog(database, count: int) -> None:
+    """`count` movies, each with two genres and two showtimes this week"""
+    async with database.unit_of_work() as db:
+        genre_ids = list(
+            (
+                await db.execute(
+                    insert(Genre).returning(Genre.id),
+                    [{"title": "Drama"}, {"title": "Crime"}],
+                )
+            ).scalars()
+        )
+        for i in range(count):
+            movie_id = await seed_movie(
+                db, title=f"Movie {i}", release_date=datetime(2000, 1, 1) + timedelta(i)
+            )
+            await db.execute(
+                insert(MovieGenre),
+                [
+                    {"movie_id": movie_id, "genre_id": genre_id}
+                    for genre_id in genre_ids
+                ],
+            )
+            for day in (1, 2):
+                await seed_showtime(
+                    db,
+                    rows=1,
+                    seats_per_row=1,
+                    start_time=datetime.now().replace(microsecond=0)
+                    + timedelta(days=day),
+                    movie_id=movie_id,
+                )
+
+
+async def read_catalog(database, limit: int) -> tuple[dict, list[str]]:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        with count_selects(database) as statements:
+            response = await client.get("/movies/", params={"limit": limit})
+    assert response.status_code == 200
+    return response.json(), statements
+
+
+async def test_catalog_page_costs_the_same_queries_at_any_size(database):
+    await seed_catalog(database, 50)
+
+    small, small_statements = await read_catalog(database, 5)
+    full, full_statements = await read_catalog(database, 50)
+
+    assert len(small["items"]) == 5
+    assert len(full["items"]) == 50
+    for movie in full["items"]:
+        assert len(movie["genres"]) == 2
+        assert len(movie["showtimes"]) == 2
+    # Movies, then one SELECT ... IN each for genres and showtimes
+    assert len(small_statements) == len(full_statements) == 3
+
+
+def test_search_index_ranks_title_matches_first():
+    index = MovieSearchIndex(
+        [
+            (1, "The Godfather", None),
+            (2, "The Godfather Part II", None),
+            (3, "Heat", "A godfather of crime"),
+            (4, "Alien", None),
+        ]
+    )
+
+    assert index.search("godfather") == [1, 2, 3]
+    assert index.search("the godfather part") == [2, 1, 3]
+    # Typos only match through title similarity
+    assert index.search("godfahter") == [1]
+    assert index.search("predator") == []
+
+
+async def test_search_is_ranked_and_filtered(database):
+    async with database.unit_of_work() as db:
+        crime = (
+            await db.execute(insert(Genre).values(title="Crime").returning(Genre.id))
+        ).scalar_one()
+        for title, year, genre_id in (
+            ("The Godfather", 1972, crime),
+            ("The Godfather Part II", 1974, None),
+            ("Heat", 1995, crime),
+            ("Alien", 1979, crime),
+        ):
+            description = "A godfather of crime" if title == "Heat" else None
+            movie_id = await seed_movie(
+                db,
+                title=title,
+                description=description,
+                release_date=datetime(year, 6, 1),
+            )
+            if genre_id is not None:
+                await db.execute(
+                    insert(MovieGenre).values(movie_id=movie_id, genre_id=genre_id)
+                )
+
+    async def search(**params) -> list[str]:
+        response = await client.get("/movies/search/", params=params)
+        assert response.status_code == 200
+        return [movie["title"] for movie in response.json()]
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        assert await search(q="godfather") == [
+            "The Godfather",
+            "The Godfather Part II",
+            "Heat",
+        ]
+        assert await search(q="godfather", limit=2) == [
+            "The Godfather",
+            "The Godfather Part II",
+        ]
+        assert await search(q="godfather", genre_id=crime) == ["The Godfather", "Heat"]
+        assert await search(q="godfather", released_from="1973-01-01") == [
+            "The Godfather Part II",
+            "Heat",
+        ]
+        assert await search(q="godfather", released_to="1973-01-01") == [
+            "The Godfather"
+        ]
+        assert await search(q="godfahter") == ["The Godfather"]
+
+
+ADJECTIVES = ["Dark", "Silent", "Last", "Lost", "Red", "Iron", "Broken", "Golden"]
+NOUNS = ["Knight", "River", "Empire", "Garden", "Storm", "Harbor", "Signal", "Mirror"]
+
+
+def synthetic_title(i: int) -> str:
+    """Distinct titles sharing words, so most queries match many movies"""
+    adjective, noun = ADJECTIVES[i % 8], NOUNS[i // 8 % 8]
+    return f"The {adjective} {noun} {i // 64}"
+
+
+async def test_search_over_a_synthetic_catalog(database):
+    # Scaled down from a 1M-title catalog to keep the suite fast
+    count = 20_000
+    async with database.unit_of_work() as db:
+        await db.execute(
+            insert(Movie),
+            [
+                {
+                    "title": synthetic_title(i),
+                    "description": f"A story about a {NOUNS[i * 7 % 8].lower()}",
+                    "duration_minutes": 100,
+                    "release_date": datetime(2000, 1, 1) + timedelta(days=i % 5000),
+                    "poster_url": "https://example.com/poster.jpg",
+                }
+                for i in range(count)
+            ],
+        )
+
+    async def search(**params) -> list[dict]:
+        response = await client.get("/movies/search/", params=params)
+        assert response.status_code == 200
+        return response.json()
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        # The first search builds the fallback index over the whole catalog
+        assert len(await search(q="dark knight")) == MOVIES_PAGE_SIZE
+
+        latencies = []
+        for query, limit in (
+            ("dark knight 42", 10),
+            ("harbor", 50),
+            ("golden storm", 5),
+        ):
+            started = time.perf_counter()
+            movies = await search(q=query, limit=limit)
+            latencies.append(time.perf_counter() - started)
+            assert len(movies) == limit
+
+    assert movies[0]["title"].startswith("The Golden Storm")
+    assert max(latencies) < 0.5, [f"{latency * 1000:.0f} ms" for latency in latencies]
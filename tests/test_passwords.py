@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+from src.utils.passwords import PasswordHasher
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> list[float]:
+    """How late each `interval` sleep wakes up while other work runs"""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(max_workers=2)
+    try:
+        hashed = await hasher.hash("correct horse")
+        assert await hasher.verify("correct horse", hashed)
+        assert not await hasher.verify("wrong horse", hashed)
+        assert await hasher.verify_and_update("correct horse", hashed) == (
+            True,
+            None,
+        )
+    finally:
+        await hasher.shutdown()
+
+
+async def test_login_burst_does_not_stall_the_event_loop():
+    hasher = PasswordHasher(max_workers=2)
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    try:
+        await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(4)))
+    finally:
+        stop.set()
+        await hasher.shutdown()
+    lags = sorted(await lag_task)
+
+    # One bcrypt hash takes hundreds of milliseconds; run on the loop, a
+    # single one would delay every other coroutine by that much
+    p99 = lags[int(len(lags) * 0.99) - 1]
+    assert p99 < 0.05, f"p99 loop lag {p99 * 1000:.1f} ms during the burst"
+
+
+async def test_concurrency_is_capped_at_max_workers():
+    hasher = PasswordHasher(max_workers=2)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    try:
+        await asyncio.gather(*(hasher._run(work) for _ in range(10)))
+    finally:
+        await hasher.shutdown()
+    assert peak == 2
+
+
+async def test_shutdown_does_not_block_the_event_loop():
+    hasher = PasswordHasher(max_workers=1)
+    running = asyncio.create_task(hasher._run(time.sleep, 0.3))
+    await asyncio.sleep(0.05)
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    try:
+        await hasher.shutdown()
+    finally:
+        stop.set()
+    lags = await lag_task
+
+    # The running job finished before the pool was gone
+    await running
+    assert max(lags) < 0.1, f"loop stalled {max(lags) * 1000:.0f} ms in shutdown"
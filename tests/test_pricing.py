@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+import httpx
+
+from src.auth.schemas import AccessTokenData
+from src.dependencies import get_current_user_from_jwt
+from src.main import app
+from src.reservations.pricing import PricingRepository, price_seats, showtime_prices
+from src.reservations.schemas import PriceTier, ShowtimePricing
+
+SEATS_PER_ROW = 5
+
+
+def first_seat_of_row(seat_ids: list[int], row: int) -> int:
+    """The showtime fixture's hall has 4 rows of 5 seats, ids in row order"""
+    return seat_ids[(row - 1) * SEATS_PER_ROW]
+
+
+async def set_pricing(database, showtime_id: int, multiplier: str, *tiers) -> None:
+    async with database.unit_of_work() as db:
+        await PricingRepository(db).set_pricing(
+            showtime_id,
+            ShowtimePricing(
+                price_multiplier=Decimal(multiplier),
+                tiers=[
+                    PriceTier(name=name, first_row=first, last_row=last, surcharge=s)
+                    for name, first, last, s in tiers
+                ],
+            ),
+        )
+
+
+async def test_price_is_base_plus_highest_surcharge_times_multiplier(
+    database, showtime
+):
+    _, showtime_id, seat_ids = showtime
+    await set_pricing(
+        database,
+        showtime_id,
+        "1.5",
+        ("premium", 3, 4, Decimal(4)),
+        ("vip", 4, 4, Decimal(6)),
+    )
+    untiered, premium, vip = (first_seat_of_row(seat_ids, row) for row in (1, 3, 4))
+
+    async with database.unit_of_work(read_only=True) as db:
+        # Row 1 is in no tier: (10 + 0) * 1.5
+        assert await price_seats(db, showtime_id, [untiered]) == 15
+        assert await price_seats(db, showtime_id, [premium]) == 21
+        # Row 4 is in both tiers and only the higher surcharge applies
+        assert await price_seats(db, showtime_id, [vip]) == 24
+        assert await price_seats(db, showtime_id, [untiered, premium, vip]) == 60
+        assert await price_seats(db, showtime_id, []) == 0
+
+
+async def test_quotes_follow_pricing_changes(database, showtime):
+    _, showtime_id, seat_ids = showtime
+    seat_id = first_seat_of_row(seat_ids, 1)
+
+    async def quote() -> Decimal:
+        async with database.unit_of_work(read_only=True) as db:
+            return await showtime_prices.quote(db, showtime_id, [seat_id])
+
+    assert await quote() == 10
+    await set_pricing(database, showtime_id, "2")
+    assert await quote() == 20
+    await set_pricing(database, showtime_id, "2", ("front", 1, 1, Decimal(5)))
+    assert await quote() == 30
+    await set_pricing(database, showtime_id, "1")
+    assert await quote() == 10
+
+
+async def test_booking_charges_the_server_computed_total(database, showtime):
+    user_id, showtime_id, seat_ids = showtime
+    await set_pricing(database, showtime_id, "1.5", ("vip", 4, 4, Decimal(6)))
+    booked = [first_seat_of_row(seat_ids, 1), first_seat_of_row(seat_ids, 4)]
+    app.dependency_overrides[get_current_user_from_jwt] = lambda: AccessTokenData(
+        username="alice", id=user_id, role="customer"
+    )
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/reservations/",
+                json={
+                    "showtime_id": showtime_id,
+                    "seat_ids": booked,
+                    "total_amount": "0.01",
+                },
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 201
+    assert Decimal(response.json()["total_amount"]) == 39
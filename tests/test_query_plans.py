@@ -0,0 +1,192 @@
+"""
+Key queries must be served by an index, not a full scan of a large table.
+
+Plans are always checked on SQLite, whose planner picks an index whenever
+one fits. With TEST_DATABASE_URL pointing at a scratch Postgres database
+(psycopg driver, btree_gist and pg_trgm available), the same queries are
+also checked against seeded and analyzed tables.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database import Base
+from src.movies.models import MovieGenre, Showtime
+from src.reservations.models import (
+    Reservation,
+    ReservationSeat,
+    Seat,
+    SeatHold,
+    SeatHoldSeat,
+)
+from src.users.models import User
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+LARGE_TABLES = {
+    "users",
+    "movie_genre",
+    "seats",
+    "showtimes",
+    "reservations",
+    "reservation_seat",
+    "seat_holds",
+    "seat_hold_seat",
+}
+
+NOW = datetime(2030, 1, 1, 12)
+
+KEY_QUERIES: dict[str, Select] = {
+    "user reservations": select(Reservation.id)
+    .where(Reservation.user_id == 7)
+    .order_by(Reservation.created_at.desc()),
+    "showtime reservations": select(Reservation.id).where(Reservation.showtime_id == 7),
+    "seat reservations": select(ReservationSeat.reservation_id).where(
+        ReservationSeat.seat_id == 7
+    ),
+    "taken seats": select(ReservationSeat.seat_id).where(
+        ReservationSeat.showtime_id == 7, ReservationSeat.seat_id.in_([7, 8, 9])
+    ),
+    "hall layout": select(Seat.id)
+    .where(Seat.cinema_hall_id == 7)
+    .order_by(Seat.row_number, Seat.seat_number),
+    "showtimes of a day": select(Showtime.id).where(
+        Showtime.start_time >= NOW, Showtime.start_time < NOW + timedelta(days=1)
+    ),
+    "movie showtimes": select(Showtime.id)
+    .where(Showtime.movie_id == 7, Showtime.start_time >= NOW)
+    .order_by(Showtime.start_time),
+    "hall schedule": select(Showtime.id).where(
+        Showtime.cinema_hall_id == 7,
+        Showtime.start_time >= NOW,
+        Showtime.start_time < NOW + timedelta(days=1),
+    ),
+    "genre movies": select(MovieGenre.movie_id).where(MovieGenre.genre_id == 7),
+    "showtime holds": select(SeatHold.id).where(SeatHold.showtime_id == 7),
+    "expired holds": select(SeatHold.id).where(SeatHold.expires_at <= NOW),
+    "seat holds": select(SeatHoldSeat.hold_id).where(SeatHoldSeat.seat_id == 7),
+    "users page": select(User.id)
+    .where(User.role_id == 1)
+    .order_by(User.created_at, User.id)
+    .limit(20),
+}
+
+# Postgres needs real volume before an index beats a sequential scan
+SEED_POSTGRES = """
+INSERT INTO roles (name) VALUES ('customer');
+INSERT INTO users (username, phone_number, email, password, is_active, role_id)
+SELECT 'user' || i, '+1' || lpad(i::text, 10, '0'), 'user' || i || '@example.com',
+       'not-a-real-hash', true, 1
+FROM generate_series(1, 20000) AS i;
+INSERT INTO genres (title) SELECT 'genre ' || i FROM generate_series(1, 50) AS i;
+INSERT INTO movies (title, duration_minutes, release_date, poster_url)
+SELECT 'movie ' || i, 100, '2020-01-01', 'https://example.com/poster.jpg'
+FROM generate_series(1, 5000) AS i;
+INSERT INTO movie_genre (movie_id, genre_id)
+SELECT m, 1 + mod(m + g * 17, 50)
+FROM generate_series(1, 5000) AS m, generate_series(0, 2) AS g;
+INSERT INTO cinema_halls (name, row_count, seats_per_row)
+SELECT 'hall ' || i, 20, 25 FROM generate_series(1, 40) AS i;
+INSERT INTO seats (seat_code, row_number, seat_number, price, cinema_hall_id)
+SELECT h || '-' || r || '-' || n, r, n, 10, h
+FROM generate_series(1, 40) AS h, generate_series(1, 20) AS r,
+     generate_series(1, 25) AS n;
+INSERT INTO showtimes (start_time, end_time, cleaning_ends_at, capacity, movie_id,
+                       cinema_hall_id)
+SELECT start_time, start_time + interval '2 hours',
+       start_time + interval '150 minutes', 500, 1 + mod(i, 5000), 1 + mod(i, 40)
+FROM generate_series(0, 19999) AS i,
+     LATERAL (SELECT timestamp '2029-06-01' + (i / 40) * interval '3 hours')
+     AS t (start_time);
+INSERT INTO reservations (total_amount, user_id, showtime_id)
+SELECT 10, 1 + mod(i, 20000), 1 + mod(i, 20000) FROM generate_series(0, 99999) AS i;
+INSERT INTO reservation_seat (reservation_id, showtime_id, seat_id)
+SELECT r.id, r.showtime_id, (s.cinema_hall_id - 1) * 500
+       + 1 + (r.id - 1) / 20000
+FROM reservations AS r JOIN showtimes AS s ON s.id = r.showtime_id;
+INSERT INTO seat_holds (expires_at, user_id, showtime_id)
+SELECT timestamp '2030-01-01 11:00' + i * interval '1 minute', 1 + mod(i, 20000),
+       1 + mod(i, 20000)
+FROM generate_series(0, 19999) AS i;
+INSERT INTO seat_hold_seat (hold_id, showtime_id, seat_id)
+SELECT h.id, h.showtime_id, (s.cinema_hall_id - 1) * 500 + 400
+FROM seat_holds AS h JOIN showtimes AS s ON s.id = h.showtime_id;
+"""
+
+
+def seq_scans(plan: dict) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from seq_scans(child)
+
+
+async def full_scans(db: AsyncSession, stmt: Select) -> list[str]:
+    """
+    Tables the plan of `stmt` reads in full. On SQLite that includes walking
+    a whole index, which shows as SCAN rather than SEARCH.
+    """
+    connection = await db.connection()
+    compiled = stmt.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    if connection.dialect.name == "postgresql":
+        db_response = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+        )
+        return list(seq_scans(db_response.scalar_one()[0]["Plan"]))
+
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    db_response = await connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled.string}", params
+    )
+    return [
+        match.group(1)
+        for *_, detail in db_response
+        if (match := re.match(r"SCAN (\w+)", detail))
+    ]
+
+
+async def assert_indexed(db: AsyncSession) -> None:
+    offenders = {}
+    for name, stmt in KEY_QUERIES.items():
+        scanned = set(await full_scans(db, stmt)) & LARGE_TABLES
+        if scanned:
+            offenders[name] = sorted(scanned)
+    assert not offenders, f"Full scans of large tables: {offenders}"
+
+
+async def test_key_queries_use_indexes_on_sqlite(database):
+    async with database.session() as db:
+        await assert_indexed(db)
+
+
+@pytest.mark.skipif(
+    TEST_DATABASE_URL is None, reason="set TEST_DATABASE_URL to a scratch Postgres"
+)
+async def test_key_queries_use_indexes_on_postgres():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        async with engine.begin() as connection:
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+            for statement in SEED_POSTGRES.split(";"):
+                if statement.strip():
+                    await connection.exec_driver_sql(statement)
+        async with engine.connect() as connection:
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.exec_driver_sql("ANALYZE")
+        async with AsyncSession(engine) as db:
+            await assert_indexed(db)
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import OperationalError
+
+from src.auth.schemas import AccessTokenData
+from src.dependencies import get_current_user_from_jwt
+from src.main import app
+from src.reservations import repository
+from src.reservations.availability import seat_availability
+from src.reservations.exceptions import SeatsBusyError, SeatsUnavailableError
+from src.reservations.models import Reservation, ReservationSeat
+from src.reservations.repository import ReservationsRepository
+from src.reservations.schemas import SeatState
+from tests.conftest import get_counters
+
+
+class LockNotAvailable(Exception):
+    sqlstate = "55P03"
+
+
+async def test_confirming_a_hold_updates_counters_once_at_the_end(database, showtime):
+    user_id, showtime_id, seat_ids = showtime
+    async with database.unit_of_work() as db:
+        hold = await ReservationsRepository(db).create_hold(
+            user_id, showtime_id, seat_ids[:3]
+        )
+    assert await get_counters(database, showtime_id) == (0, 3)
+
+    statements = []
+    engine = database._engine.sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        async with database.unit_of_work() as db:
+            await ReservationsRepository(db).confirm_hold(user_id, hold.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    counter_updates = [s for s in statements if s.startswith("UPDATE showtimes")]
+    assert len(counter_updates) == 1
+    assert statements[-1] == counter_updates[0]
+    assert await get_counters(database, showtime_id) == (3, 0)
+
+
+async def test_lock_timeout_on_counters_is_a_retryable_conflict(
+    database, showtime, monkeypatch
+):
+    user_id, showtime_id, seat_ids = showtime
+
+    async def locked(*args, **kwargs):
+        raise OperationalError("UPDATE showtimes", {}, LockNotAvailable())
+
+    monkeypatch.setattr(repository, "add_to_counters", locked)
+    with pytest.raises(SeatsBusyError) as error:
+        async with database.unit_of_work() as db:
+            await ReservationsRepository(db).create_reservation(
+                user_id, showtime_id, seat_ids[:2]
+            )
+
+    assert error.value.status_code == 409
+    assert error.value.headers == {"Retry-After": "1"}
+    async with database.unit_of_work(read_only=True) as db:
+        assert (await db.execute(select(Reservation.id))).first() is None
+
+
+async def test_lost_seat_claim_is_a_retryable_conflict(database, showtime, monkeypatch):
+    _, showtime_id, seat_ids = showtime
+    # Stand-in for the advisory locks: one seat is claimed by another booking
+    monkeypatch.setattr(ReservationsRepository, "is_postgresql", True)
+    monkeypatch.setattr(repository, "CLAIM_SEATS_STMT", text("SELECT 1"))
+
+    with pytest.raises(SeatsBusyError) as error:
+        async with database.unit_of_work() as db:
+            await ReservationsRepository(db).claim_seats(showtime_id, seat_ids[:2])
+
+    assert error.value.status_code == 409
+    assert error.value.headers == {"Retry-After": "1"}
+
+
+async def book_until_decided(
+    client: httpx.AsyncClient, showtime_id: int, seat_ids: list[int]
+) -> httpx.Response:
+    """A client that honours Retry-After until the booking succeeds or is refused"""
+    while True:
+        response = await client.post(
+            "/reservations/", json={"showtime_id": showtime_id, "seat_ids": seat_ids}
+        )
+        if "Retry-After" not in response.headers:
+            return response
+        await asyncio.sleep(0.01)
+
+
+async def test_concurrent_bookings_of_the_same_seats_sell_them_once(database, showtime):
+    user_id, showtime_id, seat_ids = showtime
+    app.dependency_overrides[get_current_user_from_jwt] = lambda: AccessTokenData(
+        username="alice", id=user_id, role="customer"
+    )
+    requests = 200
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    book_until_decided(client, showtime_id, seat_ids[:3])
+                    for _ in range(requests)
+                )
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.clear()
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == requests - 1
+    async with database.unit_of_work(read_only=True) as db:
+        sold = (await db.execute(select(ReservationSeat.seat_id))).scalars().all()
+    assert sorted(sold) == seat_ids[:3]
+    assert await get_counters(database, showtime_id) == (3, 0)
+    # Losers are turned away by the cached map or the seat claim, not by
+    # waiting out lock timeouts
+    assert elapsed < 10.0, f"{requests} bookings decided in {elapsed:.2f}s"
+
+
+async def test_stale_cached_seats_are_confirmed_before_rejecting(database, showtime):
+    user_id, showtime_id, seat_ids = showtime
+    async with database.unit_of_work() as db:
+        await ReservationsRepository(db).create_reservation(
+            user_id, showtime_id, seat_ids[:1]
+        )
+        await seat_availability.get_map(db, showtime_id)
+    # Another worker cancelled a reservation; this map never heard of it
+    seat_availability.apply(showtime_id, seat_ids[1:3], SeatState.reserved)
+
+    async with database.unit_of_work() as db:
+        await ReservationsRepository(db).create_reservation(
+            user_id, showtime_id, seat_ids[1:3]
+        )
+    seat_map = seat_availability.get_cached(showtime_id)
+    assert seat_map.free_seat_ids()[0] == seat_ids[3]
+
+    with pytest.raises(SeatsUnavailableError) as error:
+        async with database.unit_of_work() as db:
+            await ReservationsRepository(db).create_reservation(
+                user_id, showtime_id, [seat_ids[0], seat_ids[3]]
+            )
+    assert error.value.detail["seat_ids"] == seat_ids[:1]
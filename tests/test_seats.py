@@ -0,0 +1,105 @@
+import random
+
+import httpx
+
+from src.main import app
+from src.reservations.layout import HallLayout
+from src.reservations.repository import ReservationsRepository
+
+
+def grid_layout(rows: int, seats_per_row: int, gaps: tuple[int, ...] = ()):
+    """Seat ids count up in (row, number) order; numbers in `gaps` are aisles"""
+    seats = [
+        (row, number)
+        for row in range(1, rows + 1)
+        for number in range(1, seats_per_row + 1)
+        if number not in gaps
+    ]
+    return HallLayout(
+        1,
+        [
+            (seat_id, f"{row}-{number}", row, number)
+            for seat_id, (row, number) in enumerate(seats, start=1)
+        ],
+        rows,
+        seats_per_row,
+    )
+
+
+def brute_force_best_block(layout: HallLayout, free: int, count: int):
+    best, best_score = None, float("inf")
+    for start in range(len(layout) - count + 1):
+        block = range(start, start + count)
+        if not all(free >> index & 1 for index in block):
+            continue
+        if any(
+            layout.rows[index] != layout.rows[start]
+            or layout.numbers[index] != layout.numbers[start] + index - start
+            for index in block
+        ):
+            continue
+        score = layout.prefix_scores[start + count] - layout.prefix_scores[start]
+        if score < best_score:
+            best, best_score = [layout.seat_ids[index] for index in block], score
+    return best
+
+
+def test_best_block_prefers_the_middle_two_thirds_back():
+    layout = grid_layout(5, 8)
+    everything = (1 << len(layout)) - 1
+
+    block = layout.best_block(everything, 2)
+    assert [(layout.rows[i - 1], layout.numbers[i - 1]) for i in block] == [
+        (4, 4),
+        (4, 5),
+    ]
+    assert layout.best_block(everything, 9) is None
+    assert layout.best_block(0, 1) is None
+
+
+def test_blocks_never_span_an_aisle_or_a_row_break():
+    layout = grid_layout(2, 7, gaps=(4,))
+    everything = (1 << len(layout)) - 1
+
+    assert layout.best_block(everything, 4) is None
+    block = layout.best_block(everything, 3)
+    numbers = [layout.numbers[i - 1] for i in block]
+    assert numbers in ([1, 2, 3], [5, 6, 7])
+
+
+def test_best_block_matches_brute_force():
+    rng = random.Random(7)
+    layout = grid_layout(9, 14, gaps=(4, 11))
+    for _ in range(300):
+        free = rng.getrandbits(len(layout)) | rng.getrandbits(len(layout))
+        count = rng.randint(1, 6)
+        assert layout.best_block(free, count) == brute_force_best_block(
+            layout, free, count
+        )
+
+
+async def test_suggestions_skip_booked_seats(database, showtime):
+    user_id, showtime_id, seat_ids = showtime
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = await client.get(
+            f"/showtimes/{showtime_id}/seats/suggestions/", params={"count": 2}
+        )
+        assert first.status_code == 200
+        suggested = first.json()["seat_ids"]
+
+        async with database.unit_of_work() as db:
+            await ReservationsRepository(db).create_reservation(
+                user_id, showtime_id, suggested
+            )
+        second = await client.get(
+            f"/showtimes/{showtime_id}/seats/suggestions/", params={"count": 2}
+        )
+        too_many = await client.get(
+            f"/showtimes/{showtime_id}/seats/suggestions/", params={"count": 6}
+        )
+
+    assert second.status_code == 200
+    assert not set(second.json()["seat_ids"]) & set(suggested)
+    assert too_many.status_code == 409
@@ -0,0 +1,146 @@
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, select
+
+from src.auth.schemas import AccessTokenData
+from src.dependencies import get_current_user_from_jwt
+from src.main import app
+from src.movies.exceptions import ShowtimeInPastError, ShowtimeOverlapError
+from src.movies.models import Showtime
+from src.movies.repository import ShowtimesRepository
+from src.movies.schedule import HallSchedule
+from src.movies.schemas import ShowtimeCreateRequest, WeeklyShowtimesRequest
+from tests.conftest import seed_showtime
+
+
+@pytest.fixture
+async def hall(database) -> tuple[int, int]:
+    """(movie id, hall id) of a hall whose only showtime is a month away"""
+    async with database.unit_of_work() as db:
+        showtime_id, _ = await seed_showtime(
+            db, start_time=datetime.now() + timedelta(days=30)
+        )
+        showtime = await db.get(Showtime, showtime_id)
+        return showtime.movie_id, showtime.cinema_hall_id
+
+
+async def test_offset_start_time_is_stored_as_local_time(database, hall):
+    movie_id, hall_id = hall
+    start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(microsecond=0)
+    request = ShowtimeCreateRequest(
+        movie_id=movie_id,
+        cinema_hall_id=hall_id,
+        start_time=start.astimezone(timezone(timedelta(hours=-5))).isoformat(),
+    )
+    local_start = start.astimezone().replace(tzinfo=None)
+    assert request.start_time == local_start
+
+    async with database.unit_of_work() as db:
+        created = await ShowtimesRepository(db).create_showtime(request)
+    assert created.start_time == local_start
+    async with database.unit_of_work(read_only=True) as db:
+        stored = await db.scalar(
+            select(Showtime.start_time).where(Showtime.id == created.id)
+        )
+    assert stored == local_start
+
+
+async def test_offset_start_time_in_the_past_is_rejected(database, hall):
+    movie_id, hall_id = hall
+    request = ShowtimeCreateRequest(
+        movie_id=movie_id,
+        cinema_hall_id=hall_id,
+        start_time=datetime.now(timezone.utc) - timedelta(hours=1),
+    )
+    with pytest.raises(ShowtimeInPastError):
+        async with database.unit_of_work() as db:
+            await ShowtimesRepository(db).create_showtime(request)
+
+
+def test_weekly_start_times_must_not_carry_an_offset():
+    values = {"movie_id": 1, "cinema_hall_id": 1, "week_start": "2030-01-07"}
+    assert WeeklyShowtimesRequest(**values, start_times=["19:00"])
+    with pytest.raises(ValidationError):
+        WeeklyShowtimesRequest(**values, start_times=["19:00", "21:00+02:00"])
+
+
+def test_back_to_back_showtimes_do_not_conflict():
+    day = datetime(2030, 1, 7)
+
+    def at(hour: int, minute: int = 0) -> datetime:
+        return day.replace(hour=hour, minute=minute)
+
+    schedule = HallSchedule(1, [(at(14), at(16, 30), 2), (at(10), at(12, 30), 1)])
+
+    assert schedule.find_conflict(at(12, 30), at(14)) is None
+    assert schedule.find_conflict(at(8), at(10)) is None
+    assert schedule.find_conflict(at(16, 30), at(19)) is None
+    assert schedule.find_conflict(at(12, 29), at(13)) == 1
+    assert schedule.find_conflict(at(13), at(14, 1)) == 2
+    assert schedule.find_conflict(at(10), at(10, 1)) == 1
+    assert schedule.find_conflict(at(16, 29), at(19)) == 2
+    assert HallSchedule(1).find_conflict(at(10), at(12)) is None
+
+
+async def count_showtimes(database) -> int:
+    async with database.unit_of_work(read_only=True) as db:
+        return await db.scalar(select(func.count(Showtime.id)))
+
+
+async def test_weekly_batch_overlapping_itself_is_rejected(database, hall):
+    movie_id, hall_id = hall
+    before = await count_showtimes(database)
+    # A 120-minute movie starting an hour apart clashes with itself every day
+    request = WeeklyShowtimesRequest(
+        movie_id=movie_id,
+        cinema_hall_id=hall_id,
+        week_start=date.today() + timedelta(days=60),
+        start_times=["19:00", "20:00"],
+        weekdays=[0, 3],
+    )
+    with pytest.raises(ShowtimeOverlapError) as error:
+        async with database.unit_of_work() as db:
+            await ShowtimesRepository(db).create_weekly_showtimes(request)
+
+    assert len(error.value.detail["conflicts"]) == 2
+    assert await count_showtimes(database) == before
+
+
+async def test_overlapping_showtime_is_a_409(database, hall):
+    movie_id, hall_id = hall
+    async with database.unit_of_work(read_only=True) as db:
+        existing = (await db.execute(select(Showtime))).scalar_one()
+    app.dependency_overrides[get_current_user_from_jwt] = lambda: AccessTokenData(
+        username="admin", id=1, role="admin"
+    )
+
+    async def create(start_time: datetime) -> httpx.Response:
+        return await client.post(
+            "/showtimes/",
+            json={
+                "movie_id": movie_id,
+                "cinema_hall_id": hall_id,
+                "start_time": start_time.isoformat(),
+            },
+        )
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            overlapping = await create(existing.start_time + timedelta(hours=1))
+            back_to_back = await create(existing.cleaning_ends_at)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert overlapping.status_code == 409
+    assert overlapping.json()["detail"]["conflicts"] == [
+        {
+            "start_time": (existing.start_time + timedelta(hours=1)).isoformat(),
+            "showtime_id": existing.id,
+        }
+    ]
+    assert back_to_back.status_code == 201
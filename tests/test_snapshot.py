@@ -0,0 +1,119 @@
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from sqlalchemy import insert
+
+from src.database import DBAsyncSessionManager, sessionmanager
+from src.main import app
+from src.movies.models import Genre, Showtime
+from src.movies.repository import MoviesRepository, ShowtimesRepository
+from src.movies.schemas import ShowtimeCreateRequest
+from src.movies.snapshot import ScheduleSnapshots, schedule_snapshots
+from tests.conftest import create_schema, seed_showtime, sqlite_url
+
+TOMORROW = date.today() + timedelta(days=1)
+
+
+def at(hour: int) -> datetime:
+    return datetime.combine(TOMORROW, datetime.min.time()) + timedelta(hours=hour)
+
+
+async def read_schedule(if_none_match: Optional[str] = None) -> httpx.Response:
+    headers = {} if if_none_match is None else {"If-None-Match": if_none_match}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(f"/schedule/{TOMORROW}/", headers=headers)
+
+
+async def test_unchanged_schedule_is_not_modified(database):
+    async with database.unit_of_work() as db:
+        await seed_showtime(db, start_time=at(10))
+
+    response = await read_schedule()
+    assert response.status_code == 200
+    assert [movie["title"] for movie in response.json()["movies"]] == ["Movie 1"]
+    etag = response.headers["etag"]
+
+    assert (await read_schedule(if_none_match=etag)).status_code == 304
+    assert (await read_schedule(if_none_match=f'"other", W/{etag}')).status_code == 304
+    assert (await read_schedule(if_none_match='"other"')).status_code == 200
+
+
+async def test_showtime_and_movie_edits_invalidate_the_snapshot(database):
+    async with database.unit_of_work() as db:
+        showtime_id, _ = await seed_showtime(db, start_time=at(10))
+        showtime = await db.get(Showtime, showtime_id)
+        movie_id, hall_id = showtime.movie_id, showtime.cinema_hall_id
+        genre_id = (
+            await db.execute(insert(Genre).values(title="Crime").returning(Genre.id))
+        ).scalar_one()
+    etags = [(await read_schedule()).headers["etag"]]
+
+    async def edited() -> dict:
+        response = await read_schedule(if_none_match=etags[-1])
+        assert response.status_code == 200
+        assert response.headers["etag"] not in etags
+        etags.append(response.headers["etag"])
+        (movie,) = response.json()["movies"]
+        return movie
+
+    async with database.unit_of_work() as db:
+        created = await ShowtimesRepository(db).create_showtime(
+            ShowtimeCreateRequest(
+                movie_id=movie_id, cinema_hall_id=hall_id, start_time=at(15)
+            )
+        )
+    assert [s["id"] for s in (await edited())["showtimes"]] == [
+        showtime_id,
+        created.id,
+    ]
+
+    async with database.unit_of_work() as db:
+        await MoviesRepository(db).link_genre(movie_id, genre_id)
+    assert (await edited())["genres"] == ["Crime"]
+
+    async with database.unit_of_work() as db:
+        await ShowtimesRepository(db).delete_showtime(created.id)
+    assert [s["id"] for s in (await edited())["showtimes"]] == [showtime_id]
+
+
+async def test_past_and_furthest_dates_are_evicted(database):
+    snapshots = ScheduleSnapshots(max_days=2)
+    today = date.today()
+    async with database.session() as db:
+        for offset in (-1, 1, 2, 3):
+            await snapshots.get(db, today + timedelta(days=offset))
+
+    assert set(snapshots._snapshots) == {today + timedelta(days=d) for d in (1, 2)}
+
+
+async def test_edited_date_is_rebuilt_from_the_primary(tmp_path: Path):
+    primary_url = sqlite_url(tmp_path / "primary.db")
+    replica_url = sqlite_url(tmp_path / "replica.db")
+    replica = DBAsyncSessionManager()
+    for url, manager in ((primary_url, sessionmanager), (replica_url, replica)):
+        await create_schema(url)
+        manager.init(url)
+        async with manager.unit_of_work() as db:
+            showtime_id, _ = await seed_showtime(db, start_time=at(10))
+    await replica.close()
+    sessionmanager.init(primary_url, replica_urls=[replica_url])
+
+    async def movies_on_replica() -> list:
+        async with sessionmanager.unit_of_work(read_only=True) as db:
+            assert db.info["replica"] == 0
+            snapshot = await schedule_snapshots.get(db, TOMORROW)
+        return json.loads(snapshot.body)["movies"]
+
+    try:
+        assert len(await movies_on_replica()) == 1
+        # The replica has not seen the deletion yet
+        async with sessionmanager.unit_of_work() as db:
+            await ShowtimesRepository(db).delete_showtime(showtime_id)
+        assert await movies_on_replica() == []
+    finally:
+        await sessionmanager.close()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.auth.services import AuthenticationService
+from src.users.cache import InMemoryUserCacheBackend, UserCache
+from src.users.exceptions import UserDataError
+from src.users.models import RoleName
+from src.users.schemas import UserUpdateRequest
+from src.users.repository import UsersRepository
+from tests.conftest import seed_user
+
+
+async def test_cached_user_has_no_password_hash(database, monkeypatch):
+    cache = UserCache(InMemoryUserCacheBackend(), ttl=60)
+    monkeypatch.setattr("src.auth.services.user_cache", cache)
+    async with database.unit_of_work() as db:
+        user_id = await seed_user(db, password="$2b$12$secret-hash")
+
+    async with database.unit_of_work() as db:
+        user = await AuthenticationService.get_cached_user(db, "alice", user_id)
+
+    cached = await cache.get_by_id(user_id)
+    assert cached == user
+    assert "password" not in cached.model_dump()
+    assert "secret-hash" not in cached.model_dump_json()
+
+
+async def test_user_update_invalidates_cached_snapshot(database, monkeypatch):
+    cache = UserCache(InMemoryUserCacheBackend(), ttl=60)
+    monkeypatch.setattr("src.auth.services.user_cache", cache)
+    monkeypatch.setattr("src.users.repository.user_cache", cache)
+    async with database.unit_of_work() as db:
+        user_id = await seed_user(db)
+    async with database.unit_of_work() as db:
+        await AuthenticationService.get_cached_user(db, "alice", user_id)
+
+    async with database.unit_of_work() as db:
+        await UsersRepository(db).update_user(
+            UserUpdateRequest(first_name="Alice"), user_id
+        )
+
+    assert await cache.get_by_id(user_id) is None
+    assert await cache.get_by_name("alice") is None
+
+
+async def test_keyset_pages_cover_every_user_once(database):
+    start = datetime(2024, 1, 1)
+    async with database.unit_of_work() as db:
+        for i in range(25):
+            # Pairs of users share a timestamp, so ids break the ties
+            await seed_user(
+                db,
+                username=f"user{i:02d}",
+                created_at=start + timedelta(minutes=i // 2),
+                is_active=i % 5 != 0,
+            )
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        async with database.unit_of_work(read_only=True) as db:
+            users, cursor = await UsersRepository(db).get_users_paginated(
+                limit=10, cursor=cursor
+            )
+        seen.extend(user.username for user in users)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [f"user{i:02d}" for i in range(25)]
+
+
+async def test_pagination_filters_and_bad_cursor(database):
+    async with database.unit_of_work() as db:
+        for i in range(6):
+            await seed_user(db, username=f"{'ab' if i < 3 else 'cd'}{i}")
+        await seed_user(db, username="ab_inactive", is_active=False)
+        await seed_user(db, username="ab_staff", role=RoleName.staff)
+
+    async with database.unit_of_work(read_only=True) as db:
+        repository = UsersRepository(db)
+        users, _ = await repository.get_users_paginated(
+            limit=10, prefix="ab", is_active=True, role=RoleName.customer
+        )
+        assert [user.username for user in users] == ["ab0", "ab1", "ab2"]
+        with pytest.raises(UserDataError):
+            await repository.get_users_paginated(limit=10, cursor="not-a-cursor")